@@ -0,0 +1,30 @@
+"""Partial index for expiring active licenses
+
+Revision ID: 002
+Revises: 001
+Create Date: 2025-02-03 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision: str = '002'
+down_revision: Union[str, None] = '001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    # Drives the expiration job: only rows still active are indexed, so each
+    # batch reads the overdue head of the index instead of scanning expired rows
+    op.create_index(
+        'ix_business_licenses_active_expiration',
+        'business_licenses',
+        ['expiration_date'],
+        unique=False,
+        postgresql_where=sa.text("status = 'active'"),
+    )
+
+def downgrade() -> None:
+    op.drop_index('ix_business_licenses_active_expiration', table_name='business_licenses')
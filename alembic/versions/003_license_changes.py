@@ -0,0 +1,35 @@
+"""License change log
+
+Revision ID: 003
+Revises: 002
+Create Date: 2025-02-10 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers
+revision: str = '003'
+down_revision: Union[str, None] = '002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    op.create_table('license_changes',
+        sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column('txid', sa.BigInteger(), nullable=False),
+        sa.Column('license_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('license_number', sa.String(length=50), nullable=False),
+        sa.Column('operation', sa.String(length=10), nullable=False),
+        sa.Column('changed_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_license_changes_txid_id', 'license_changes', ['txid', 'id'], unique=False)
+    op.create_index(op.f('ix_license_changes_license_id'), 'license_changes', ['license_id'], unique=False)
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_license_changes_license_id'), table_name='license_changes')
+    op.drop_index('ix_license_changes_txid_id', table_name='license_changes')
+    op.drop_table('license_changes')
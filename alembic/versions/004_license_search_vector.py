@@ -0,0 +1,45 @@
+"""Full-text search vector on business licenses
+
+Revision ID: 004
+Revises: 003
+Create Date: 2025-02-17 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers
+revision: str = '004'
+down_revision: Union[str, None] = '003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Kept in sync with app.models.license.SEARCH_VECTOR_EXPRESSION
+SEARCH_VECTOR_EXPRESSION = (
+    "setweight(to_tsvector('english', coalesce(business_name, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(conditions, '')), 'C')"
+)
+
+def upgrade() -> None:
+    op.add_column('business_licenses',
+        sa.Column(
+            'search_vector',
+            postgresql.TSVECTOR(),
+            sa.Computed(SEARCH_VECTOR_EXPRESSION, persisted=True),
+            nullable=True
+        )
+    )
+    op.create_index(
+        'ix_business_licenses_search_vector',
+        'business_licenses',
+        ['search_vector'],
+        unique=False,
+        postgresql_using='gin'
+    )
+
+def downgrade() -> None:
+    op.drop_index('ix_business_licenses_search_vector', table_name='business_licenses')
+    op.drop_column('business_licenses', 'search_vector')
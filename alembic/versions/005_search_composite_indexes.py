@@ -0,0 +1,59 @@
+"""Composite, partial and trigram indexes for the search filter mix
+
+Revision ID: 005
+Revises: 004
+Create Date: 2025-02-24 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision: str = '005'
+down_revision: Union[str, None] = '004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    # ilike '%term%' filters on name, number and city can only use trigram indexes
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    
+    # state + status + expiration range, the dominant dashboard/renewal shape
+    op.create_index('ix_business_licenses_state_status_expiration', 'business_licenses',
+                    ['state', 'status', 'expiration_date'], unique=False)
+    
+    # Filter then walk in created_at order for the paginated ORDER BY created_at DESC
+    op.create_index('ix_business_licenses_state_created_at', 'business_licenses',
+                    ['state', 'created_at'], unique=False)
+    op.create_index('ix_business_licenses_active_state_created_at', 'business_licenses',
+                    ['state', 'created_at'], unique=False,
+                    postgresql_where=sa.text("status = 'active'"))
+    op.create_index('ix_business_licenses_status_created_at', 'business_licenses',
+                    ['status', 'created_at'], unique=False)
+    op.create_index('ix_business_licenses_created_at', 'business_licenses',
+                    ['created_at'], unique=False)
+    
+    op.create_index('ix_business_licenses_business_name_trgm', 'business_licenses',
+                    ['business_name'], unique=False, postgresql_using='gin',
+                    postgresql_ops={'business_name': 'gin_trgm_ops'})
+    op.create_index('ix_business_licenses_license_number_trgm', 'business_licenses',
+                    ['license_number'], unique=False, postgresql_using='gin',
+                    postgresql_ops={'license_number': 'gin_trgm_ops'})
+    op.create_index('ix_business_licenses_city_trgm', 'business_licenses',
+                    ['city'], unique=False, postgresql_using='gin',
+                    postgresql_ops={'city': 'gin_trgm_ops'})
+    
+    # Covered by the state-led composites above
+    op.drop_index(op.f('ix_business_licenses_state'), table_name='business_licenses')
+
+def downgrade() -> None:
+    op.create_index(op.f('ix_business_licenses_state'), 'business_licenses', ['state'], unique=False)
+    op.drop_index('ix_business_licenses_city_trgm', table_name='business_licenses')
+    op.drop_index('ix_business_licenses_license_number_trgm', table_name='business_licenses')
+    op.drop_index('ix_business_licenses_business_name_trgm', table_name='business_licenses')
+    op.drop_index('ix_business_licenses_created_at', table_name='business_licenses')
+    op.drop_index('ix_business_licenses_status_created_at', table_name='business_licenses')
+    op.drop_index('ix_business_licenses_active_state_created_at', table_name='business_licenses')
+    op.drop_index('ix_business_licenses_state_created_at', table_name='business_licenses')
+    op.drop_index('ix_business_licenses_state_status_expiration', table_name='business_licenses')
@@ -0,0 +1,32 @@
+"""Prefix indexes for typeahead suggestions
+
+Revision ID: 006
+Revises: 005
+Create Date: 2025-03-03 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision: str = '006'
+down_revision: Union[str, None] = '005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    # text_pattern_ops lets lower(col) LIKE 'prefix%' use a btree range scan
+    # regardless of the database collation
+    op.execute(
+        "CREATE INDEX ix_business_licenses_business_name_prefix "
+        "ON business_licenses (lower(business_name) text_pattern_ops)"
+    )
+    op.execute(
+        "CREATE INDEX ix_business_licenses_license_number_prefix "
+        "ON business_licenses (lower(license_number) text_pattern_ops)"
+    )
+
+def downgrade() -> None:
+    op.drop_index('ix_business_licenses_license_number_prefix', table_name='business_licenses')
+    op.drop_index('ix_business_licenses_business_name_prefix', table_name='business_licenses')
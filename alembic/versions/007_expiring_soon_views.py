@@ -0,0 +1,55 @@
+"""Materialized expiring-soon views for the renewal pipeline
+
+Revision ID: 007
+Revises: 006
+Create Date: 2025-03-10 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision: str = '007'
+down_revision: Union[str, None] = '006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# The 90 day horizon must match EXPIRING_MAX_HORIZON_DAYS in app/models/expiring.py
+EXPIRING_SOON_SQL = """
+    SELECT id, license_number, business_name, business_type, issuing_authority,
+           city, state, expiration_date
+    FROM business_licenses
+    WHERE status = 'active'
+      AND expiration_date >= now()
+      AND expiration_date < now() + interval '90 days'
+"""
+
+EXPIRING_DAILY_SQL = """
+    SELECT issuing_authority, state, expiration_date::date AS expiration_day,
+           count(*)::integer AS license_count
+    FROM business_licenses
+    WHERE status = 'active'
+      AND expiration_date >= now()
+      AND expiration_date < now() + interval '90 days'
+    GROUP BY issuing_authority, state, expiration_date::date
+"""
+
+def upgrade() -> None:
+    op.execute(f"CREATE MATERIALIZED VIEW license_expiring_soon AS {EXPIRING_SOON_SQL}")
+    # REFRESH ... CONCURRENTLY needs a unique index; the others serve keyset pages
+    op.create_index('ix_license_expiring_soon_id', 'license_expiring_soon', ['id'], unique=True)
+    op.create_index('ix_license_expiring_soon_expiration', 'license_expiring_soon',
+                    ['expiration_date', 'id'], unique=False)
+    op.create_index('ix_license_expiring_soon_authority_state', 'license_expiring_soon',
+                    ['issuing_authority', 'state', 'expiration_date', 'id'], unique=False)
+    op.create_index('ix_license_expiring_soon_state', 'license_expiring_soon',
+                    ['state', 'expiration_date', 'id'], unique=False)
+
+    op.execute(f"CREATE MATERIALIZED VIEW license_expiring_daily AS {EXPIRING_DAILY_SQL}")
+    op.create_index('ix_license_expiring_daily_key', 'license_expiring_daily',
+                    ['issuing_authority', 'state', 'expiration_day'], unique=True)
+
+def downgrade() -> None:
+    op.execute("DROP MATERIALIZED VIEW license_expiring_daily")
+    op.execute("DROP MATERIALIZED VIEW license_expiring_soon")
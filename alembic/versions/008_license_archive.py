@@ -0,0 +1,70 @@
+"""Archive table for long-expired licenses
+
+Revision ID: 008
+Revises: 007
+Create Date: 2025-03-17 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers
+revision: str = '008'
+down_revision: Union[str, None] = '007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Kept in sync with app.models.license.SEARCH_VECTOR_EXPRESSION
+SEARCH_VECTOR_EXPRESSION = (
+    "setweight(to_tsvector('english', coalesce(business_name, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(conditions, '')), 'C')"
+)
+
+def upgrade() -> None:
+    # Reuse the enum types created by migration 001
+    license_type = postgresql.ENUM(name='licensetype', create_type=False)
+    license_status = postgresql.ENUM(name='licensestatus', create_type=False)
+
+    op.create_table('business_licenses_archive',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('license_number', sa.String(length=50), nullable=False),
+        sa.Column('business_name', sa.String(length=255), nullable=False),
+        sa.Column('business_type', license_type, nullable=False),
+        sa.Column('status', license_status, nullable=False),
+        sa.Column('issued_date', sa.DateTime(), nullable=False),
+        sa.Column('expiration_date', sa.DateTime(), nullable=False),
+        sa.Column('issuing_authority', sa.String(length=255), nullable=False),
+        sa.Column('street_address', sa.String(length=255), nullable=False),
+        sa.Column('city', sa.String(length=100), nullable=False),
+        sa.Column('state', sa.String(length=50), nullable=False),
+        sa.Column('zip_code', sa.String(length=20), nullable=False),
+        sa.Column('contact_person', sa.String(length=255), nullable=True),
+        sa.Column('phone', sa.String(length=20), nullable=True),
+        sa.Column('email', sa.String(length=255), nullable=True),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('conditions', sa.Text(), nullable=True),
+        sa.Column('is_renewable', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.Column('archived_at', sa.DateTime(), server_default=sa.func.now(), nullable=False),
+        sa.Column(
+            'search_vector',
+            postgresql.TSVECTOR(),
+            sa.Computed(SEARCH_VECTOR_EXPRESSION, persisted=True),
+            nullable=True
+        ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    # Cold table: only the indexes lookups need
+    op.create_index(op.f('ix_business_licenses_archive_license_number'), 'business_licenses_archive',
+                    ['license_number'], unique=True)
+    op.create_index(op.f('ix_business_licenses_archive_expiration_date'), 'business_licenses_archive',
+                    ['expiration_date'], unique=False)
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_business_licenses_archive_expiration_date'), table_name='business_licenses_archive')
+    op.drop_index(op.f('ix_business_licenses_archive_license_number'), table_name='business_licenses_archive')
+    op.drop_table('business_licenses_archive')
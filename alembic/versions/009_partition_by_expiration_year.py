@@ -0,0 +1,69 @@
+"""Range partition business_licenses by expiration year
+
+Revision ID: 009
+Revises: 008
+Create Date: 2025-03-24 09:00:00.000000
+
+Rewrites the whole table; run during a maintenance window. New yearly
+partitions are added ahead of time by the ensure_partitions job.
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.partitions import partition_licenses_table, unpartition_licenses_table
+
+# revision identifiers
+revision: str = '009'
+down_revision: Union[str, None] = '008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# The expiring views (migration 007) depend on the table, so they are dropped
+# and rebuilt around the rewrite; kept in sync with migration 007
+EXPIRING_SOON_SQL = """
+    SELECT id, license_number, business_name, business_type, issuing_authority,
+           city, state, expiration_date
+    FROM business_licenses
+    WHERE status = 'active'
+      AND expiration_date >= now()
+      AND expiration_date < now() + interval '90 days'
+"""
+
+EXPIRING_DAILY_SQL = """
+    SELECT issuing_authority, state, expiration_date::date AS expiration_day,
+           count(*)::integer AS license_count
+    FROM business_licenses
+    WHERE status = 'active'
+      AND expiration_date >= now()
+      AND expiration_date < now() + interval '90 days'
+    GROUP BY issuing_authority, state, expiration_date::date
+"""
+
+def drop_expiring_views() -> None:
+    op.execute("DROP MATERIALIZED VIEW license_expiring_daily")
+    op.execute("DROP MATERIALIZED VIEW license_expiring_soon")
+
+def create_expiring_views() -> None:
+    op.execute(f"CREATE MATERIALIZED VIEW license_expiring_soon AS {EXPIRING_SOON_SQL}")
+    op.create_index('ix_license_expiring_soon_id', 'license_expiring_soon', ['id'], unique=True)
+    op.create_index('ix_license_expiring_soon_expiration', 'license_expiring_soon',
+                    ['expiration_date', 'id'], unique=False)
+    op.create_index('ix_license_expiring_soon_authority_state', 'license_expiring_soon',
+                    ['issuing_authority', 'state', 'expiration_date', 'id'], unique=False)
+    op.create_index('ix_license_expiring_soon_state', 'license_expiring_soon',
+                    ['state', 'expiration_date', 'id'], unique=False)
+
+    op.execute(f"CREATE MATERIALIZED VIEW license_expiring_daily AS {EXPIRING_DAILY_SQL}")
+    op.create_index('ix_license_expiring_daily_key', 'license_expiring_daily',
+                    ['issuing_authority', 'state', 'expiration_day'], unique=True)
+
+def upgrade() -> None:
+    drop_expiring_views()
+    partition_licenses_table(op.get_bind())
+    create_expiring_views()
+
+def downgrade() -> None:
+    drop_expiring_views()
+    unpartition_licenses_table(op.get_bind())
+    create_expiring_views()
@@ -0,0 +1,51 @@
+"""Businesses table and license ownership
+
+Revision ID: 010
+Revises: 009
+Create Date: 2025-03-31 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision: str = '010'
+down_revision: Union[str, None] = '009'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    op.create_table('businesses',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('dba_number', sa.String(length=50), nullable=True),
+        sa.Column('name', sa.String(length=255), nullable=False),
+        sa.Column('business_type', sa.String(length=100), nullable=True),
+        sa.Column('physical_address', sa.String(length=255), nullable=True),
+        sa.Column('mailing_address', sa.String(length=255), nullable=True),
+        sa.Column('owner_name', sa.String(length=255), nullable=True),
+        sa.Column('owner_contact', sa.String(length=255), nullable=True),
+        sa.Column('employee_count', sa.Integer(), nullable=True),
+        sa.Column('start_date', sa.Date(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('dba_number')
+    )
+    op.create_index('ix_businesses_name', 'businesses', ['name'], unique=False)
+
+    # Nullable, so adding the column doesn't rewrite the partitions; the
+    # index serves selectinload(Business.licenses), which filters on it
+    op.add_column('business_licenses', sa.Column('business_id', sa.Integer(), nullable=True))
+    op.create_foreign_key('fk_business_licenses_business_id', 'business_licenses', 'businesses',
+                          ['business_id'], ['id'])
+    op.create_index('ix_business_licenses_business_id', 'business_licenses', ['business_id'], unique=False)
+
+    # Archived licenses keep their owner; no foreign key, the archive is read only
+    op.add_column('business_licenses_archive', sa.Column('business_id', sa.Integer(), nullable=True))
+
+def downgrade() -> None:
+    op.drop_column('business_licenses_archive', 'business_id')
+    op.drop_index('ix_business_licenses_business_id', table_name='business_licenses')
+    op.drop_constraint('fk_business_licenses_business_id', 'business_licenses', type_='foreignkey')
+    op.drop_column('business_licenses', 'business_id')
+    op.drop_index('ix_businesses_name', table_name='businesses')
+    op.drop_table('businesses')
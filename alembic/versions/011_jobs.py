@@ -0,0 +1,45 @@
+"""Background jobs table
+
+Revision ID: 011
+Revises: 010
+Create Date: 2025-04-07 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers
+revision: str = '011'
+down_revision: Union[str, None] = '010'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    op.create_table('jobs',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('kind', sa.String(length=20), nullable=False),
+        sa.Column('status', sa.String(length=10), nullable=False),
+        sa.Column('params', postgresql.JSONB(), nullable=False),
+        sa.Column('progress', sa.BigInteger(), nullable=False),
+        sa.Column('total', sa.BigInteger(), nullable=True),
+        sa.Column('result', postgresql.JSONB(), nullable=True),
+        sa.Column('result_path', sa.String(length=500), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('heartbeat_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_jobs_queued_created_at', 'jobs', ['created_at'], unique=False,
+                    postgresql_where=sa.text("status = 'queued'"))
+    op.create_index('ix_jobs_running_heartbeat_at', 'jobs', ['heartbeat_at'], unique=False,
+                    postgresql_where=sa.text("status = 'running'"))
+
+def downgrade() -> None:
+    op.drop_index('ix_jobs_running_heartbeat_at', table_name='jobs')
+    op.drop_index('ix_jobs_queued_created_at', table_name='jobs')
+    op.drop_table('jobs')
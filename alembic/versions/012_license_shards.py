@@ -0,0 +1,30 @@
+"""License shard directory
+
+Revision ID: 012
+Revises: 011
+Create Date: 2025-04-14 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers
+revision: str = '012'
+down_revision: Union[str, None] = '011'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    op.create_table('license_shards',
+        sa.Column('license_number', sa.String(length=50), nullable=False),
+        sa.Column('license_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('shard', sa.String(length=50), nullable=False),
+        sa.PrimaryKeyConstraint('license_number')
+    )
+    op.create_index('ix_license_shards_license_id', 'license_shards', ['license_id'], unique=True)
+
+def downgrade() -> None:
+    op.drop_index('ix_license_shards_license_id', table_name='license_shards')
+    op.drop_table('license_shards')
@@ -0,0 +1,67 @@
+"""ZIP code centroids and license coordinates
+
+Revision ID: 013
+Revises: 012
+Create Date: 2025-04-28 09:00:00.000000
+
+Licenses get the latitude and longitude of their ZIP code's centroid from
+a trigger, for radius searches. The table starts empty; load it with
+cli load-zip-centroids, which also fills in existing licenses. The
+trigger is a BEFORE row trigger on the partitioned table, so this needs
+PostgreSQL 13 or later.
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision: str = '013'
+down_revision: Union[str, None] = '012'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# ZIP+4 codes use the centroid of their five-digit ZIP code; unknown codes get nulls
+COORDINATES_FUNCTION = """
+    CREATE OR REPLACE FUNCTION business_licenses_coordinates() RETURNS trigger AS $$
+    BEGIN
+        SELECT latitude, longitude INTO NEW.latitude, NEW.longitude
+        FROM zip_centroids WHERE zip_code = left(NEW.zip_code, 5);
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+"""
+
+COORDINATES_TRIGGER = """
+    CREATE TRIGGER business_licenses_coordinates
+    BEFORE INSERT OR UPDATE OF zip_code ON business_licenses
+    FOR EACH ROW EXECUTE FUNCTION business_licenses_coordinates()
+"""
+
+def upgrade() -> None:
+    op.create_table('zip_centroids',
+        sa.Column('zip_code', sa.String(length=5), nullable=False),
+        sa.Column('latitude', sa.Float(), nullable=False),
+        sa.Column('longitude', sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint('zip_code')
+    )
+
+    for table in ('business_licenses', 'business_licenses_archive'):
+        op.add_column(table, sa.Column('latitude', sa.Float(), nullable=True))
+        op.add_column(table, sa.Column('longitude', sa.Float(), nullable=True))
+    # Bounding-box prefilter for radius searches; archived searches may scan
+    op.create_index('ix_business_licenses_latitude_longitude', 'business_licenses',
+                    ['latitude', 'longitude'], unique=False)
+
+    op.execute(COORDINATES_FUNCTION)
+    op.execute(COORDINATES_TRIGGER)
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER business_licenses_coordinates ON business_licenses")
+    op.execute("DROP FUNCTION business_licenses_coordinates()")
+
+    op.drop_index('ix_business_licenses_latitude_longitude', table_name='business_licenses')
+    for table in ('business_licenses', 'business_licenses_archive'):
+        op.drop_column(table, 'longitude')
+        op.drop_column(table, 'latitude')
+
+    op.drop_table('zip_centroids')
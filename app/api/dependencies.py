@@ -2,6 +2,7 @@ from fastapi import Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 from typing import Optional
+from datetime import datetime
 from app.core.database import get_db
 from app.schemas.license import LicenseSearchFilters, PaginatedResponse
 from slowapi import Limiter, _rate_limit_exceeded_handler
@@ -30,6 +31,18 @@ async def get_search_filters(
     city: Optional[str] = Query(None, description="City where business is located"),
     state: Optional[str] = Query(None, description="State where business is located"),
     zip_code: Optional[str] = Query(None, description="ZIP code of business"),
+    issuing_authority: Optional[str] = Query(None, description="Authority that issued the license"),
+    expires_before: Optional[datetime] = Query(None, description="Expiring on or before this date"),
+    expires_after: Optional[datetime] = Query(None, description="Expiring on or after this date"),
+    q: Optional[str] = Query(None, description="Full-text search over business name, description and conditions"),
+    highlight: bool = Query(False, description="Include highlighted snippets for full-text matches"),
+    include_archived: bool = Query(False, description="Also search licenses archived long after expiring (slower)"),
+    near_zip: Optional[str] = Query(None, description="Only licenses within radius_miles of this ZIP code's centroid"),
+    radius_miles: Optional[float] = Query(
+        None, gt=0, le=settings.ZIP_SEARCH_MAX_RADIUS_MILES,
+        description=f"Radius for near_zip (default {settings.ZIP_SEARCH_DEFAULT_RADIUS_MILES:g})"
+    ),
+    sort_by_distance: bool = Query(False, description="Nearest to near_zip first"),
 ) -> LicenseSearchFilters:
     return LicenseSearchFilters(
         license_number=license_number,
@@ -39,4 +52,37 @@ async def get_search_filters(
         city=city,
         state=state,
         zip_code=zip_code,
-    )
\ No newline at end of file
+        issuing_authority=issuing_authority,
+        expires_before=expires_before,
+        expires_after=expires_after,
+        q=q,
+        highlight=highlight,
+        include_archived=include_archived,
+        near_zip=near_zip,
+        radius_miles=radius_miles,
+        sort_by_distance=sort_by_distance,
+    )
+
+async def require_writable():
+    """Reject writes on read-only edge deployments"""
+    if settings.EDGE_MODE:
+        raise HTTPException(
+            status_code=status.HTTP_405_METHOD_NOT_ALLOWED,
+            detail="This deployment is read-only"
+        )
+
+async def require_primary_database():
+    """Reject endpoints that need PostgreSQL on edge deployments"""
+    if settings.EDGE_MODE:
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="Not available on edge deployments"
+        )
+
+async def require_unsharded():
+    """Reject endpoints that read licenses from the primary database on sharded deployments"""
+    if settings.SHARD_DATABASE_URLS:
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="Not available on sharded deployments"
+        )
@@ -1,17 +0,0 @@
-from fastapi import APIRouter
-from app.schemas.license import LicenseSchema
-
-router = APIRouter()
-
-@router.post("/licenses/", response_model=LicenseSchema)
-async def create_license(license: LicenseSchema):
-    # Logic to create a license
-    pass
-
-@router.get("/licenses/{license_id}", response_model=LicenseSchema)
-async def get_license(license_id: int):
-    # Logic to retrieve a license by ID
-    pass
-
-def set_routes(app):
-    app.include_router(router)
\ No newline at end of file
@@ -0,0 +1,106 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Query
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+import logging
+
+from app.core.database import get_db
+from app.services.business_service import BusinessService, business_response
+from app.schemas.business import (
+    BusinessCreate,
+    BusinessInclude,
+    BusinessResponse,
+    BusinessListResponse
+)
+from app.api.dependencies import limiter, require_writable, require_primary_database, require_unsharded
+from app.core.config import settings
+
+# Businesses aren't part of edge snapshots, and once sharded their licenses
+# aren't on the primary
+router = APIRouter(
+    prefix="/businesses",
+    tags=["businesses"],
+    dependencies=[Depends(require_primary_database), Depends(require_unsharded)]
+)
+logger = logging.getLogger(__name__)
+
+@router.post(
+    "/",
+    response_model=BusinessResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="Create a new business",
+    description="Create a business that licenses can be registered under",
+    dependencies=[Depends(require_writable)]
+)
+@limiter.limit(f"{settings.RATE_LIMIT_REQUESTS}/{settings.RATE_LIMIT_PERIOD}seconds")
+async def create_business(
+    request: Request,
+    business_data: BusinessCreate,
+    db: AsyncSession = Depends(get_db)
+):
+    """Create a new business"""
+    service = BusinessService(db)
+    
+    try:
+        business_obj = await service.create_business(business_data)
+    except IntegrityError:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="DBA number already exists"
+        )
+    return business_response(business_obj)
+
+@router.get(
+    "/",
+    response_model=BusinessListResponse,
+    summary="List businesses",
+    description="Businesses by ID with keyset pagination, optionally with all their licenses",
+)
+@limiter.limit(f"{settings.RATE_LIMIT_REQUESTS}/{settings.RATE_LIMIT_PERIOD}seconds")
+async def list_businesses(
+    request: Request,
+    include: Optional[BusinessInclude] = Query(None, description="licenses to embed each business's licenses"),
+    cursor: Optional[str] = Query(None, description="Cursor returned as next_cursor by the previous call"),
+    size: int = Query(20, ge=1, le=100, description="Page size"),
+    db: AsyncSession = Depends(get_db)
+):
+    """List businesses"""
+    service = BusinessService(db)
+    
+    try:
+        return await service.list_businesses(
+            after=cursor,
+            size=size,
+            include_licenses=include == BusinessInclude.LICENSES
+        )
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+@router.get(
+    "/{business_id}",
+    response_model=BusinessResponse,
+    summary="Get business by ID",
+    description="Retrieve a business, optionally with all its licenses (two queries in total)",
+)
+@limiter.limit(f"{settings.RATE_LIMIT_REQUESTS}/{settings.RATE_LIMIT_PERIOD}seconds")
+async def get_business(
+    request: Request,
+    business_id: int,
+    include: Optional[BusinessInclude] = Query(None, description="licenses to embed the business's licenses"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get a specific business by ID"""
+    service = BusinessService(db)
+    include_licenses = include == BusinessInclude.LICENSES
+    
+    business_obj = await service.get_business(business_id, include_licenses=include_licenses)
+    if not business_obj:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Business not found"
+        )
+    
+    return business_response(business_obj, include_licenses)
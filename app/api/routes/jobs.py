@@ -0,0 +1,151 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Request, UploadFile, File
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+from uuid import UUID, uuid4
+import json
+import os
+import logging
+
+from app.core.database import get_db
+from app.core.jobs import job_runner
+from app.models.job import JobKind, JobStatus
+from app.services.job_service import JobService, job_response, job_file_path, save_upload, UPLOAD_SUFFIX
+from app.schemas.job import JobCreate, JobResponse, JOB_PARAMS
+from app.api.dependencies import limiter, require_writable, require_primary_database, require_unsharded
+from app.core.config import settings
+
+router = APIRouter(
+    prefix="/jobs",
+    tags=["jobs"],
+    dependencies=[Depends(require_primary_database), Depends(require_unsharded)]
+)
+logger = logging.getLogger(__name__)
+
+@router.post(
+    "/",
+    response_model=JobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Submit a background job",
+    description="Queue a license export, Parquet snapshot or archive run; poll GET /jobs/{id} for progress",
+    dependencies=[Depends(require_writable)]
+)
+@limiter.limit(f"{settings.RATE_LIMIT_REQUESTS}/{settings.RATE_LIMIT_PERIOD}seconds")
+async def submit_job(
+    request: Request,
+    job_data: JobCreate,
+    db: AsyncSession = Depends(get_db)
+):
+    """Submit a background job"""
+    if job_data.kind == JobKind.IMPORT:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Upload import files to /jobs/import"
+        )
+
+    try:
+        params = JOB_PARAMS[job_data.kind](**job_data.params)
+    except ValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=json.loads(e.json())
+        )
+
+    service = JobService(db)
+    job_obj = await service.submit(job_data.kind, json.loads(params.json()))
+    job_runner.notify()
+    return job_response(job_obj)
+
+@router.post(
+    "/import",
+    response_model=JobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Submit a license import",
+    description="Upload a CSV of licenses (same columns as exports) to validate and import in the background",
+    dependencies=[Depends(require_writable)]
+)
+@limiter.limit(f"{settings.RATE_LIMIT_REQUESTS}/{settings.RATE_LIMIT_PERIOD}seconds")
+async def submit_import(
+    request: Request,
+    file: UploadFile = File(..., description="CSV with a header row"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Submit a license import"""
+    job_id = uuid4()
+
+    try:
+        # Blocking file copy, kept off the event loop
+        await run_in_threadpool(save_upload, file.file, job_file_path(job_id, UPLOAD_SUFFIX))
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Import files are limited to {settings.JOB_UPLOAD_MAX_BYTES} bytes"
+        )
+
+    service = JobService(db)
+    job_obj = await service.submit(JobKind.IMPORT, {"filename": file.filename}, job_id=job_id)
+    job_runner.notify()
+    return job_response(job_obj)
+
+@router.get(
+    "/{job_id}",
+    response_model=JobResponse,
+    summary="Get job status",
+    description="Status, progress and, once finished, the result summary of a job"
+)
+@limiter.limit(f"{settings.RATE_LIMIT_REQUESTS}/{settings.RATE_LIMIT_PERIOD}seconds")
+async def get_job(
+    request: Request,
+    job_id: UUID,
+    db: AsyncSession = Depends(get_db)
+):
+    """Get a job by ID"""
+    service = JobService(db)
+
+    job_obj = await service.get_job(job_id)
+    if not job_obj:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+
+    return job_response(job_obj)
+
+@router.get(
+    "/{job_id}/result",
+    summary="Download job result",
+    description="The export file, or the rejected rows of an import"
+)
+@limiter.limit(f"{settings.RATE_LIMIT_REQUESTS}/{settings.RATE_LIMIT_PERIOD}seconds")
+async def download_job_result(
+    request: Request,
+    job_id: UUID,
+    db: AsyncSession = Depends(get_db)
+):
+    """Download the result file of a finished job"""
+    service = JobService(db)
+
+    job_obj = await service.get_job(job_id)
+    if not job_obj:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    if job_obj.status != JobStatus.SUCCEEDED.value:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Job is {job_obj.status}"
+        )
+    if not job_obj.result_path or not os.path.exists(job_obj.result_path):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job has no result file"
+        )
+
+    filename = os.path.basename(job_obj.result_path)
+    return FileResponse(
+        job_obj.result_path,
+        media_type="application/gzip" if filename.endswith(".gz") else "text/csv",
+        filename=f"{job_obj.kind}-{filename}"
+    )
@@ -1,30 +1,66 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import AsyncGenerator, List, Optional
 from uuid import UUID
+import asyncio
+import json
 import logging
 
-from app.core.database import get_db
-from app.services.license_service import LicenseService
+from app.core.database import get_db, is_foreign_key_violation
+from app.core.events import license_events, EventFilter, LicenseEventBroker
+from app.services.sharded_license_service import license_service
+from app.services.business_service import UnknownBusinessError
+from app.services.change_service import ChangeService
+from app.services.expiring_service import ExpiringService
 from app.schemas.license import (
     LicenseCreate,
     LicenseResponse,
     LicenseUpdate,
+    LicenseBulkUpdate,
+    LicenseBulkUpdateResponse,
     LicenseSearchFilters,
-    PaginatedResponse
+    PaginatedResponse,
+    ChangeFeedResponse,
+    ExpiringLicensesResponse,
+    ExpiringSummaryResponse,
+    LicenseStatus,
+    SuggestField,
+    SuggestResponse
+)
+from app.api.dependencies import (
+    CommonQueryParams,
+    get_search_filters,
+    limiter,
+    require_writable,
+    require_primary_database,
+    require_unsharded
 )
-from app.api.dependencies import CommonQueryParams, get_search_filters, limiter
 from app.core.config import settings
 
 router = APIRouter(prefix="/licenses", tags=["licenses"])
 logger = logging.getLogger(__name__)
 
+def _integrity_error(error: IntegrityError) -> HTTPException:
+    """HTTP error for a license write the database rejected"""
+    if is_foreign_key_violation(error):
+        return HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Business does not exist"
+        )
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="License number already exists"
+    )
+
 @router.post(
     "/",
     response_model=LicenseResponse,
     status_code=status.HTTP_201_CREATED,
     summary="Create a new business license",
-    description="Create a new business license with all required information"
+    description="Create a new business license with all required information",
+    dependencies=[Depends(require_writable)]
 )
 @limiter.limit(f"{settings.RATE_LIMIT_REQUESTS}/{settings.RATE_LIMIT_PERIOD}seconds")
 async def create_license(
@@ -33,7 +69,7 @@ async def create_license(
     db: AsyncSession = Depends(get_db)
 ):
     """Create a new business license"""
-    service = LicenseService(db)
+    service = license_service(db)
     
     # Check if license number already exists
     existing = await service.get_license_by_number(license_data.license_number)
@@ -46,6 +82,21 @@ async def create_license(
     try:
         license_obj = await service.create_license(license_data)
         return LicenseResponse.from_orm(license_obj)
+    except IntegrityError as e:
+        # Lost a race with a concurrent create, or the business was deleted
+        # after it was checked; the same on the coalesced path
+        raise _integrity_error(e)
+    except UnknownBusinessError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
+    except ValueError as e:
+        # Sharded deployments: no shard for the license's state
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except Exception as e:
         logger.error(f"Error creating license: {str(e)}")
         raise HTTPException(
@@ -67,7 +118,7 @@ async def search_licenses(
     db: AsyncSession = Depends(get_db)
 ):
     """Search for business licenses with filters"""
-    service = LicenseService(db)
+    service = license_service(db)
     
     try:
         return await service.search_licenses(
@@ -75,6 +126,12 @@ async def search_licenses(
             page=pagination.page,
             size=pagination.size
         )
+    except ValueError as e:
+        # Sharded deployments: page beyond what a search of every shard returns
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except Exception as e:
         logger.error(f"Error searching licenses: {str(e)}")
         raise HTTPException(
@@ -82,6 +139,163 @@ async def search_licenses(
             detail="Failed to search licenses"
         )
 
+@router.get(
+    "/suggest",
+    response_model=SuggestResponse,
+    summary="Suggest business names or license numbers",
+    description="Typeahead suggestions for a business name or license number prefix"
+)
+@limiter.limit(f"{settings.RATE_LIMIT_REQUESTS}/{settings.RATE_LIMIT_PERIOD}seconds")
+async def suggest_licenses(
+    request: Request,
+    prefix: str = Query(..., min_length=1, max_length=255, description="Case-insensitive prefix"),
+    field: SuggestField = Query(SuggestField.BUSINESS_NAME, description="Field to complete"),
+    limit: int = Query(10, ge=1, le=settings.SUGGEST_MAX_LIMIT, description="Maximum number of suggestions"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Suggest completions for a prefix"""
+    service = license_service(db)
+    return await service.suggest(prefix=prefix, field=field, limit=limit)
+
+@router.get(
+    "/changes",
+    response_model=ChangeFeedResponse,
+    summary="List license changes",
+    description="Ordered feed of license creates, updates and deletes after a resume token, for incremental sync",
+    dependencies=[Depends(require_primary_database), Depends(require_unsharded)]
+)
+@limiter.limit(f"{settings.RATE_LIMIT_REQUESTS}/{settings.RATE_LIMIT_PERIOD}seconds")
+async def list_license_changes(
+    request: Request,
+    since: Optional[str] = Query(None, description="Token returned as next_token by the previous call"),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of changes to return"),
+    db: AsyncSession = Depends(get_db)
+):
+    """List license changes after a resume token"""
+    service = ChangeService(db)
+    
+    try:
+        return await service.list_changes(since=since, limit=limit)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid change token"
+        )
+
+def _expiring_horizon(within: int) -> int:
+    if within not in settings.EXPIRING_HORIZONS_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"within must be one of {settings.EXPIRING_HORIZONS_DAYS}"
+        )
+    return within
+
+@router.get(
+    "/expiring",
+    response_model=ExpiringLicensesResponse,
+    summary="List licenses expiring soon",
+    description="Active licenses expiring within a horizon, soonest first, from a periodically refreshed view",
+    dependencies=[Depends(require_primary_database), Depends(require_unsharded)]
+)
+@limiter.limit(f"{settings.RATE_LIMIT_REQUESTS}/{settings.RATE_LIMIT_PERIOD}seconds")
+async def list_expiring_licenses(
+    request: Request,
+    within: int = Query(30, description="Horizon in days"),
+    issuing_authority: Optional[str] = Query(None, description="Exact issuing authority"),
+    state: Optional[str] = Query(None, description="Exact state"),
+    cursor: Optional[str] = Query(None, description="Cursor returned as next_cursor by the previous call"),
+    size: int = Query(100, ge=1, le=1000, description="Page size"),
+    db: AsyncSession = Depends(get_db)
+):
+    """List licenses expiring within a horizon"""
+    service = ExpiringService(db)
+    
+    try:
+        return await service.list_expiring(
+            within_days=_expiring_horizon(within),
+            issuing_authority=issuing_authority,
+            state=state,
+            after=cursor,
+            size=size
+        )
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+@router.get(
+    "/expiring/summary",
+    response_model=ExpiringSummaryResponse,
+    summary="Count licenses expiring soon",
+    description="Licenses expiring within a horizon, counted per issuing authority and state",
+    dependencies=[Depends(require_primary_database), Depends(require_unsharded)]
+)
+@limiter.limit(f"{settings.RATE_LIMIT_REQUESTS}/{settings.RATE_LIMIT_PERIOD}seconds")
+async def summarize_expiring_licenses(
+    request: Request,
+    within: int = Query(30, description="Horizon in days"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Summarize licenses expiring within a horizon"""
+    service = ExpiringService(db)
+    return await service.summary(within_days=_expiring_horizon(within))
+
+async def _license_event_stream(
+    matches: EventFilter,
+    broker: LicenseEventBroker = license_events
+) -> AsyncGenerator[str, None]:
+    # Subscribing once streaming starts ties the subscription to this
+    # generator, so a client that leaves before the first chunk leaks nothing
+    subscription = broker.subscribe(matches)
+    try:
+        while True:
+            try:
+                event = await asyncio.wait_for(
+                    subscription.queue.get(),
+                    timeout=settings.STREAM_HEARTBEAT_INTERVAL
+                )
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            
+            yield f"event: license\ndata: {json.dumps(event)}\n\n"
+            
+            if subscription.overflowed and subscription.queue.empty():
+                # Events were dropped; the client must resync (e.g. from /licenses/changes)
+                yield "event: overflow\ndata: {}\n\n"
+                return
+    finally:
+        subscription.close()
+
+@router.get(
+    "/stream",
+    summary="Stream license changes",
+    description="Server-Sent Events stream of license writes, optionally filtered by license number, state or status",
+    dependencies=[Depends(require_primary_database), Depends(require_unsharded)]
+)
+@limiter.limit(f"{settings.RATE_LIMIT_REQUESTS}/{settings.RATE_LIMIT_PERIOD}seconds")
+async def stream_license_changes(
+    request: Request,
+    license_number: Optional[str] = Query(None, description="Only events for this license number"),
+    state: Optional[str] = Query(None, description="Only events for licenses in this state"),
+    status_filter: Optional[LicenseStatus] = Query(None, alias="status", description="Only events with this resulting status"),
+):
+    """Stream license changes as Server-Sent Events"""
+    def matches(event: dict) -> bool:
+        return (
+            (license_number is None or event.get("license_number") == license_number)
+            and (state is None or event.get("state") == state)
+            and (status_filter is None or event.get("status") == status_filter.value)
+        )
+    
+    # No database session is held: events arrive through the worker's shared LISTEN connection
+    return StreamingResponse(
+        _license_event_stream(matches),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.get(
     "/{license_id}",
     response_model=LicenseResponse,
@@ -95,7 +309,7 @@ async def get_license(
     db: AsyncSession = Depends(get_db)
 ):
     """Get a specific license by ID"""
-    service = LicenseService(db)
+    service = license_service(db)
     
     license_obj = await service.get_license_by_id(license_id)
     if not license_obj:
@@ -119,7 +333,7 @@ async def get_license_by_number(
     db: AsyncSession = Depends(get_db)
 ):
     """Get a specific license by license number"""
-    service = LicenseService(db)
+    service = license_service(db)
     
     license_obj = await service.get_license_by_number(license_number)
     if not license_obj:
@@ -130,11 +344,59 @@ async def get_license_by_number(
     
     return LicenseResponse.from_orm(license_obj)
 
+@router.head(
+    "/number/{license_number}",
+    summary="Check license number exists",
+    description="200 if a license with this number exists, 404 otherwise, without a body"
+)
+@limiter.limit(f"{settings.RATE_LIMIT_REQUESTS}/{settings.RATE_LIMIT_PERIOD}seconds")
+async def check_license_number(
+    request: Request,
+    license_number: str,
+    db: AsyncSession = Depends(get_db)
+):
+    """Check whether a license number exists"""
+    service = license_service(db)
+    
+    exists = await service.license_number_exists(license_number)
+    return Response(status_code=status.HTTP_200_OK if exists else status.HTTP_404_NOT_FOUND)
+
+@router.patch(
+    "/",
+    response_model=LicenseBulkUpdateResponse,
+    summary="Bulk update licenses",
+    description="Apply one update to every license matching the search filters; with dry_run, only count the matches",
+    dependencies=[Depends(require_writable)]
+)
+@limiter.limit(f"{settings.RATE_LIMIT_REQUESTS}/{settings.RATE_LIMIT_PERIOD}seconds")
+async def bulk_update_licenses(
+    request: Request,
+    bulk_update: LicenseBulkUpdate,
+    db: AsyncSession = Depends(get_db)
+):
+    """Update every license matching a set of search filters"""
+    service = license_service(db)
+    
+    try:
+        return await service.bulk_update(bulk_update.filters, bulk_update.update, bulk_update.dry_run)
+    except UnknownBusinessError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
+    except ValueError as e:
+        # No filters or fields, archived licenses, or a state change across shards
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
 @router.put(
     "/{license_id}",
     response_model=LicenseResponse,
     summary="Update license",
-    description="Update an existing business license"
+    description="Update an existing business license",
+    dependencies=[Depends(require_writable)]
 )
 @limiter.limit(f"{settings.RATE_LIMIT_REQUESTS}/{settings.RATE_LIMIT_PERIOD}seconds")
 async def update_license(
@@ -144,9 +406,23 @@ async def update_license(
     db: AsyncSession = Depends(get_db)
 ):
     """Update an existing license"""
-    service = LicenseService(db)
+    service = license_service(db)
     
-    license_obj = await service.update_license(license_id, license_update)
+    try:
+        license_obj = await service.update_license(license_id, license_update)
+    except IntegrityError as e:
+        raise _integrity_error(e)
+    except UnknownBusinessError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
+    except ValueError as e:
+        # Sharded deployments: no shard for the new state
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     if not license_obj:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -159,7 +435,8 @@ async def update_license(
     "/{license_id}",
     status_code=status.HTTP_204_NO_CONTENT,
     summary="Delete license",
-    description="Delete a business license"
+    description="Delete a business license",
+    dependencies=[Depends(require_writable)]
 )
 @limiter.limit(f"{settings.RATE_LIMIT_REQUESTS}/{settings.RATE_LIMIT_PERIOD}seconds")
 async def delete_license(
@@ -168,7 +445,7 @@ async def delete_license(
     db: AsyncSession = Depends(get_db)
 ):
     """Delete a license"""
-    service = LicenseService(db)
+    service = license_service(db)
     
     success = await service.delete_license(license_id)
     if not success:
@@ -0,0 +1,351 @@
+from httpx import AsyncClient
+from sqlalchemy import select, func, delete, text
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import json
+import logging
+import platform
+import random
+import subprocess
+import time
+import uuid
+
+from app.core.bloom import license_number_filter
+from app.core.config import settings
+from app.core.database import engine, AsyncSessionLocal
+from app.models.license import BusinessLicense, LicenseStatus, LicenseType
+
+logger = logging.getLogger(__name__)
+
+# Every benchmark license number starts with this, so seeding is idempotent
+# and cleanup never touches real licenses
+BENCHMARK_PREFIX = "BENCH-"
+
+# Relative weight of each endpoint in the request mix
+WORKLOAD: Dict[str, int] = {
+    "GET /licenses/{license_id}": 45,
+    "GET /licenses/number/{license_number}": 15,
+    "GET /licenses/search": 30,
+    "POST /licenses/": 5,
+    "PUT /licenses/{license_id}": 5,
+}
+
+# A few populous states dominate, as in real registries
+STATES = [("CA", 25), ("TX", 18), ("NY", 14), ("FL", 12), ("IL", 8), ("WA", 6), ("OR", 4), ("NV", 3)]
+CITIES_PER_STATE = 40
+KINDS = ["Bakery", "Hardware", "Salon", "Garage", "Clinic", "Cafe", "Florist", "Tailor"]
+SEARCH_WORDS = ["bakery", "hardware", "salon", "repairs", "fresh", "licensed"]
+
+# Endpoints with fewer measured requests than this are too noisy to compare
+MIN_COMPARED_REQUESTS = 50
+
+SEEDED_COLUMNS = [
+    "id", "license_number", "business_name", "business_type", "status",
+    "issued_date", "expiration_date", "issuing_authority", "street_address",
+    "city", "state", "zip_code", "description", "is_renewable",
+    "created_at", "updated_at",
+]
+
+def _city(rng: random.Random) -> str:
+    # Zipf-like: low numbered cities are much more common
+    return f"City {int(rng.paretovariate(1.2)) % CITIES_PER_STATE}"
+
+def benchmark_license_number(seed: int, i: int) -> str:
+    return f"{BENCHMARK_PREFIX}{seed}-{i:08d}"
+
+def benchmark_rows(n: int, seed: int, start: int = 0) -> List[tuple]:
+    """Deterministic benchmark licenses start..start+n for a seed"""
+    states, weights = zip(*STATES)
+    now = datetime(2025, 1, 1)
+    rows = []
+    for i in range(start, start + n):
+        rng = random.Random(seed * 1_000_003 + i)
+        issued = now - timedelta(days=rng.randint(0, 5 * 365))
+        kind = rng.choice(KINDS)
+        rows.append((
+            uuid.UUID(int=rng.getrandbits(128), version=4),
+            benchmark_license_number(seed, i),
+            f"{kind} {rng.randint(1, 999)}",
+            rng.choice(list(LicenseType)).value,
+            rng.choices(list(LicenseStatus), weights=[70, 10, 5, 15])[0].value,
+            issued,
+            issued + timedelta(days=rng.randint(365, 3 * 365)),
+            "Licensing Board",
+            f"{rng.randint(1, 9999)} Main St",
+            _city(rng),
+            rng.choices(states, weights=weights)[0],
+            f"{rng.randint(90000, 99999)}",
+            f"{kind} licensed and serving the neighbourhood",
+            True,
+            issued,
+            issued,
+        ))
+    return rows
+
+async def seed_benchmark_licenses(rows: int, seed: int, batch_size: int = 10000) -> int:
+    """Insert the benchmark licenses that are missing; returns how many were added"""
+    prefix = f"{BENCHMARK_PREFIX}{seed}-"
+    async with AsyncSessionLocal() as session:
+        existing = await session.scalar(
+            select(func.count())
+            .select_from(BusinessLicense)
+            .where(BusinessLicense.license_number.like(f"{prefix}%"))
+            .where(~BusinessLicense.license_number.like(f"{prefix}N-%"))
+        )
+
+    # COPY bypasses the service layer, so the license number filter is fed
+    # here, before the rows commit; already seeded numbers are added again
+    # in case an earlier load missed the filter
+    for start in range(0, rows, batch_size):
+        await license_number_filter.add_many(
+            benchmark_license_number(seed, i) for i in range(start, min(start + batch_size, rows))
+        )
+    if existing >= rows:
+        return 0
+
+    async with engine.connect() as conn:
+        raw = await conn.get_raw_connection()
+        for start in range(existing, rows, batch_size):
+            await raw.driver_connection.copy_records_to_table(
+                BusinessLicense.__tablename__,
+                records=benchmark_rows(min(batch_size, rows - start), seed, start),
+                columns=SEEDED_COLUMNS,
+            )
+        await conn.commit()
+        await conn.execute(text(f"ANALYZE {BusinessLicense.__tablename__}"))
+        await conn.commit()
+    logger.info(f"Seeded {rows - existing} benchmark licenses")
+    return rows - existing
+
+async def cleanup_benchmark_licenses() -> int:
+    """Delete every benchmark license, seeded or created by a run"""
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            delete(BusinessLicense).where(BusinessLicense.license_number.like(f"{BENCHMARK_PREFIX}%"))
+        )
+        await session.commit()
+        return result.rowcount
+
+async def _targets(seed: int, limit: int = 10000) -> List[Tuple[str, str]]:
+    """(id, license number) of seeded licenses the workload reads and updates"""
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            select(BusinessLicense.id, BusinessLicense.license_number)
+            .where(BusinessLicense.license_number.like(f"{BENCHMARK_PREFIX}{seed}-0%"))
+            .order_by(BusinessLicense.license_number)
+            .limit(limit)
+        )
+        return [(str(row.id), row.license_number) for row in result]
+
+class Workload:
+    """Picks requests from the mix; each client has its own seeded generator"""
+
+    def __init__(self, targets: List[Tuple[str, str]], seed: int, client: int, run: str):
+        self.targets = targets
+        self.rng = random.Random(seed * 7919 + client)
+        self.seed = seed
+        self.client = client
+        self.run = run
+        self.created = 0
+        self.endpoints = list(WORKLOAD)
+        self.weights = list(WORKLOAD.values())
+
+    def _search_params(self) -> Dict[str, Any]:
+        rng = self.rng
+        states = [state for state, _ in STATES]
+        choice = rng.randrange(5)
+        if choice == 0:
+            return {"state": rng.choice(states)}
+        if choice == 1:
+            return {"state": rng.choice(states), "status": "active"}
+        if choice == 2:
+            return {"city": _city(rng), "state": rng.choice(states)}
+        if choice == 3:
+            start = datetime(2025, 1, 1) + timedelta(days=rng.randint(0, 700))
+            return {
+                "expires_after": start.isoformat(),
+                "expires_before": (start + timedelta(days=30)).isoformat(),
+            }
+        return {"q": rng.choice(SEARCH_WORDS)}
+
+    def _new_license(self) -> Dict[str, Any]:
+        self.created += 1
+        issued = datetime(2025, 1, 1) + timedelta(days=self.rng.randint(0, 365))
+        return {
+            "license_number": f"{BENCHMARK_PREFIX}{self.seed}-N-{self.run}-{self.client}-{self.created}",
+            "business_name": f"{self.rng.choice(KINDS)} {self.rng.randint(1, 999)}",
+            "business_type": self.rng.choice(list(LicenseType)).value,
+            "issued_date": issued.isoformat(),
+            "expiration_date": (issued + timedelta(days=365)).isoformat(),
+            "issuing_authority": "Licensing Board",
+            "street_address": "1 Main St",
+            "city": _city(self.rng),
+            "state": self.rng.choice(STATES)[0],
+            "zip_code": f"{self.rng.randint(90000, 99999)}",
+        }
+
+    def next_request(self) -> Tuple[str, str, str, Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """(endpoint, method, path, query params, json body) of the next request"""
+        endpoint = self.rng.choices(self.endpoints, weights=self.weights)[0]
+        license_id, license_number = self.rng.choice(self.targets)
+        prefix = settings.API_V1_STR
+        if endpoint == "GET /licenses/{license_id}":
+            return endpoint, "GET", f"{prefix}/licenses/{license_id}", None, None
+        if endpoint == "GET /licenses/number/{license_number}":
+            return endpoint, "GET", f"{prefix}/licenses/number/{license_number}", None, None
+        if endpoint == "GET /licenses/search":
+            return endpoint, "GET", f"{prefix}/licenses/search", self._search_params(), None
+        if endpoint == "POST /licenses/":
+            return endpoint, "POST", f"{prefix}/licenses/", None, self._new_license()
+        return endpoint, "PUT", f"{prefix}/licenses/{license_id}", None, {
+            "description": f"Benchmark update {self.rng.randint(1, 1_000_000)}"
+        }
+
+def percentile(ordered: List[float], p: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not ordered:
+        return 0.0
+    rank = max(1, round(p / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+def summarize(latencies: Dict[str, List[float]], errors: Dict[str, int], elapsed: float) -> Dict[str, Any]:
+    """Throughput and latency percentiles (ms) per endpoint and overall"""
+    def stats(values: List[float], failed: int) -> Dict[str, Any]:
+        ordered = sorted(values)
+        return {
+            "requests": len(values),
+            "errors": failed,
+            "throughput_rps": round(len(values) / elapsed, 2) if elapsed else 0.0,
+            "mean_ms": round(sum(ordered) / len(ordered) * 1000, 3) if ordered else 0.0,
+            "p50_ms": round(percentile(ordered, 50) * 1000, 3),
+            "p95_ms": round(percentile(ordered, 95) * 1000, 3),
+            "p99_ms": round(percentile(ordered, 99) * 1000, 3),
+        }
+
+    endpoints = {
+        endpoint: stats(latencies.get(endpoint, []), errors.get(endpoint, 0))
+        for endpoint in WORKLOAD
+    }
+    everything = [value for values in latencies.values() for value in values]
+    return {"endpoints": endpoints, "total": stats(everything, sum(errors.values()))}
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any], tolerance: float) -> List[str]:
+    """Regressions of current against baseline beyond a relative tolerance"""
+    regressions = []
+    for endpoint, before in baseline["endpoints"].items():
+        after = current["endpoints"].get(endpoint)
+        if not after or min(before["requests"], after["requests"]) < MIN_COMPARED_REQUESTS:
+            continue
+        for metric in ("p50_ms", "p95_ms", "p99_ms"):
+            if after[metric] > before[metric] * (1 + tolerance):
+                regressions.append(f"{endpoint} {metric}: {before[metric]} -> {after[metric]}")
+        if after["throughput_rps"] < before["throughput_rps"] * (1 - tolerance):
+            regressions.append(
+                f"{endpoint} throughput_rps: {before['throughput_rps']} -> {after['throughput_rps']}"
+            )
+        before_rate = before["errors"] / (before["requests"] + before["errors"])
+        after_rate = after["errors"] / (after["requests"] + after["errors"])
+        if after_rate > before_rate + tolerance / 10:
+            regressions.append(f"{endpoint} error rate: {before_rate:.2%} -> {after_rate:.2%}")
+    return regressions
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+async def run_benchmark(
+    rows: int = settings.BENCHMARK_ROWS,
+    seed: int = settings.BENCHMARK_SEED,
+    concurrency: int = settings.BENCHMARK_CONCURRENCY,
+    duration: float = settings.BENCHMARK_DURATION,
+    warmup: float = settings.BENCHMARK_WARMUP,
+) -> Dict[str, Any]:
+    """Seed, then drive the app in-process with concurrent clients and summarize"""
+    from app.main import app, limiter as app_limiter
+    from app.api.dependencies import limiter
+    from app.core.admission import admission
+    from app.core.cache import cache
+
+    # Before seeding, which feeds the Redis-backed license number filter
+    await cache.init_redis()
+    await seed_benchmark_licenses(rows, seed)
+    targets = await _targets(seed)
+    if not targets:
+        raise RuntimeError("No benchmark licenses to target")
+
+    # Rate limits would throttle the clients rather than measure the app
+    limiter.enabled = app_limiter.enabled = False
+    admission.init_pool(engine)
+    await admission.start()
+
+    run = uuid.uuid4().hex[:8]
+    latencies: Dict[str, List[float]] = {endpoint: [] for endpoint in WORKLOAD}
+    errors: Dict[str, int] = {endpoint: 0 for endpoint in WORKLOAD}
+    started = time.perf_counter()
+    measure_from = started + warmup
+    stop_at = measure_from + duration
+
+    async def client(index: int, http: AsyncClient):
+        workload = Workload(targets, seed, index, run)
+        while True:
+            endpoint, method, path, params, body = workload.next_request()
+            sent = time.perf_counter()
+            if sent >= stop_at:
+                return
+            try:
+                response = await http.request(method, path, params=params, json=body)
+                failed = response.status_code >= 400
+            except Exception as e:
+                logger.error(f"Benchmark request {method} {path} failed: {str(e)}")
+                failed = True
+            received = time.perf_counter()
+            if sent < measure_from:
+                continue
+            if failed:
+                errors[endpoint] += 1
+            else:
+                latencies[endpoint].append(received - sent)
+
+    try:
+        async with AsyncClient(app=app, base_url="http://benchmark") as http:
+            # A lookup that misses would be measured as a fast 404
+            for _, license_number in (targets[0], targets[-1]):
+                response = await http.get(f"{settings.API_V1_STR}/licenses/number/{license_number}")
+                if response.status_code != 200:
+                    raise RuntimeError(
+                        f"Seeded license {license_number} isn't found by number (HTTP {response.status_code})"
+                    )
+            await asyncio.gather(*(client(index, http) for index in range(concurrency)))
+    finally:
+        await admission.stop()
+        await cache.close_redis()
+
+    elapsed = time.perf_counter() - measure_from
+    results = summarize(latencies, errors, elapsed)
+    results["meta"] = {
+        "timestamp": datetime.utcnow().isoformat(),
+        "revision": _git_revision(),
+        "python": platform.python_version(),
+        "rows": rows,
+        "seed": seed,
+        "concurrency": concurrency,
+        "duration": duration,
+        "warmup": warmup,
+        "workload": WORKLOAD,
+        "cache": bool(settings.REDIS_URL),
+        "search_backend": settings.SEARCH_BACKEND,
+    }
+    return results
+
+def write_results(results: Dict[str, Any], path: str) -> None:
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+
+def read_results(path: str) -> Dict[str, Any]:
+    with open(path) as f:
+        return json.load(f)
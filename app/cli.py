@@ -11,6 +11,13 @@ def cli():
     """Database management commands"""
     pass
 
+def _refuse_sharded(command_name: str):
+    """Stop commands that read or load licenses on the primary, which holds none once sharded"""
+    from app.core.shards import shard_router
+
+    if shard_router.enabled:
+        raise click.ClickException(f"{command_name} isn't available on sharded deployments")
+
 @cli.command()
 def init_db():
     """Initialize database with Alembic"""
@@ -57,5 +64,305 @@ def history():
     alembic_cfg = Config("alembic.ini")
     command.history(alembic_cfg)
 
+@cli.command()
+@click.option('--batch-size', '-b', default=settings.EXPIRE_LICENSES_BATCH_SIZE, help='Licenses per batch')
+@click.option('--max-batches', type=int, default=None, help='Stop after this many batches')
+def expire_licenses(batch_size: int, max_batches: int):
+    """Mark active licenses past their expiration date as expired"""
+    from app.core.cache import cache
+    from app.core.shards import shard_router
+    from app.services.expiration_service import ExpirationService
+
+    def report(batches: int, total: int):
+        click.echo(f"Batch {batches}: {total} licenses expired so far")
+
+    async def run():
+        await cache.init_redis()
+        try:
+            total = 0
+            # --max-batches applies to each shard
+            for session_factory in shard_router.license_sessions():
+                async with session_factory() as session:
+                    total += await ExpirationService(session).expire_overdue(
+                        batch_size=batch_size,
+                        max_batches=max_batches,
+                        on_progress=report,
+                    )
+            return total
+        finally:
+            await shard_router.dispose()
+            await cache.close_redis()
+
+    total = asyncio.run(run())
+    click.echo(f"Expired {total} licenses")
+
+@cli.command()
+@click.option('--older-than-years', '-y', default=settings.ARCHIVE_AFTER_YEARS, help='Years past expiration')
+@click.option('--batch-size', '-b', default=settings.ARCHIVE_BATCH_SIZE, help='Licenses per batch')
+@click.option('--max-batches', type=int, default=None, help='Stop after this many batches')
+@click.option('--vacuum/--no-vacuum', default=True, help='VACUUM ANALYZE the live table afterwards')
+def archive_licenses(older_than_years: int, batch_size: int, max_batches: int, vacuum: bool):
+    """Move licenses expired for longer than N years into the archive table"""
+    from app.core.cache import cache
+    from app.core.shards import shard_router
+    from app.services.archive_service import ArchiveService, vacuum_live_table
+
+    def report(batches: int, total: int):
+        click.echo(f"Batch {batches}: {total} licenses archived so far")
+
+    async def run():
+        await cache.init_redis()
+        try:
+            total = 0
+            # Each shard archives its own licenses; --max-batches applies to each
+            for session_factory, license_engine in zip(shard_router.license_sessions(), shard_router.license_engines()):
+                async with session_factory() as session:
+                    archived = await ArchiveService(session).archive_expired(
+                        older_than_years=older_than_years,
+                        batch_size=batch_size,
+                        max_batches=max_batches,
+                        on_progress=report,
+                    )
+                if vacuum and archived:
+                    click.echo("Vacuuming business_licenses...")
+                    await vacuum_live_table(license_engine)
+                total += archived
+            return total
+        finally:
+            await shard_router.dispose()
+            await cache.close_redis()
+
+    total = asyncio.run(run())
+    click.echo(f"Archived {total} licenses")
+
+@cli.command()
+@click.option('--years-ahead', default=settings.PARTITION_YEARS_AHEAD, help='Years past this one to cover')
+def ensure_partitions(years_ahead: int):
+    """Create missing expiration year partitions of business_licenses, on every shard"""
+    from app.core.shards import shard_router
+    from app.core.partitions import ensure_partitions as create_missing
+
+    async def run():
+        created = []
+        try:
+            for license_engine in shard_router.license_engines():
+                async with license_engine.begin() as conn:
+                    created += await conn.run_sync(create_missing, years_ahead)
+        finally:
+            await shard_router.dispose()
+        return sorted(set(created))
+
+    created = asyncio.run(run())
+    click.echo(f"Created partitions for {created}" if created else "No partitions needed")
+
+@cli.command()
+@click.option('--output', '-o', default=settings.EDGE_DATABASE_PATH, help='SQLite file to write')
+@click.option('--state', '-s', 'states', multiple=True, help='Only licenses in this state; repeatable')
+@click.option('--batch-size', '-b', default=settings.EDGE_EXPORT_BATCH_SIZE, help='Licenses per batch')
+def export_edge_snapshot(output: str, states: tuple, batch_size: int):
+    """Export licenses into a SQLite snapshot for read-only edge deployments"""
+    _refuse_sharded("export-edge-snapshot")
+    from app.core.database import AsyncSessionLocal
+    from app.services.edge_snapshot import EdgeSnapshotService
+
+    def report(total: int):
+        click.echo(f"{total} licenses exported so far")
+
+    async def run():
+        async with AsyncSessionLocal() as session:
+            return await EdgeSnapshotService(session).export(
+                output,
+                states=list(states),
+                batch_size=batch_size,
+                on_progress=report,
+            )
+
+    total = asyncio.run(run())
+    click.echo(f"Exported {total} licenses to {output}")
+
+@cli.command()
+@click.option('--output', '-o', default=settings.PARQUET_OUTPUT_DIR, help='Directory holding the snapshots')
+@click.option('--incremental', is_flag=True, help='Only licenses changed since the last snapshot in --output')
+@click.option('--row-group-size', default=settings.PARQUET_ROW_GROUP_SIZE, help='Rows per fetch and row group')
+def export_parquet(output: str, incremental: bool, row_group_size: int):
+    """Write licenses to Parquet files partitioned by state and expiration year"""
+    _refuse_sharded("export-parquet")
+    from app.core.database import AsyncSessionLocal
+    from app.services.parquet_snapshot import ParquetSnapshotService
+
+    async def report(total: int):
+        click.echo(f"{total} licenses written so far")
+
+    async def run():
+        async with AsyncSessionLocal() as session:
+            return await ParquetSnapshotService(session).export(
+                output,
+                incremental=incremental,
+                row_group_size=row_group_size,
+                on_progress=report,
+            )
+
+    try:
+        snapshot = asyncio.run(run())
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    click.echo(f"Wrote {snapshot['rows']} licenses to {output}/{snapshot['id']}")
+
+@cli.command()
+@click.option('--batch-size', '-b', default=settings.SHARD_REBALANCE_BATCH_SIZE, help='Licenses per batch')
+@click.option('--dry-run', is_flag=True, help='Count licenses that would move without moving them')
+def rebalance_shards(batch_size: int, dry_run: bool):
+    """Move licenses to the shard their state maps to and update the shard directory"""
+    from app.core.cache import cache
+    from app.core.shards import shard_router
+    from app.services.sharded_license_service import rebalance_shards as rebalance
+
+    if not shard_router.enabled:
+        raise click.ClickException("SHARD_DATABASE_URLS is not set")
+
+    def report(counts: dict):
+        click.echo(f"{counts['scanned']} licenses scanned, {counts['moved']} {'to move' if dry_run else 'moved'}")
+
+    async def run():
+        await cache.init_redis()
+        try:
+            return await rebalance(batch_size=batch_size, dry_run=dry_run, on_progress=report)
+        finally:
+            await shard_router.dispose()
+            await cache.close_redis()
+
+    counts = asyncio.run(run())
+    click.echo(f"{'Would move' if dry_run else 'Moved'} {counts['moved']} of {counts['scanned']} licenses")
+
+@cli.command()
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--batch-size', '-b', default=settings.ZIP_CENTROID_BATCH_SIZE, help='Centroids per upsert and licenses per update')
+def load_zip_centroids(path: str, batch_size: int):
+    """Load ZIP code centroids from a CSV or tab-separated file and update license coordinates
+
+    The file needs a header row with zip (or GEOID), lat (or INTPTLAT) and
+    lon (or INTPTLONG) columns, as in the Census ZCTA Gazetteer file.
+    """
+    from app.core.shards import shard_router
+    from app.services.zip_service import load_zip_centroids as load
+
+    def report(scanned: int, updated: int):
+        click.echo(f"{scanned} licenses checked, {updated} coordinates updated")
+
+    async def run():
+        try:
+            return await load(path, batch_size=batch_size, on_progress=report)
+        finally:
+            await shard_router.dispose()
+
+    try:
+        counts = asyncio.run(run())
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    click.echo(f"Loaded {counts['centroids']} ZIP centroids; updated coordinates of {counts['licenses']} licenses")
+
+@cli.command()
+@click.option('--workers', '-w', default=settings.JOB_WORKERS, help='Job processes')
+def run_jobs(workers: int):
+    """Run queued background jobs (POST /jobs) until interrupted"""
+    from app.core.jobs import job_runner
+    from app.core.shards import shard_router
+
+    if shard_router.enabled:
+        # Jobs read and write licenses on the primary database
+        raise click.ClickException("Jobs aren't available on sharded deployments")
+
+    async def run():
+        await job_runner.start(workers)
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await job_runner.stop()
+
+    click.echo(f"Running jobs with {workers} workers; Ctrl-C to stop")
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        click.echo("Stopped taking jobs")
+
+@cli.command()
+@click.option('--rows', '-n', type=int, required=True, help='Licenses to generate')
+@click.option('--seed', default=settings.SEED_RANDOM_SEED, help='Same seed and --as-of, same rows')
+@click.option('--workers', '-w', default=settings.SEED_WORKERS, help='Generator processes')
+@click.option('--chunk-size', default=settings.SEED_CHUNK_SIZE, help='Rows per chunk')
+@click.option('--prefix', default='GEN-', help='License number prefix')
+@click.option('--as-of', type=click.DateTime(formats=['%Y-%m-%d']), default=None, help='Date expirations are spread around (default today)')
+@click.option('--drop-indexes/--keep-indexes', default=True, help='Rebuild secondary indexes after loading')
+def generate_licenses(rows: int, seed: int, workers: int, chunk_size: int, prefix: str,
+                      as_of, drop_indexes: bool):
+    """Bulk load synthetic licenses with realistic distributions via COPY"""
+    # Loaded rows would get no shard directory entries, so nothing could find them
+    _refuse_sharded("generate-licenses")
+    import time
+    from app.seed import generate_licenses as generate
+
+    started = time.monotonic()
+
+    def report(total: int):
+        click.echo(f"{total} licenses loaded ({total / (time.monotonic() - started):,.0f}/s)")
+
+    total = asyncio.run(generate(
+        rows,
+        seed=seed,
+        workers=workers,
+        chunk_size=chunk_size,
+        prefix=prefix,
+        as_of=as_of,
+        drop_indexes=drop_indexes,
+        on_progress=report,
+    ))
+    click.echo(f"Generated {total} licenses in {time.monotonic() - started:.0f}s")
+    # COPY writes no change log entries for incremental snapshots to follow
+    click.echo("Take a full export-parquet snapshot before the next incremental one")
+
+@cli.command()
+@click.option('--rows', '-n', default=settings.BENCHMARK_ROWS, help='Benchmark licenses to seed')
+@click.option('--seed', default=settings.BENCHMARK_SEED, help='Seed for the dataset and request mix')
+@click.option('--concurrency', '-c', default=settings.BENCHMARK_CONCURRENCY, help='Concurrent clients')
+@click.option('--duration', '-d', default=settings.BENCHMARK_DURATION, help='Seconds to measure')
+@click.option('--warmup', default=settings.BENCHMARK_WARMUP, help='Seconds to run before measuring')
+@click.option('--output', '-o', default='benchmark.json', help='File to write results to')
+@click.option('--baseline', type=click.Path(exists=True), default=None, help='Results to compare against')
+@click.option('--tolerance', default=settings.BENCHMARK_REGRESSION_TOLERANCE, help='Relative change counted as a regression')
+@click.option('--cleanup', is_flag=True, help='Delete all benchmark licenses afterwards')
+def benchmark(rows: int, seed: int, concurrency: int, duration: float, warmup: float,
+              output: str, baseline: str, tolerance: float, cleanup: bool):
+    """Measure throughput and latency percentiles per endpoint under a mixed load"""
+    _refuse_sharded("benchmark")
+    from app.benchmark import (
+        run_benchmark, cleanup_benchmark_licenses, compare_results, read_results, write_results
+    )
+
+    async def run():
+        try:
+            return await run_benchmark(rows, seed, concurrency, duration, warmup)
+        finally:
+            if cleanup:
+                click.echo(f"Deleted {await cleanup_benchmark_licenses()} benchmark licenses")
+
+    results = asyncio.run(run())
+    write_results(results, output)
+
+    click.echo(f"{'endpoint':<40} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for endpoint, stats in list(results["endpoints"].items()) + [("total", results["total"])]:
+        click.echo(
+            f"{endpoint:<40} {stats['throughput_rps']:>9} {stats['p50_ms']:>9} "
+            f"{stats['p95_ms']:>9} {stats['p99_ms']:>9} {stats['errors']:>7}"
+        )
+    click.echo(f"Results written to {output}")
+
+    if baseline:
+        regressions = compare_results(read_results(baseline), results, tolerance)
+        for regression in regressions:
+            click.echo(f"REGRESSION {regression}")
+        if regressions:
+            raise SystemExit(1)
+        click.echo(f"No regressions against {baseline}")
+
 if __name__ == '__main__':
     cli()
\ No newline at end of file
@@ -0,0 +1,140 @@
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+from typing import Optional, Dict, Any
+import asyncio
+import logging
+import time
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+# Admission levels, from least to most restrictive
+ADMIT_ALL = 0
+SHED_EXPENSIVE = 1
+SHED_ALL = 2
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that counts callers currently waiting for a connection"""
+
+    waiting: int = 0
+
+    def _do_get(self):
+        self.waiting += 1
+        try:
+            return super()._do_get()
+        finally:
+            self.waiting -= 1
+
+class AdmissionController:
+    """Tracks pool and event loop saturation and decides which requests to admit"""
+
+    def __init__(self):
+        self.pool: Optional[InstrumentedQueuePool] = None
+        self.loop_lag_ms: float = 0.0
+        self._monitor_task: Optional[asyncio.Task] = None
+
+    def init_pool(self, engine) -> None:
+        """Watch the connection pool of an Engine or AsyncEngine"""
+        sync_engine = getattr(engine, "sync_engine", engine)
+        if isinstance(sync_engine.pool, InstrumentedQueuePool):
+            self.pool = sync_engine.pool
+
+    async def start(self):
+        """Start sampling event loop lag"""
+        if self._monitor_task is None:
+            self._monitor_task = asyncio.create_task(self._monitor_loop_lag())
+
+    async def stop(self):
+        """Stop sampling event loop lag"""
+        if self._monitor_task:
+            self._monitor_task.cancel()
+            try:
+                await self._monitor_task
+            except asyncio.CancelledError:
+                pass
+            self._monitor_task = None
+
+    async def _monitor_loop_lag(self):
+        interval = settings.ADMISSION_LAG_SAMPLE_INTERVAL
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(interval)
+            lag_ms = max(0.0, (time.perf_counter() - start - interval) * 1000)
+            # Exponential moving average so a single slow tick doesn't flip the level
+            self.loop_lag_ms = 0.7 * self.loop_lag_ms + 0.3 * lag_ms
+
+    @property
+    def pool_waiting(self) -> int:
+        return self.pool.waiting if self.pool else 0
+
+    @property
+    def level(self) -> int:
+        """Current admission level based on pool waiters and loop lag"""
+        if (
+            self.pool_waiting >= settings.ADMISSION_SHED_ALL_POOL_WAITERS
+            or self.loop_lag_ms >= settings.ADMISSION_SHED_ALL_LOOP_LAG_MS
+        ):
+            return SHED_ALL
+        if (
+            self.pool_waiting >= settings.ADMISSION_SHED_EXPENSIVE_POOL_WAITERS
+            or self.loop_lag_ms >= settings.ADMISSION_SHED_EXPENSIVE_LOOP_LAG_MS
+        ):
+            return SHED_EXPENSIVE
+        return ADMIT_ALL
+
+    def is_expensive(self, path: str) -> bool:
+        if path.startswith(settings.API_V1_STR):
+            path = path[len(settings.API_V1_STR):]
+        return any(path.startswith(prefix) for prefix in settings.ADMISSION_EXPENSIVE_PATHS)
+
+    def should_shed(self, path: str) -> bool:
+        if any(path.startswith(prefix) for prefix in settings.ADMISSION_EXEMPT_PATHS):
+            return False
+        level = self.level
+        if level == SHED_ALL:
+            return True
+        return level == SHED_EXPENSIVE and self.is_expensive(path)
+
+    def status(self) -> Dict[str, Any]:
+        """Saturation snapshot for readiness reports"""
+        pool_status: Dict[str, Any] = {"waiting": self.pool_waiting}
+        if self.pool:
+            pool_status.update(
+                size=self.pool.size(),
+                checked_out=self.pool.checkedout(),
+                overflow=self.pool.overflow(),
+            )
+        return {
+            "level": ["admit_all", "shed_expensive", "shed_all"][self.level],
+            "pool": pool_status,
+            "loop_lag_ms": round(self.loop_lag_ms, 1),
+        }
+
+class AdmissionControlMiddleware:
+    """Fails fast with 503 and Retry-After when the worker is saturated"""
+
+    def __init__(self, app: ASGIApp, controller: "AdmissionController" = None):
+        self.app = app
+        self.controller = controller or admission
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if (
+            scope["type"] != "http"
+            or not settings.ADMISSION_CONTROL_ENABLED
+            or not self.controller.should_shed(scope["path"])
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        logger.warning(f"Shedding request {scope['method']} {scope['path']}: {self.controller.status()}")
+        response = JSONResponse(
+            status_code=503,
+            content={"detail": "Service temporarily overloaded"},
+            headers={"Retry-After": str(settings.ADMISSION_RETRY_AFTER)},
+        )
+        await response(scope, receive, send)
+
+# Global admission controller instance
+admission = AdmissionController()
@@ -0,0 +1,158 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, union_all
+from typing import Iterable, List
+import asyncio
+import hashlib
+import logging
+import math
+
+from .cache import cache
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+# Sets a value's bits, and while a rebuild is under way also in the bitmap
+# being built; as one script it can't interleave with the rebuild's swap
+_ADD_SCRIPT = """
+local building = redis.call('EXISTS', KEYS[2]) == 1
+for _, position in ipairs(ARGV) do
+    redis.call('SETBIT', KEYS[1], position, 1)
+    if building then
+        redis.call('SETBIT', KEYS[2], position, 1)
+    end
+end
+"""
+
+class BloomFilter:
+    """Bloom filter over license numbers, stored as a Redis bitmap shared by all workers
+
+    Answers "definitely absent" or "maybe present". Deleted numbers keep their
+    bits until the next rebuild, which only costs a database lookup.
+    """
+
+    def __init__(
+        self,
+        key: str = settings.BLOOM_FILTER_KEY,
+        capacity: int = settings.BLOOM_FILTER_CAPACITY,
+        error_rate: float = settings.BLOOM_FILTER_ERROR_RATE,
+    ):
+        self.key = key
+        self.building_key = f"{key}:building"
+        # Standard sizing: m = -n ln p / (ln 2)^2 bits, k = m/n ln 2 hashes
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+
+    def positions(self, value: str) -> List[int]:
+        """Bit positions for a value, by double hashing one 128-bit digest"""
+        digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    @property
+    def enabled(self) -> bool:
+        # Built from the primary's tables, which hold no licenses once sharded;
+        # the license_shards directory answers existence there instead
+        return settings.BLOOM_FILTER_ENABLED and cache.redis_client is not None and not settings.SHARD_DATABASE_URLS
+
+    async def might_contain(self, value: str) -> bool:
+        """False only if the value was certainly never added"""
+        if not self.enabled:
+            return True
+        try:
+            async with cache.redis_client.pipeline(transaction=False) as pipe:
+                pipe.exists(self.key)
+                for position in self.positions(value):
+                    pipe.getbit(self.key, position)
+                built, *bits = await pipe.execute()
+            # Until the filter has been built every answer is "maybe"
+            return not built or all(bits)
+        except Exception as e:
+            logger.error(f"Error reading license number filter: {str(e)}")
+            return True
+
+    async def add(self, value: str) -> None:
+        """Add a value; call before committing the row that introduces it"""
+        await self.add_many([value])
+
+    async def add_many(self, values: Iterable[str]) -> None:
+        """Add several values in one round trip, e.g. a bulk-loaded chunk"""
+        if not self.enabled:
+            return
+        positions = [position for value in values for position in self.positions(value)]
+        if not positions:
+            return
+        try:
+            await cache.redis_client.eval(_ADD_SCRIPT, 2, self.key, self.building_key, *positions)
+        except Exception as e:
+            # A missed add would make the filter lie about an existing number;
+            # drop it so lookups fall through to the database until rebuilt
+            logger.error(f"Error updating license number filter, invalidating: {str(e)}")
+            try:
+                await cache.redis_client.delete(self.key)
+            except Exception:
+                pass
+
+    async def rebuild(self, db: AsyncSession) -> int:
+        """Build the filter from the table, or the shard directory, and swap it in; returns the number of entries"""
+        from app.models.license import BusinessLicense
+        from app.models.license_archive import BusinessLicenseArchive
+        from app.models.license_shard import LicenseShard
+        from .shards import shard_router
+
+        if not self.enabled:
+            return 0
+        # Concurrent builds would clobber each other's bitmap
+        lock_key = f"{self.key}:lock"
+        if not await cache.redis_client.set(lock_key, 1, nx=True, ex=600):
+            logger.info("License number filter is already being rebuilt")
+            return 0
+
+        streamed_key = f"{self.key}:streamed"
+        try:
+            # From here on every add also reaches the new bitmap. Creates that
+            # added before this are given the margin to commit, so the scan
+            # below sees them
+            await cache.redis_client.set(self.building_key, b"")
+            await asyncio.sleep(settings.BLOOM_FILTER_REBUILD_MARGIN)
+
+            bits = bytearray((self.size + 7) // 8)
+            count = 0
+            if shard_router.enabled:
+                # The primary's directory lists the numbers on every shard
+                numbers = select(LicenseShard.license_number)
+            else:
+                # Archived licenses are still found by number, so they stay in the filter
+                numbers = select(union_all(
+                    select(BusinessLicense.license_number),
+                    select(BusinessLicenseArchive.license_number),
+                ).subquery().c.license_number)
+            result = await db.stream_scalars(numbers.execution_options(yield_per=10000))
+            async for license_number in result:
+                for position in self.positions(license_number):
+                    # Redis bitmaps number bits from the most significant bit of each byte
+                    bits[position >> 3] |= 0x80 >> (position & 7)
+                count += 1
+
+            await cache.redis_client.set(streamed_key, bytes(bits))
+            await cache.redis_client.bitop("OR", self.building_key, self.building_key, streamed_key)
+            await cache.redis_client.rename(self.building_key, self.key)
+        finally:
+            await cache.redis_client.delete(self.building_key, streamed_key, lock_key)
+
+        logger.info(f"Rebuilt license number filter with {count} entries ({self.size} bits, {self.hashes} hashes)")
+        return count
+
+    async def ensure_built(self, db: AsyncSession) -> None:
+        """Build the filter unless it exists; only one worker builds at a time"""
+        if not self.enabled:
+            return
+        try:
+            if await cache.redis_client.exists(self.key):
+                return
+            await self.rebuild(db)
+        except Exception as e:
+            logger.error(f"Error building license number filter: {str(e)}")
+
+# Global license number filter instance
+license_number_filter = BloomFilter()
@@ -1,5 +1,5 @@
 import redis.asyncio as redis
-from typing import Optional, Any
+from typing import Optional, Any, Iterable
 import json
 import pickle
 from .config import settings
@@ -55,6 +55,22 @@ class CacheManager:
         except Exception:
             return False
     
+    async def delete_many(self, keys: Iterable[str], batch_size: int = 500) -> bool:
+        """Delete keys in pipelined batches"""
+        if not self.redis_client:
+            return False
+            
+        try:
+            keys = list(keys)
+            for start in range(0, len(keys), batch_size):
+                async with self.redis_client.pipeline(transaction=False) as pipe:
+                    for key in keys[start:start + batch_size]:
+                        pipe.delete(key)
+                    await pipe.execute()
+            return True
+        except Exception:
+            return False
+    
     async def exists(self, key: str) -> bool:
         """Check if key exists in cache"""
         if not self.redis_client:
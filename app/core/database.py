@@ -1,15 +1,60 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import DeclarativeBase
+from fastapi import Request
 from typing import AsyncGenerator
 from .config import settings
+from .query_log import slow_query_logger
+from .admission import InstrumentedQueuePool
+from .timeouts import apply_statement_timeout, statement_timeout_for
+
+def edge_database_url(path: str, read_only: bool = True) -> str:
+    """aiosqlite URL for an edge snapshot file"""
+    if read_only:
+        # SQLite URI filename, so the file is opened with mode=ro
+        return f"sqlite+aiosqlite:///file:{path}?mode=ro&uri=true"
+    return f"sqlite+aiosqlite:///{path}"
+
+def create_edge_engine(path: str = settings.EDGE_DATABASE_PATH) -> AsyncEngine:
+    """Engine reading a SQLite edge snapshot; every connection is read-only"""
+    edge_engine = create_async_engine(
+        edge_database_url(path),
+        pool_size=settings.DATABASE_POOL_SIZE,
+        max_overflow=settings.DATABASE_MAX_OVERFLOW,
+        pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+        poolclass=InstrumentedQueuePool,
+        echo=settings.DEBUG,
+    )
+
+    @event.listens_for(edge_engine.sync_engine, "connect")
+    def _configure_connection(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA query_only = ON")
+        cursor.execute(f"PRAGMA mmap_size = {int(settings.EDGE_MMAP_SIZE)}")
+        cursor.close()
+
+    return edge_engine
+
+def create_database_engine(url: str) -> AsyncEngine:
+    """Pooled engine for the primary database or a shard"""
+    return create_async_engine(
+        url,
+        pool_size=settings.DATABASE_POOL_SIZE,
+        max_overflow=settings.DATABASE_MAX_OVERFLOW,
+        pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+        poolclass=InstrumentedQueuePool,
+        echo=settings.DEBUG,
+    )
 
 # Create async engine
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    pool_size=settings.DATABASE_POOL_SIZE,
-    max_overflow=settings.DATABASE_MAX_OVERFLOW,
-    echo=settings.DEBUG,
-)
+if settings.EDGE_MODE:
+    engine = create_edge_engine()
+else:
+    engine = create_database_engine(settings.DATABASE_URL)
+
+# Log slow statements with their filter set and, optionally, sampled plans
+slow_query_logger.install(engine)
 
 # Create async session factory
 AsyncSessionLocal = async_sessionmaker(
@@ -18,9 +63,22 @@ AsyncSessionLocal = async_sessionmaker(
     expire_on_commit=False,
 )
 
-async def get_db() -> AsyncGenerator[AsyncSession, None]:
+FOREIGN_KEY_VIOLATION = "23503"
+
+def is_foreign_key_violation(error: IntegrityError) -> bool:
+    """Whether an IntegrityError came from a foreign key rather than a unique constraint"""
+    sqlstate = getattr(error.orig, "sqlstate", None)
+    if sqlstate:
+        return sqlstate == FOREIGN_KEY_VIOLATION
+    # SQLite reports no SQLSTATE
+    return "FOREIGN KEY" in str(error.orig)
+
+async def get_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
     """Dependency to get database session"""
     async with AsyncSessionLocal() as session:
+        # Kept in info so sessions opened on shards for this request get the same timeout
+        session.info["statement_timeout_ms"] = statement_timeout_for(request)
+        apply_statement_timeout(session, session.info["statement_timeout_ms"])
         try:
             yield session
         except Exception:
@@ -0,0 +1,125 @@
+from sqlalchemy.engine import make_url
+import asyncpg
+from typing import Any, Callable, Dict, Optional, Set
+import asyncio
+import json
+import logging
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+EventFilter = Callable[[Dict[str, Any]], bool]
+
+class Subscription:
+    """A bounded queue of events matching one subscriber's filter"""
+
+    def __init__(self, broker: "LicenseEventBroker", matches: EventFilter, maxsize: int):
+        self.broker = broker
+        self.matches = matches
+        self.queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue(maxsize=maxsize)
+        self.overflowed = False
+
+    def offer(self, event: Dict[str, Any]) -> None:
+        if self.overflowed or not self.matches(event):
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # A subscriber that can't keep up is dropped rather than buffered without bound
+            self.overflowed = True
+
+    def close(self) -> None:
+        self.broker.unsubscribe(self)
+
+class LicenseEventBroker:
+    """Holds one LISTEN connection per worker and fans notifications out to subscribers"""
+
+    def __init__(self, channel: str = settings.LICENSE_EVENTS_CHANNEL, database_url: str = None):
+        self.channel = channel
+        self.database_url = database_url or settings.DATABASE_URL
+        self.subscriptions: Set[Subscription] = set()
+        self._connection = None
+        self._supervisor: Optional[asyncio.Task] = None
+        self._lost = asyncio.Event()
+
+    @property
+    def dsn(self) -> str:
+        # asyncpg takes a plain libpq-style URL without the SQLAlchemy driver suffix
+        url = make_url(self.database_url).set(drivername="postgresql")
+        return url.render_as_string(hide_password=False)
+
+    async def start(self):
+        """Start listening; reconnects in the background if the connection drops"""
+        if self._supervisor is None and make_url(self.database_url).get_backend_name() == "postgresql":
+            self._supervisor = asyncio.create_task(self._supervise())
+
+    async def stop(self):
+        """Stop listening and release the connection"""
+        if self._supervisor:
+            self._supervisor.cancel()
+            try:
+                await self._supervisor
+            except asyncio.CancelledError:
+                pass
+            self._supervisor = None
+        await self._close()
+
+    async def _supervise(self):
+        backoff = 1
+        while True:
+            try:
+                await self._connect()
+                backoff = 1
+                await self._lost.wait()
+                logger.warning("License event listener connection lost, reconnecting")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error connecting license event listener: {str(e)}")
+            await self._close()
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 30)
+
+    async def _connect(self):
+        self._lost.clear()
+        self._connection = await asyncpg.connect(self.dsn)
+        self._connection.add_termination_listener(lambda conn: self._lost.set())
+        await self._connection.add_listener(self.channel, self._on_notification)
+        logger.info(f"Listening for license events on {self.channel}")
+
+    async def _close(self):
+        if self._connection is not None:
+            connection, self._connection = self._connection, None
+            try:
+                await connection.close(timeout=5)
+            except Exception:
+                connection.terminate()
+
+    @property
+    def listening(self) -> bool:
+        return self._connection is not None and not self._lost.is_set()
+
+    def _on_notification(self, connection, pid, channel, payload: str):
+        try:
+            event = json.loads(payload)
+        except ValueError:
+            logger.error(f"Ignoring malformed license event: {payload}")
+            return
+        self.publish(event)
+
+    def publish(self, event: Dict[str, Any]) -> None:
+        """Deliver an event to every matching subscriber in this worker"""
+        for subscription in list(self.subscriptions):
+            subscription.offer(event)
+
+    def subscribe(self, matches: EventFilter) -> Subscription:
+        subscription = Subscription(self, matches, settings.STREAM_SUBSCRIBER_QUEUE_SIZE)
+        self.subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self.subscriptions.discard(subscription)
+
+# Global license event broker instance
+license_events = LicenseEventBroker()
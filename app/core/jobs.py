@@ -0,0 +1,137 @@
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional, Set
+from uuid import UUID
+import asyncio
+import logging
+import multiprocessing
+import os
+
+from .config import settings
+from .database import engine, AsyncSessionLocal
+from .cache import cache
+
+logger = logging.getLogger(__name__)
+
+def run_job(job_id: str) -> None:
+    """Process pool entry point: run one claimed job to completion"""
+    logging.basicConfig(level=getattr(logging, settings.LOG_LEVEL), format=settings.LOG_FORMAT)
+    asyncio.run(_run_job(UUID(job_id)))
+
+async def _heartbeat(job_id: UUID) -> None:
+    from app.services.job_service import JobService
+
+    while True:
+        await asyncio.sleep(settings.JOB_HEARTBEAT_TIMEOUT / 3)
+        async with AsyncSessionLocal() as session:
+            await JobService(session).heartbeat(job_id)
+
+async def _run_job(job_id: UUID) -> None:
+    from app.services.job_service import JobService, JOB_HANDLERS
+
+    async def report(progress: int, total: Optional[int]) -> None:
+        # Own session: the handler's transaction may still be open
+        async with AsyncSessionLocal() as session:
+            await JobService(session).heartbeat(job_id, progress=progress, total=total)
+
+    await cache.init_redis()
+    heartbeat = asyncio.create_task(_heartbeat(job_id))
+    try:
+        async with AsyncSessionLocal() as session:
+            job = await JobService(session).get_job(job_id)
+            logger.info(f"Running {job.kind} job {job_id} (attempt {job.attempts})")
+            try:
+                result, result_path = await JOB_HANDLERS[job.kind](session, job, report)
+            except Exception as e:
+                logger.exception(f"Job {job_id} failed")
+                await session.rollback()
+                await JobService(session).fail(job_id, f"{type(e).__name__}: {e}")
+                return
+            await JobService(session).finish(job_id, result, result_path)
+            logger.info(f"Job {job_id} succeeded: {result}")
+    finally:
+        heartbeat.cancel()
+        await asyncio.gather(heartbeat, return_exceptions=True)
+        await cache.close_redis()
+        # Pooled connections belong to this job's event loop; the process
+        # runs the next job under a new one
+        await engine.dispose()
+
+class JobRunner:
+    """Feeds queued jobs from the jobs table to a pool of worker processes
+
+    Exports, imports and archive runs do their database work, validation,
+    CSV encoding and compression in those processes, never on the event
+    loop serving requests. Any number of runners (API workers or cli
+    run-jobs) may share the queue.
+    """
+
+    def __init__(self):
+        self.workers = settings.JOB_WORKERS
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+        self._running: Set[asyncio.Future] = set()
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        # spawn, not fork: a forked child would inherit this process's event
+        # loop and open connections
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+
+    async def start(self, workers: int = settings.JOB_WORKERS):
+        """Start the pool and the dispatch loop"""
+        os.makedirs(settings.JOB_RESULTS_DIR, exist_ok=True)
+        self.workers = workers
+        self._pool = self._new_pool()
+        self._task = asyncio.create_task(self._dispatch())
+        logger.info(f"Job runner started with {workers} workers")
+
+    async def stop(self):
+        """Stop taking jobs; jobs already running finish in their processes"""
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._pool:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def notify(self) -> None:
+        """Check the queue now instead of at the next poll"""
+        self._wakeup.set()
+
+    async def _dispatch(self):
+        from app.services.job_service import JobService
+
+        loop = asyncio.get_running_loop()
+        while True:
+            self._wakeup.clear()
+            try:
+                while len(self._running) < self.workers:
+                    async with AsyncSessionLocal() as session:
+                        job = await JobService(session).claim_next()
+                    if job is None:
+                        break
+                    future = loop.run_in_executor(self._pool, run_job, str(job.id))
+                    self._running.add(future)
+                    future.add_done_callback(self._job_done)
+            except Exception as e:
+                logger.error(f"Error dispatching jobs: {str(e)}")
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=settings.JOB_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+    def _job_done(self, future: asyncio.Future) -> None:
+        self._running.discard(future)
+        if not future.cancelled() and future.exception():
+            error = future.exception()
+            # The job itself is retried once its heartbeat goes stale
+            logger.error(f"Job process failed: {error!r}")
+            if isinstance(error, BrokenProcessPool) and self._pool:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = self._new_pool()
+        self._wakeup.set()
+
+# Global job runner instance
+job_runner = JobRunner()
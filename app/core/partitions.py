@@ -0,0 +1,201 @@
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from datetime import datetime
+from typing import List, Set
+import logging
+import re
+
+from .config import settings
+from .shards import shard_router
+
+logger = logging.getLogger(__name__)
+
+# business_licenses is range partitioned by expiration year (migration 009):
+# one partition per year plus a default partition for anything outside them
+TABLE = "business_licenses"
+DEFAULT_PARTITION = f"{TABLE}_default"
+REGISTRY = "license_number_registry"
+UNPARTITIONED = f"{TABLE}_unpartitioned"
+
+# Unique indexes on a partitioned table must include the partition key, so
+# global license_number uniqueness is enforced by a registry kept in step by
+# a trigger instead
+REGISTRY_DDL = [
+    f"""
+    CREATE TABLE IF NOT EXISTS {REGISTRY} (
+        license_number varchar(50) PRIMARY KEY,
+        license_id uuid NOT NULL
+    )
+    """,
+    f"""
+    CREATE OR REPLACE FUNCTION {REGISTRY}_sync() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            DELETE FROM {REGISTRY} WHERE license_number = OLD.license_number AND license_id = OLD.id;
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            INSERT INTO {REGISTRY} (license_number, license_id) VALUES (NEW.license_number, NEW.id);
+        END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+]
+
+REGISTRY_TRIGGER_DDL = f"""
+    CREATE TRIGGER {REGISTRY}_sync
+    AFTER INSERT OR DELETE OR UPDATE OF license_number, id ON {TABLE}
+    FOR EACH ROW EXECUTE FUNCTION {REGISTRY}_sync()
+"""
+
+def partition_name(year: int) -> str:
+    return f"{TABLE}_y{year}"
+
+def _copy_columns(conn: Connection, table: str) -> str:
+    """Column list for copying rows, leaving out generated columns"""
+    rows = conn.execute(text(
+        "SELECT column_name FROM information_schema.columns "
+        "WHERE table_name = :table AND table_schema = current_schema() AND is_generated = 'NEVER' "
+        "ORDER BY ordinal_position"
+    ), {"table": table})
+    return ", ".join(row.column_name for row in rows)
+
+def _index_definitions(conn: Connection, table: str) -> List[tuple]:
+    """(name, definition) of every index on a table except its primary key"""
+    rows = conn.execute(text(
+        "SELECT indexname, indexdef FROM pg_indexes "
+        "WHERE tablename = :table AND schemaname = current_schema() AND indexname <> :pkey"
+    ), {"table": table, "pkey": f"{table}_pkey"})
+    return [(row.indexname, row.indexdef) for row in rows]
+
+def is_partitioned(conn: Connection) -> bool:
+    relkind = conn.scalar(text("SELECT relkind::text FROM pg_class WHERE oid = to_regclass(:table)"), {"table": TABLE})
+    return relkind == "p"
+
+def partition_years(conn: Connection) -> Set[int]:
+    """Years that already have their own partition"""
+    rows = conn.execute(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = to_regclass(:table)"
+    ), {"table": TABLE})
+    pattern = re.compile(rf"^{TABLE}_y(\d{{4}})$")
+    return {int(match.group(1)) for row in rows if (match := pattern.match(row.relname))}
+
+def create_partition(conn: Connection, year: int) -> None:
+    """Add the partition for a year, moving any rows for it out of the default partition
+
+    The partition is built as a standalone table and then attached, which
+    only takes a SHARE UPDATE EXCLUSIVE lock on the parent.
+    """
+    name = partition_name(year)
+    bounds = {"lower": datetime(year, 1, 1), "upper": datetime(year + 1, 1, 1)}
+    in_range = "expiration_date >= :lower AND expiration_date < :upper"
+    columns = _copy_columns(conn, TABLE)
+
+    conn.execute(text(f"CREATE TABLE {name} (LIKE {TABLE} INCLUDING DEFAULTS INCLUDING GENERATED)"))
+    # Deleting from the default partition also drops these numbers from the
+    # registry; they are registered again below once they live in the new table
+    moved = conn.execute(text(
+        f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} WHERE {in_range} RETURNING {columns}) "
+        f"INSERT INTO {name} ({columns}) SELECT {columns} FROM moved"
+    ), bounds).rowcount
+    conn.execute(text(
+        f"ALTER TABLE {TABLE} ATTACH PARTITION {name} "
+        f"FOR VALUES FROM ('{bounds['lower'].isoformat()}') TO ('{bounds['upper'].isoformat()}')"
+    ))
+    if moved:
+        conn.execute(text(
+            f"INSERT INTO {REGISTRY} (license_number, license_id) SELECT license_number, id FROM {name}"
+        ))
+    logger.info(f"Created partition {name} ({moved} rows moved from the default partition)")
+
+def ensure_partitions(conn: Connection, years_ahead: int = settings.PARTITION_YEARS_AHEAD) -> List[int]:
+    """Create any missing partitions from this year to years_ahead; returns the years created"""
+    if conn.dialect.name != "postgresql" or not is_partitioned(conn):
+        return []
+    existing = partition_years(conn)
+    current = datetime.utcnow().year
+    created = []
+    for year in range(current, current + years_ahead + 1):
+        if year not in existing:
+            create_partition(conn, year)
+            created.append(year)
+    return created
+
+def partition_licenses_table(conn: Connection, years_ahead: int = settings.PARTITION_YEARS_AHEAD) -> None:
+    """Rebuild business_licenses as a table range partitioned on expiration_date
+
+    Copies every row, so run it in a maintenance window. Indexes are
+    recreated on the parent after the copy, which cascades to partitions.
+    """
+    indexes = _index_definitions(conn, TABLE)
+    columns = _copy_columns(conn, TABLE)
+
+    conn.execute(text(f"ALTER TABLE {TABLE} RENAME TO {UNPARTITIONED}"))
+    conn.execute(text(f"ALTER TABLE {UNPARTITIONED} RENAME CONSTRAINT {TABLE}_pkey TO {UNPARTITIONED}_pkey"))
+    for name, _ in indexes:
+        conn.execute(text(f"DROP INDEX {name}"))
+
+    conn.execute(text(
+        f"CREATE TABLE {TABLE} (LIKE {UNPARTITIONED} INCLUDING DEFAULTS INCLUDING GENERATED, "
+        f"PRIMARY KEY (id, expiration_date)) PARTITION BY RANGE (expiration_date)"
+    ))
+    conn.execute(text(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF {TABLE} DEFAULT"))
+
+    first_year = conn.scalar(text(f"SELECT extract(year FROM min(expiration_date))::int FROM {UNPARTITIONED}"))
+    current = datetime.utcnow().year
+    for year in range(min(first_year or current, current), current + years_ahead + 1):
+        conn.execute(text(
+            f"CREATE TABLE {partition_name(year)} PARTITION OF {TABLE} "
+            f"FOR VALUES FROM ('{year}-01-01') TO ('{year + 1}-01-01')"
+        ))
+
+    conn.execute(text(f"INSERT INTO {TABLE} ({columns}) SELECT {columns} FROM {UNPARTITIONED}"))
+    conn.execute(text(f"DROP TABLE {UNPARTITIONED}"))
+
+    for name, definition in indexes:
+        # license_number can't be unique per partition; the registry enforces it
+        definition = definition.replace("CREATE UNIQUE INDEX", "CREATE INDEX")
+        conn.execute(text(definition))
+
+    for statement in REGISTRY_DDL:
+        conn.execute(text(statement))
+    conn.execute(text(
+        f"INSERT INTO {REGISTRY} (license_number, license_id) SELECT license_number, id FROM {TABLE}"
+    ))
+    conn.execute(text(REGISTRY_TRIGGER_DDL))
+    conn.execute(text(f"ANALYZE {TABLE}"))
+
+def unpartition_licenses_table(conn: Connection) -> None:
+    """Rebuild business_licenses as a single plain table"""
+    indexes = _index_definitions(conn, TABLE)
+    columns = _copy_columns(conn, TABLE)
+    partitioned = f"{TABLE}_partitioned"
+
+    conn.execute(text(f"DROP TRIGGER {REGISTRY}_sync ON {TABLE}"))
+    conn.execute(text(f"ALTER TABLE {TABLE} RENAME TO {partitioned}"))
+    conn.execute(text(f"ALTER TABLE {partitioned} RENAME CONSTRAINT {TABLE}_pkey TO {partitioned}_pkey"))
+    for name, _ in indexes:
+        conn.execute(text(f"DROP INDEX {name}"))
+
+    conn.execute(text(
+        f"CREATE TABLE {TABLE} (LIKE {partitioned} INCLUDING DEFAULTS INCLUDING GENERATED, PRIMARY KEY (id))"
+    ))
+    conn.execute(text(f"INSERT INTO {TABLE} ({columns}) SELECT {columns} FROM {partitioned}"))
+    conn.execute(text(f"DROP TABLE {partitioned}"))
+
+    for name, definition in indexes:
+        definition = definition.replace(" ON ONLY ", " ON ")
+        if name == f"ix_{TABLE}_license_number":
+            definition = definition.replace("CREATE INDEX", "CREATE UNIQUE INDEX")
+        conn.execute(text(definition))
+
+    conn.execute(text(f"DROP TABLE {REGISTRY}"))
+    conn.execute(text(f"DROP FUNCTION {REGISTRY}_sync()"))
+    conn.execute(text(f"ANALYZE {TABLE}"))
+
+async def ensure_partitions_job():
+    """Scheduled entry point: keep partitions ahead of incoming expiration dates, on every shard"""
+    for license_engine in shard_router.license_engines():
+        async with license_engine.begin() as conn:
+            await conn.run_sync(ensure_partitions)
@@ -0,0 +1,145 @@
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from typing import Dict, List, Optional, Tuple
+from collections import OrderedDict
+import logging
+import re
+import time
+
+from .config import settings
+
+logger = logging.getLogger("app.slow_query")
+
+_PLACEHOLDER_RE = re.compile(r"\$\d+|%\(\w+\)s|%s|\?")
+_IN_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE_RE = re.compile(r"\s+")
+_BIND_SUFFIX_RE = re.compile(r"_\d+$")
+
+def statement_shape(statement: str) -> str:
+    """Normalize a SQL statement so that queries differing only in bound values share a shape"""
+    shape = _WHITESPACE_RE.sub(" ", statement).strip()
+    shape = _PLACEHOLDER_RE.sub("?", shape)
+    return _IN_LIST_RE.sub("(?...)", shape)
+
+def bound_filters(context) -> List[str]:
+    """Column names bound in a compiled statement, e.g. ['expiration_date', 'state']"""
+    compiled = getattr(context, "compiled", None)
+    if compiled is None or not getattr(compiled, "bind_names", None):
+        return []
+    names = set()
+    for bind_name in compiled.bind_names.values():
+        name = _BIND_SUFFIX_RE.sub("", bind_name)
+        # LIMIT/OFFSET and other anonymous literals compile to param_N
+        if name != "param":
+            names.add(name)
+    return sorted(names)
+
+def _row_count(cursor) -> int:
+    if cursor.rowcount is not None and cursor.rowcount >= 0:
+        return cursor.rowcount
+    # Buffered drivers (asyncpg) report -1 for SELECT but hold the rows until fetched
+    rows = getattr(cursor, "_rows", None)
+    return len(rows) if rows is not None else -1
+
+class SlowQueryLogger:
+    """Logs statements slower than a threshold and samples EXPLAIN plans for repeat offenders"""
+
+    def __init__(
+        self,
+        threshold_ms: int = settings.SLOW_QUERY_THRESHOLD_MS,
+        explain: bool = settings.SLOW_QUERY_EXPLAIN,
+        explain_min_occurrences: int = settings.SLOW_QUERY_EXPLAIN_MIN_OCCURRENCES,
+        explain_interval: int = settings.SLOW_QUERY_EXPLAIN_INTERVAL,
+        max_shapes: int = 1000,
+    ):
+        self.threshold_ms = threshold_ms
+        self.explain = explain
+        self.explain_min_occurrences = explain_min_occurrences
+        self.explain_interval = explain_interval
+        self.max_shapes = max_shapes
+        # shape -> (slow occurrences, monotonic time of last EXPLAIN)
+        self.shapes: "OrderedDict[str, Tuple[int, float]]" = OrderedDict()
+
+    def install(self, engine) -> None:
+        """Attach to an Engine or AsyncEngine"""
+        if self.threshold_ms <= 0:
+            return
+        sync_engine: Engine = getattr(engine, "sync_engine", engine)
+        event.listen(sync_engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        context.slow_query_start_time = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        start_time = getattr(context, "slow_query_start_time", None)
+        if start_time is None:
+            return
+        duration_ms = (time.perf_counter() - start_time) * 1000
+        if duration_ms < self.threshold_ms:
+            return
+
+        shape = statement_shape(statement)
+        occurrences = self._record(shape)
+        logger.warning(
+            f"Slow query {duration_ms:.1f}ms rows={_row_count(cursor)} "
+            f"filters={bound_filters(context)} occurrences={occurrences} shape={shape}"
+        )
+
+        if self._should_explain(conn, shape, statement, executemany):
+            plan = self._explain(conn, statement, parameters)
+            if plan:
+                logger.warning(f"Slow query plan shape={shape}\n{plan}")
+
+    def _record(self, shape: str) -> int:
+        occurrences, last_explain = self.shapes.pop(shape, (0, 0.0))
+        self.shapes[shape] = (occurrences + 1, last_explain)
+        while len(self.shapes) > self.max_shapes:
+            self.shapes.popitem(last=False)
+        return occurrences + 1
+
+    def _should_explain(self, conn, shape: str, statement: str, executemany: bool) -> bool:
+        if not self.explain or executemany or conn.dialect.name != "postgresql":
+            return False
+        # EXPLAIN ANALYZE executes the statement again, so never run it for writes
+        if not statement.lstrip().upper().startswith("SELECT"):
+            return False
+        occurrences, last_explain = self.shapes[shape]
+        if occurrences < self.explain_min_occurrences:
+            return False
+        now = time.monotonic()
+        if last_explain and now - last_explain < self.explain_interval:
+            return False
+        self.shapes[shape] = (occurrences, now)
+        return True
+
+    def _explain(self, conn, statement: str, parameters) -> Optional[str]:
+        # The plan is captured on the caller's connection, inside its
+        # transaction; a savepoint that is always rolled back keeps a failed
+        # EXPLAIN (a statement timeout, say) from aborting that transaction
+        # and undoes anything the repeated execution did, row locks included
+        try:
+            cursor = conn.connection.cursor()
+        except Exception as e:
+            logger.error(f"Error capturing query plan: {str(e)}")
+            return None
+        try:
+            cursor.execute("SAVEPOINT slow_query_explain")
+            try:
+                cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS) {statement}", parameters)
+                return "\n".join(row[0] for row in cursor.fetchall())
+            finally:
+                cursor.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+                cursor.execute("RELEASE SAVEPOINT slow_query_explain")
+        except Exception as e:
+            logger.error(f"Error capturing query plan: {str(e)}")
+            return None
+        finally:
+            cursor.close()
+
+    def stats(self) -> Dict[str, int]:
+        """Slow occurrence count per statement shape"""
+        return {shape: occurrences for shape, (occurrences, _) in self.shapes.items()}
+
+# Global slow query logger instance
+slow_query_logger = SlowQueryLogger()
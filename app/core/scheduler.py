@@ -0,0 +1,84 @@
+from sqlalchemy import text
+from typing import Awaitable, Callable, Dict, List
+from dataclasses import dataclass
+import asyncio
+import logging
+import zlib
+
+from .database import engine
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class PeriodicJob:
+    name: str
+    func: Callable[[], Awaitable[None]]
+    interval: int  # seconds
+
+    @property
+    def lock_key(self) -> int:
+        """Stable advisory lock key derived from the job name"""
+        return zlib.crc32(self.name.encode())
+
+class Scheduler:
+    """Runs periodic jobs in-process, on at most one worker at a time per job"""
+
+    def __init__(self):
+        self.jobs: Dict[str, PeriodicJob] = {}
+        self._tasks: List[asyncio.Task] = []
+
+    def add_job(self, name: str, func: Callable[[], Awaitable[None]], interval: int) -> None:
+        """Register a job; an interval of 0 or less disables it"""
+        if interval > 0:
+            self.jobs[name] = PeriodicJob(name=name, func=func, interval=interval)
+
+    async def start(self):
+        """Start one loop per registered job"""
+        for job in self.jobs.values():
+            self._tasks.append(asyncio.create_task(self._run_periodically(job)))
+
+    async def stop(self):
+        """Cancel all job loops"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _run_periodically(self, job: PeriodicJob):
+        while True:
+            await asyncio.sleep(job.interval)
+            await self.run_once(job.name)
+
+    async def run_once(self, name: str) -> bool:
+        """Run a job now if this worker wins the election; returns whether it ran"""
+        job = self.jobs[name]
+        try:
+            async with engine.connect() as conn:
+                if not await self._try_lock(conn, job):
+                    logger.debug(f"Job {job.name} is running on another worker")
+                    return False
+                try:
+                    await job.func()
+                finally:
+                    await self._unlock(conn, job)
+            return True
+        except Exception as e:
+            logger.error(f"Error running job {job.name}: {str(e)}")
+            return False
+
+    async def _try_lock(self, conn, job: PeriodicJob) -> bool:
+        # Session-level advisory locks elect a single runner across workers and hosts
+        if conn.dialect.name != "postgresql":
+            return True
+        result = await conn.execute(
+            text("SELECT pg_try_advisory_lock(:key)"), {"key": job.lock_key}
+        )
+        return bool(result.scalar())
+
+    async def _unlock(self, conn, job: PeriodicJob) -> None:
+        if conn.dialect.name == "postgresql":
+            await conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": job.lock_key})
+            await conn.commit()
+
+# Global scheduler instance
+scheduler = Scheduler()
@@ -0,0 +1,74 @@
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+from typing import Callable, Dict, List
+import logging
+
+from .config import settings
+from .database import AsyncSessionLocal, create_database_engine, engine as primary_engine
+from .query_log import slow_query_logger
+
+logger = logging.getLogger(__name__)
+
+class ShardRouter:
+    """Maps states to shards and holds a pooled engine per shard
+
+    Engines are created on first use, so workers only open pools to the
+    shards they actually reach.
+    """
+
+    def __init__(self):
+        self._engines: Dict[str, AsyncEngine] = {}
+        self._sessionmakers: Dict[str, async_sessionmaker] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return bool(settings.SHARD_DATABASE_URLS)
+
+    @property
+    def shards(self) -> List[str]:
+        return list(settings.SHARD_DATABASE_URLS)
+
+    def shard_for_state(self, state: str) -> str:
+        """Shard that licenses of a state belong on; raises ValueError if there is none"""
+        shard = settings.SHARD_STATES.get(state.upper(), settings.SHARD_DEFAULT)
+        if shard is None:
+            raise ValueError(f"No shard configured for state {state}")
+        if shard not in settings.SHARD_DATABASE_URLS:
+            raise ValueError(f"State {state} maps to unknown shard {shard}")
+        return shard
+
+    def engine(self, shard: str) -> AsyncEngine:
+        if shard not in self._engines:
+            shard_engine = create_database_engine(settings.SHARD_DATABASE_URLS[shard])
+            slow_query_logger.install(shard_engine)
+            self._engines[shard] = shard_engine
+            self._sessionmakers[shard] = async_sessionmaker(
+                shard_engine, class_=AsyncSession, expire_on_commit=False
+            )
+        return self._engines[shard]
+
+    def session(self, shard: str) -> AsyncSession:
+        """New session on a shard; use as an async context manager"""
+        self.engine(shard)
+        return self._sessionmakers[shard]()
+
+    def license_engines(self) -> List[AsyncEngine]:
+        """Engines of every database holding licenses: each shard, or the primary when unsharded"""
+        if not self.enabled:
+            return [primary_engine]
+        return [self.engine(shard) for shard in self.shards]
+
+    def license_sessions(self) -> List[Callable[[], AsyncSession]]:
+        """Session factories of every database holding licenses, like license_engines"""
+        if not self.enabled:
+            return [AsyncSessionLocal]
+        return [lambda shard=shard: self.session(shard) for shard in self.shards]
+
+    async def dispose(self):
+        """Close every shard pool"""
+        for shard_engine in self._engines.values():
+            await shard_engine.dispose()
+        self._engines.clear()
+        self._sessionmakers.clear()
+
+# Global shard router instance
+shard_router = ShardRouter()
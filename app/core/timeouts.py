@@ -0,0 +1,79 @@
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from typing import Optional
+import asyncio
+import logging
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+def statement_timeout_for(request: Optional[Request]) -> int:
+    """Statement timeout in milliseconds for the route serving a request"""
+    if request is None:
+        return settings.STATEMENT_TIMEOUT_MS
+    route = request.scope.get("route")
+    path = getattr(route, "path", request.url.path)
+    if path.startswith(settings.API_V1_STR):
+        path = path[len(settings.API_V1_STR):]
+    return settings.ROUTE_STATEMENT_TIMEOUTS_MS.get(path, settings.STATEMENT_TIMEOUT_MS)
+
+def apply_statement_timeout(session: AsyncSession, timeout_ms: int) -> None:
+    """Set statement_timeout on every transaction the session begins"""
+    if timeout_ms <= 0:
+        return
+
+    @event.listens_for(session.sync_session, "after_begin")
+    def _set_statement_timeout(sync_session, transaction, connection):
+        if connection.dialect.name == "postgresql":
+            connection.exec_driver_sql(f"SET LOCAL statement_timeout = {int(timeout_ms)}")
+
+class DisconnectCancellationMiddleware:
+    """Cancels the request handler, and with it any running query, when the client disconnects"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        messages: "asyncio.Queue[Message]" = asyncio.Queue()
+        disconnected = asyncio.Event()
+        response_complete = False
+
+        async def tracked_send(message: Message):
+            nonlocal response_complete
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                response_complete = True
+
+        handler = asyncio.create_task(self.app(scope, messages.get, tracked_send))
+
+        async def watch_disconnect():
+            while True:
+                message = await receive()
+                await messages.put(message)
+                if message["type"] == "http.disconnect":
+                    # Servers report a disconnect as soon as the response is sent;
+                    # dependency teardown (returning the session's connection to
+                    # the pool) still runs after that and must not be interrupted
+                    if not handler.done() and not response_complete:
+                        logger.info(f"Client disconnected, cancelling {scope['method']} {scope['path']}")
+                        disconnected.set()
+                        # asyncpg sends a server-side cancel for the in-flight query
+                        handler.cancel()
+                    return
+
+        watcher = asyncio.create_task(watch_disconnect())
+        try:
+            await handler
+        except asyncio.CancelledError:
+            # Swallow only the cancellation we caused; server shutdown still propagates
+            if not disconnected.is_set():
+                raise
+        finally:
+            watcher.cancel()
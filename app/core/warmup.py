@@ -0,0 +1,147 @@
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from contextlib import AsyncExitStack
+from typing import Any, Dict, List, Optional
+from uuid import UUID, uuid4
+import asyncio
+import logging
+import random
+import time
+
+from .config import settings
+from .cache import cache
+
+logger = logging.getLogger(__name__)
+
+class HotLicenseTracker:
+    """Counts a sample of license lookups per time window in Redis
+
+    Shared by all workers, so a new worker can ask which licenses the
+    fleet has been serving most.
+    """
+
+    key_prefix = "license_hits"
+
+    def _key(self, window: int) -> str:
+        return f"{self.key_prefix}:{window}"
+
+    def _window(self) -> int:
+        return int(time.time() // settings.HOT_LICENSE_WINDOW)
+
+    async def record(self, license_id: UUID) -> None:
+        """Count a lookup, for a sample of calls only"""
+        if cache.redis_client is None or random.random() >= settings.HOT_LICENSE_SAMPLE_RATE:
+            return
+        key = self._key(self._window())
+        try:
+            async with cache.redis_client.pipeline(transaction=False) as pipe:
+                pipe.zincrby(key, 1, str(license_id))
+                pipe.expire(key, settings.HOT_LICENSE_WINDOW * 2)
+                await pipe.execute()
+        except Exception as e:
+            logger.debug(f"Error counting license lookup: {str(e)}")
+
+    async def top(self, limit: int) -> List[UUID]:
+        """Most-requested licenses over the current and previous window"""
+        if cache.redis_client is None or limit <= 0:
+            return []
+        window = self._window()
+        merged = f"{self.key_prefix}:top:{uuid4()}"
+        try:
+            async with cache.redis_client.pipeline(transaction=True) as pipe:
+                pipe.zunionstore(merged, [self._key(window), self._key(window - 1)])
+                pipe.zrevrange(merged, 0, limit - 1)
+                pipe.delete(merged)
+                _, members, _ = await pipe.execute()
+        except Exception as e:
+            logger.error(f"Error reading hot licenses: {str(e)}")
+            return []
+        return [UUID(member.decode() if isinstance(member, bytes) else member) for member in members]
+
+class Warmup:
+    """Readies a new worker before it is reported ready for traffic
+
+    Opens pool connections and runs the per-request lookup statements on
+    each, so they are compiled and prepared, then loads the fleet's
+    most-requested licenses into the cache.
+    """
+
+    def __init__(self):
+        self.ready = False
+        self.status: Dict[str, Any] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self, engine: AsyncEngine):
+        """Warm up in the background; ready is set when done, failed or timed out"""
+        if not settings.WARMUP_ENABLED:
+            self.ready = True
+            return
+        self.ready = False
+        self._task = asyncio.create_task(self._run(engine))
+
+    async def stop(self):
+        """Abandon a warm-up still running"""
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self, engine: AsyncEngine):
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._warm(engine), timeout=settings.WARMUP_TIMEOUT)
+        except asyncio.TimeoutError:
+            logger.warning(f"Warm-up timed out after {settings.WARMUP_TIMEOUT}s, reporting ready")
+            self.status["timed_out"] = True
+        except Exception as e:
+            logger.error(f"Warm-up failed, reporting ready: {str(e)}")
+            self.status["error"] = str(e)
+        finally:
+            self.status["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+            self.ready = True
+        logger.info(f"Warm-up finished: {self.status}")
+
+    async def _warm(self, engine: AsyncEngine):
+        from .shards import shard_router
+
+        # Sharded requests hold a connection to the primary for the directory
+        # and one to a shard for the license, so every pool is warmed
+        engines = [engine]
+        if shard_router.enabled:
+            engines += shard_router.license_engines()
+        count = min(settings.WARMUP_POOL_CONNECTIONS, settings.DATABASE_POOL_SIZE)
+        warmed = await asyncio.gather(*[self.warm_connections(license_engine, count) for license_engine in engines])
+        self.status["connections"] = sum(warmed)
+        self.status["primed_licenses"] = await self.prime_cache(settings.WARMUP_HOT_LICENSES)
+
+    async def warm_connections(self, engine: AsyncEngine, count: int) -> int:
+        """Open count pool connections at once and prepare the lookup statements on each"""
+        from app.services.license_service import lookup_statements
+
+        async def prepare(conn):
+            # Through a session, so ORM statements hit the same compiled cache entries as requests
+            async with AsyncSession(bind=conn) as session:
+                for stmt in lookup_statements():
+                    await session.execute(stmt)
+
+        # All held together, so the pool opens count distinct connections
+        async with AsyncExitStack() as stack:
+            connections = [await stack.enter_async_context(engine.connect()) for _ in range(count)]
+            await asyncio.gather(*[prepare(conn) for conn in connections])
+        return count
+
+    async def prime_cache(self, limit: int) -> int:
+        """Load the most-requested licenses into the cache; returns how many were loaded"""
+        from app.core.database import AsyncSessionLocal
+        from app.services.sharded_license_service import license_service
+
+        license_ids = await hot_licenses.top(limit)
+        if not license_ids:
+            return 0
+        async with AsyncSessionLocal() as session:
+            return await license_service(session).cache_licenses(license_ids)
+
+# Global hot license tracker instance
+hot_licenses = HotLicenseTracker()
+
+# Global warm-up instance
+warmup = Warmup()
@@ -1,7 +1,7 @@
 from app.database import engine
 from app.models.base import Base
 from app.models.business import Business
-from app.models.license import License
+from app.models.license import BusinessLicense
 
 # Create all tables
 Base.metadata.create_all(bind=engine)
\ No newline at end of file
@@ -4,11 +4,26 @@ from fastapi.responses import JSONResponse
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
+import asyncio
 import logging
 
 from app.core.config import settings
 from app.core.cache import cache
-from app.api.routes import licenses
+from app.core.database import engine, AsyncSessionLocal
+from app.core.admission import admission, AdmissionControlMiddleware, SHED_ALL
+from app.core.timeouts import DisconnectCancellationMiddleware
+from app.core.scheduler import scheduler
+from app.core.partitions import ensure_partitions_job
+from app.core.events import license_events
+from app.core.jobs import job_runner
+from app.core.warmup import warmup
+from app.core.shards import shard_router
+from app.services.expiration_service import expire_licenses_job
+from app.services.expiring_service import refresh_expiring_views_job
+from app.core.bloom import license_number_filter
+from app.services.snapshot_search import license_snapshot
+from app.services.create_coalescer import create_coalescer
+from app.api.routes import licenses, businesses, jobs
 
 # Configure logging
 logging.basicConfig(
@@ -26,6 +41,12 @@ app = FastAPI(
     redoc_url=f"{settings.API_V1_STR}/redoc",
 )
 
+# Stop work, including running queries, for clients that have gone away
+app.add_middleware(DisconnectCancellationMiddleware)
+
+# Shed load when the pool or event loop is saturated
+app.add_middleware(AdmissionControlMiddleware)
+
 # Set up CORS
 app.add_middleware(
     CORSMiddleware,
@@ -42,16 +63,64 @@ app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
 # Include routers
 app.include_router(licenses.router, prefix=settings.API_V1_STR)
+app.include_router(businesses.router, prefix=settings.API_V1_STR)
+app.include_router(jobs.router, prefix=settings.API_V1_STR)
+
+async def build_license_number_filter():
+    """Build the shared license number filter if no worker has yet"""
+    async with AsyncSessionLocal() as session:
+        await license_number_filter.ensure_built(session)
+
+async def rebuild_license_number_filter():
+    """Rebuild the license number filter to drop bits of deleted licenses"""
+    async with AsyncSessionLocal() as session:
+        await license_number_filter.rebuild(session)
 
 @app.on_event("startup")
 async def startup_event():
     """Initialize services on startup"""
     await cache.init_redis()
+    admission.init_pool(engine)
+    await admission.start()
+    # Readiness stays 503 until connections are open and hot licenses cached
+    await warmup.start(engine)
+    if settings.EDGE_MODE:
+        # Read-only snapshot: nothing to maintain, listen to or index
+        logging.info(f"Edge mode: serving reads from {settings.EDGE_DATABASE_PATH}")
+        return
+    # Change events, the expiring views and jobs all come from the primary,
+    # which holds no licenses once sharded; their routes answer 501 then
+    if not shard_router.enabled:
+        await license_events.start()
+    if settings.SCHEDULER_ENABLED:
+        # Expiry and partition maintenance run on every shard
+        scheduler.add_job("expire_licenses", expire_licenses_job, settings.EXPIRE_LICENSES_INTERVAL)
+        scheduler.add_job("ensure_partitions", ensure_partitions_job, settings.PARTITION_MAINTENANCE_INTERVAL)
+        if not shard_router.enabled:
+            scheduler.add_job("refresh_expiring_views", refresh_expiring_views_job, settings.EXPIRING_REFRESH_INTERVAL)
+        scheduler.add_job("rebuild_license_number_filter", rebuild_license_number_filter, settings.BLOOM_FILTER_REBUILD_INTERVAL)
+        await scheduler.start()
+    if settings.JOBS_ENABLED and not shard_router.enabled:
+        await job_runner.start()
+    # Build in the background so startup isn't held up by a full table scan
+    app.state.license_filter_build = asyncio.create_task(build_license_number_filter())
+    # The snapshot is loaded from the primary, which holds no licenses once sharded
+    if settings.SEARCH_BACKEND == "snapshot" and not shard_router.enabled:
+        # Searches use postgres until the snapshot has loaded
+        await license_snapshot.start()
     logging.info("Application started successfully")
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on shutdown"""
+    await warmup.stop()
+    await create_coalescer.drain()
+    await license_snapshot.stop()
+    await job_runner.stop()
+    await scheduler.stop()
+    await license_events.stop()
+    await admission.stop()
+    await shard_router.dispose()
     await cache.close_redis()
     logging.info("Application shutdown")
 
@@ -65,6 +134,27 @@ async def root():
     }
 
 @app.get("/health")
+@app.get("/health/live")
 async def health_check():
-    """Health check endpoint"""
+    """Liveness check: the process is up and serving requests"""
     return {"status": "healthy", "version": settings.VERSION}
+
+@app.get("/health/ready")
+async def readiness_check():
+    """Readiness check: the worker is warmed up and has capacity to take new traffic"""
+    admission_status = admission.status()
+    if not warmup.ready:
+        status = "warming_up"
+    elif admission.level >= SHED_ALL:
+        status = "overloaded"
+    else:
+        status = "ready"
+    return JSONResponse(
+        status_code=200 if status == "ready" else 503,
+        content={
+            "status": status,
+            "version": settings.VERSION,
+            "admission": admission_status,
+            "warmup": warmup.status,
+        },
+    )
@@ -1,23 +1,29 @@
 from sqlalchemy import Column, String, Integer, Date
 from sqlalchemy.orm import relationship
-from app.models.base import Base
+from .base import Base
 
 class Business(Base):
-    __tablename__ = 'businesses'
+    __tablename__ = "businesses"
+
     id = Column(Integer, primary_key=True)
-    dba_number = Column(String, unique=True)
-    name = Column(String)
-    business_type = Column(String)
-    physical_address = Column(String)
-    mailing_address = Column(String)
-    owner_name = Column(String)
-    owner_contact = Column(String)
+    dba_number = Column(String(50), unique=True)
+    name = Column(String(255), nullable=False, index=True)
+    business_type = Column(String(100))
+    physical_address = Column(String(255))
+    mailing_address = Column(String(255))
+    owner_name = Column(String(255))
+    owner_contact = Column(String(255))
     employee_count = Column(Integer)
     start_date = Column(Date)
 
-    licenses = relationship('License', back_populates='business')
-    __table_args__ = (
-        {'extend_existing': True}
+    # Never lazy loaded: lazy loads can't run on the async engine and would
+    # issue one query per business. Use selectinload(Business.licenses).
+    licenses = relationship(
+        "BusinessLicense",
+        back_populates="business",
+        lazy="raise",
+        order_by="BusinessLicense.license_number"
     )
+
     def __repr__(self):
-        return f"<Business(id={self.id}, dba_number={self.dba_number}, name={self.name})>"
\ No newline at end of file
+        return f"<Business(id={self.id}, dba_number={self.dba_number}, name={self.name})>"
@@ -0,0 +1,45 @@
+from sqlalchemy import Column, Index, MetaData, Table, Uuid, func, text
+from .license import BusinessLicense
+
+# SQLite schema of edge snapshots (cli export-edge-snapshot); kept out of
+# Base.metadata so create_all and autogenerate never touch it
+edge_metadata = MetaData()
+
+# FTS5 index over the text fields; stands in for the search_vector column
+EDGE_FTS_TABLE = "business_licenses_fts"
+EDGE_FTS_COLUMNS = ("business_name", "description", "conditions")
+
+def _edge_type(column: Column):
+    # Stored as 32 hex characters, the same form BusinessLicense binds on SQLite
+    return Uuid(as_uuid=True) if isinstance(column.type, Uuid) else column.type
+
+# Same name and columns as business_licenses so BusinessLicense queries run
+# unchanged, minus the PostgreSQL-only search_vector
+edge_licenses = Table(
+    BusinessLicense.__tablename__,
+    edge_metadata,
+    *[
+        Column(column.name, _edge_type(column), primary_key=column.primary_key, nullable=column.nullable)
+        for column in BusinessLicense.__table__.columns
+        if column.name != "search_vector"
+    ],
+)
+
+# The B-tree indexes of business_licenses; the GIN indexes have no SQLite
+# equivalent and FTS5 covers what they are used for
+_c = edge_licenses.c
+Index("ix_business_licenses_license_number", _c.license_number, unique=True)
+Index("ix_business_licenses_business_name", _c.business_name)
+Index("ix_business_licenses_expiration_date", _c.expiration_date)
+Index("ix_business_licenses_city", _c.city)
+Index("ix_business_licenses_zip_code", _c.zip_code)
+Index("ix_business_licenses_active_expiration", _c.expiration_date,
+      sqlite_where=text("status = 'active'"))
+Index("ix_business_licenses_state_status_expiration", _c.state, _c.status, _c.expiration_date)
+Index("ix_business_licenses_state_created_at", _c.state, _c.created_at)
+Index("ix_business_licenses_active_state_created_at", _c.state, _c.created_at,
+      sqlite_where=text("status = 'active'"))
+Index("ix_business_licenses_status_created_at", _c.status, _c.created_at)
+Index("ix_business_licenses_created_at", _c.created_at)
+Index("ix_business_licenses_business_name_prefix", func.lower(_c.business_name))
+Index("ix_business_licenses_license_number_prefix", func.lower(_c.license_number))
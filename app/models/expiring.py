@@ -0,0 +1,34 @@
+from sqlalchemy import Column, Date, DateTime, Integer, MetaData, String, Table, Enum
+from sqlalchemy.dialects.postgresql import UUID
+from .license import LicenseType, _enum_values
+
+# Materialized views (migration 007); kept out of Base.metadata so
+# create_all and autogenerate don't treat them as tables
+views_metadata = MetaData()
+
+# Longest horizon the views cover; must match EXPIRING_SOON_SQL in migration 007
+EXPIRING_MAX_HORIZON_DAYS = 90
+
+# Active licenses expiring within the horizon, as of the last refresh
+license_expiring_soon = Table(
+    "license_expiring_soon",
+    views_metadata,
+    Column("id", UUID(as_uuid=True), primary_key=True),
+    Column("license_number", String(50)),
+    Column("business_name", String(255)),
+    Column("business_type", Enum(LicenseType, name="licensetype", values_callable=_enum_values)),
+    Column("issuing_authority", String(255)),
+    Column("city", String(100)),
+    Column("state", String(50)),
+    Column("expiration_date", DateTime),
+)
+
+# Counts of the same licenses per authority, state and expiration day
+license_expiring_daily = Table(
+    "license_expiring_daily",
+    views_metadata,
+    Column("issuing_authority", String(255)),
+    Column("state", String(50)),
+    Column("expiration_day", Date),
+    Column("license_count", Integer),
+)
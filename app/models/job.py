@@ -0,0 +1,53 @@
+from sqlalchemy import Column, BigInteger, Integer, String, DateTime, Text, JSON, Index, text, func
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+import uuid
+import enum
+from .base import Base
+
+class JobKind(str, enum.Enum):
+    EXPORT = "export"
+    IMPORT = "import"
+    ARCHIVE = "archive"
+    PARQUET = "parquet"
+
+class JobStatus(str, enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+class Job(Base):
+    """Background job; the table doubles as the queue (app/core/jobs.py)"""
+    __tablename__ = "jobs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    kind = Column(String(20), nullable=False)
+    status = Column(String(10), nullable=False, default=JobStatus.QUEUED.value)
+    params = Column(JSON().with_variant(JSONB, "postgresql"), nullable=False, default=dict)
+    
+    # Progress in rows; total is None until the job knows it
+    progress = Column(BigInteger, nullable=False, default=0)
+    total = Column(BigInteger)
+    
+    # Summary counts, and the downloadable output file if the kind has one
+    result = Column(JSON().with_variant(JSONB, "postgresql"))
+    result_path = Column(String(500))
+    error = Column(Text)
+    
+    attempts = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=func.now(), nullable=False)
+    started_at = Column(DateTime)
+    # Bumped while running; a stale heartbeat means the runner died
+    heartbeat_at = Column(DateTime)
+    finished_at = Column(DateTime)
+
+    __table_args__ = (
+        # Serves the claim query: oldest queued job first
+        Index("ix_jobs_queued_created_at", "created_at",
+              postgresql_where=text("status = 'queued'")),
+        Index("ix_jobs_running_heartbeat_at", "heartbeat_at",
+              postgresql_where=text("status = 'running'")),
+    )
+
+    def __repr__(self):
+        return f"<Job {self.id}: {self.kind} {self.status}>"
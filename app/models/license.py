@@ -1,8 +1,10 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, Enum
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Float, Text, Enum, Computed, FetchedValue, ForeignKey, Index, text, func
+from sqlalchemy.dialects.postgresql import UUID, TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 import uuid
 import enum
 from .base import Base, TimestampMixin
+from .business import Business
 
 class LicenseStatus(str, enum.Enum):
     ACTIVE = "active"
@@ -17,24 +19,49 @@ class LicenseType(str, enum.Enum):
     FOOD_SERVICE = "food_service"
     RETAIL = "retail"
 
+def _enum_values(enum_cls):
+    return [member.value for member in enum_cls]
+
+SEARCH_VECTOR_EXPRESSION = (
+    "setweight(to_tsvector('english', coalesce(business_name, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(conditions, '')), 'C')"
+)
+
 class BusinessLicense(Base, TimestampMixin):
+    # Migration 009 range partitions this table by expiration_date, so the
+    # partition key is part of the primary key and license_number uniqueness
+    # is enforced by license_number_registry (app/core/partitions.py)
     __tablename__ = "business_licenses"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    license_number = Column(String(50), unique=True, nullable=False, index=True)
+    license_number = Column(String(50), nullable=False, index=True)
     business_name = Column(String(255), nullable=False, index=True)
-    business_type = Column(Enum(LicenseType), nullable=False)
-    status = Column(Enum(LicenseStatus), nullable=False, default=LicenseStatus.ACTIVE)
+    # Persist enum values ('active'), matching the types created by migration 001
+    business_type = Column(
+        Enum(LicenseType, name="licensetype", values_callable=_enum_values),
+        nullable=False
+    )
+    status = Column(
+        Enum(LicenseStatus, name="licensestatus", values_callable=_enum_values),
+        nullable=False,
+        default=LicenseStatus.ACTIVE
+    )
     issued_date = Column(DateTime, nullable=False)
-    expiration_date = Column(DateTime, nullable=False, index=True)
+    expiration_date = Column(DateTime, primary_key=True, nullable=False, index=True)
     issuing_authority = Column(String(255), nullable=False)
     
     # Address fields
     street_address = Column(String(255), nullable=False)
     city = Column(String(100), nullable=False, index=True)
-    state = Column(String(50), nullable=False, index=True)
+    state = Column(String(50), nullable=False)
     zip_code = Column(String(20), nullable=False, index=True)
     
+    # Centroid of the ZIP code, set by a trigger from zip_centroids (migration
+    # 013); null until the ZIP code's centroid is loaded
+    latitude = Column(Float, server_default=FetchedValue(), server_onupdate=FetchedValue())
+    longitude = Column(Float, server_default=FetchedValue(), server_onupdate=FetchedValue())
+    
     # Contact information
     contact_person = Column(String(255))
     phone = Column(String(20))
@@ -44,6 +71,47 @@ class BusinessLicense(Base, TimestampMixin):
     description = Column(Text)
     conditions = Column(Text)
     is_renewable = Column(Boolean, default=True)
+    
+    # Owning business (migration 010); optional for licenses registered before
+    # businesses were tracked
+    business_id = Column(Integer, ForeignKey("businesses.id", name="fk_business_licenses_business_id"), index=True)
+    business = relationship(Business, back_populates="licenses", lazy="raise")
+    
+    # Full-text search document, maintained by PostgreSQL; deferred so plain
+    # selects don't ship it over the wire
+    search_vector = deferred(Column(
+        TSVECTOR,
+        Computed(SEARCH_VECTOR_EXPRESSION, persisted=True),
+    ))
+
+    # Search indexes (migrations 002, 004 and 005); state-led composites
+    # replace the single-column state index
+    __table_args__ = (
+        Index("ix_business_licenses_active_expiration", "expiration_date",
+              postgresql_where=text("status = 'active'")),
+        Index("ix_business_licenses_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_business_licenses_state_status_expiration", "state", "status", "expiration_date"),
+        Index("ix_business_licenses_state_created_at", "state", "created_at"),
+        Index("ix_business_licenses_active_state_created_at", "state", "created_at",
+              postgresql_where=text("status = 'active'")),
+        Index("ix_business_licenses_status_created_at", "status", "created_at"),
+        Index("ix_business_licenses_created_at", "created_at"),
+        Index("ix_business_licenses_latitude_longitude", "latitude", "longitude"),
+        Index("ix_business_licenses_business_name_trgm", "business_name", postgresql_using="gin",
+              postgresql_ops={"business_name": "gin_trgm_ops"}),
+        Index("ix_business_licenses_license_number_trgm", "license_number", postgresql_using="gin",
+              postgresql_ops={"license_number": "gin_trgm_ops"}),
+        Index("ix_business_licenses_city_trgm", "city", postgresql_using="gin",
+              postgresql_ops={"city": "gin_trgm_ops"}),
+    )
 
     def __repr__(self):
-        return f"<BusinessLicense {self.license_number}: {self.business_name}>"
\ No newline at end of file
+        return f"<BusinessLicense {self.license_number}: {self.business_name}>"
+
+# Typeahead prefix indexes (migration 006), declared after the class so they
+# can use expressions
+Index("ix_business_licenses_business_name_prefix", func.lower(BusinessLicense.business_name).label("business_name_lower"),
+      postgresql_ops={"business_name_lower": "text_pattern_ops"})
+Index("ix_business_licenses_license_number_prefix", func.lower(BusinessLicense.license_number).label("license_number_lower"),
+      postgresql_ops={"license_number_lower": "text_pattern_ops"})
+
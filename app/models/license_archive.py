@@ -0,0 +1,61 @@
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Float, Text, Enum, Computed, func
+from sqlalchemy.dialects.postgresql import UUID, TSVECTOR
+from sqlalchemy.orm import deferred
+from .base import Base
+from .license import LicenseStatus, LicenseType, SEARCH_VECTOR_EXPRESSION, _enum_values
+
+class BusinessLicenseArchive(Base):
+    """Cold copy of licenses long past expiration, moved out of business_licenses
+
+    Mirrors the business_licenses columns so rows move with a plain
+    INSERT ... SELECT and serialize like live licenses. Read only.
+    """
+    __tablename__ = "business_licenses_archive"
+
+    id = Column(UUID(as_uuid=True), primary_key=True)
+    license_number = Column(String(50), unique=True, nullable=False, index=True)
+    business_name = Column(String(255), nullable=False)
+    business_type = Column(
+        Enum(LicenseType, name="licensetype", values_callable=_enum_values),
+        nullable=False
+    )
+    status = Column(
+        Enum(LicenseStatus, name="licensestatus", values_callable=_enum_values),
+        nullable=False
+    )
+    issued_date = Column(DateTime, nullable=False)
+    expiration_date = Column(DateTime, nullable=False, index=True)
+    issuing_authority = Column(String(255), nullable=False)
+    
+    # Address fields
+    street_address = Column(String(255), nullable=False)
+    city = Column(String(100), nullable=False)
+    state = Column(String(50), nullable=False)
+    zip_code = Column(String(20), nullable=False)
+    latitude = Column(Float)
+    longitude = Column(Float)
+    
+    # Contact information
+    contact_person = Column(String(255))
+    phone = Column(String(20))
+    email = Column(String(255))
+    
+    # Additional details
+    description = Column(Text)
+    conditions = Column(Text)
+    is_renewable = Column(Boolean)
+    business_id = Column(Integer)
+    
+    created_at = Column(DateTime, nullable=False)
+    updated_at = Column(DateTime, nullable=False)
+    archived_at = Column(DateTime, default=func.now(), nullable=False)
+    
+    # Same generated document as business_licenses, without a GIN index:
+    # archived searches are opt-in and may scan
+    search_vector = deferred(Column(
+        TSVECTOR,
+        Computed(SEARCH_VECTOR_EXPRESSION, persisted=True),
+    ))
+
+    def __repr__(self):
+        return f"<BusinessLicenseArchive {self.license_number}: {self.business_name}>"
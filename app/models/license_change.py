@@ -0,0 +1,31 @@
+from sqlalchemy import Column, BigInteger, Integer, String, DateTime, Index, func
+from sqlalchemy.dialects.postgresql import UUID
+import enum
+from .base import Base
+
+class ChangeOperation(str, enum.Enum):
+    CREATE = "create"
+    UPDATE = "update"
+    DELETE = "delete"
+    # Moved to business_licenses_archive; still readable by id and number
+    ARCHIVE = "archive"
+
+class LicenseChange(Base):
+    """Append-only outbox of license writes, recorded in the writing transaction"""
+    __tablename__ = "license_changes"
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    # Writing transaction id; feeds are ordered by (txid, id) so that rows from
+    # transactions still in flight can never appear behind an issued token
+    txid = Column(BigInteger, nullable=False, default=0)
+    license_id = Column(UUID(as_uuid=True), nullable=False, index=True)
+    license_number = Column(String(50), nullable=False)
+    operation = Column(String(10), nullable=False)
+    changed_at = Column(DateTime, default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("ix_license_changes_txid_id", "txid", "id"),
+    )
+
+    def __repr__(self):
+        return f"<LicenseChange {self.id}: {self.operation} {self.license_number}>"
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, String, Index
+from sqlalchemy.dialects.postgresql import UUID
+from .base import Base
+
+class LicenseShard(Base):
+    """Directory of which shard holds each license, kept on the primary database"""
+    __tablename__ = "license_shards"
+
+    # Also enforces license_number uniqueness across shards
+    license_number = Column(String(50), primary_key=True)
+    license_id = Column(UUID(as_uuid=True), nullable=False)
+    shard = Column(String(50), nullable=False)
+
+    __table_args__ = (
+        Index("ix_license_shards_license_id", "license_id", unique=True),
+    )
+
+    def __repr__(self):
+        return f"<LicenseShard {self.license_number}: {self.shard}>"
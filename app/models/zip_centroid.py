@@ -0,0 +1,13 @@
+from sqlalchemy import Column, String, Float
+from .base import Base
+
+class ZipCentroid(Base):
+    """Reference point of each five-digit ZIP code, loaded with cli load-zip-centroids"""
+    __tablename__ = "zip_centroids"
+
+    zip_code = Column(String(5), primary_key=True)
+    latitude = Column(Float, nullable=False)
+    longitude = Column(Float, nullable=False)
+
+    def __repr__(self):
+        return f"<ZipCentroid {self.zip_code}: {self.latitude}, {self.longitude}>"
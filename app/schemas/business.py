@@ -0,0 +1,33 @@
+from pydantic import BaseModel, Field
+from typing import Optional, List
+from datetime import date
+from enum import Enum
+
+from app.schemas.license import LicenseResponse
+
+class BusinessInclude(str, Enum):
+    LICENSES = "licenses"
+
+class BusinessBase(BaseModel):
+    dba_number: Optional[str] = Field(None, min_length=1, max_length=50)
+    name: str = Field(..., min_length=1, max_length=255)
+    business_type: Optional[str] = Field(None, max_length=100)
+    physical_address: Optional[str] = Field(None, max_length=255)
+    mailing_address: Optional[str] = Field(None, max_length=255)
+    owner_name: Optional[str] = Field(None, max_length=255)
+    owner_contact: Optional[str] = Field(None, max_length=255)
+    employee_count: Optional[int] = Field(None, ge=0)
+    start_date: Optional[date] = None
+
+class BusinessCreate(BusinessBase):
+    pass
+
+class BusinessResponse(BusinessBase):
+    id: int
+    # Only with include=licenses
+    licenses: Optional[List[LicenseResponse]] = None
+
+class BusinessListResponse(BaseModel):
+    items: List[BusinessResponse]
+    next_cursor: Optional[str] = None
+    has_more: bool
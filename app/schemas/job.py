@@ -0,0 +1,71 @@
+from pydantic import BaseModel, Field, validator
+from typing import Any, Dict, Optional
+from datetime import datetime
+from enum import Enum
+
+from app.schemas.license import LicenseSearchFilters
+from app.core.config import settings
+
+class JobKind(str, Enum):
+    EXPORT = "export"
+    IMPORT = "import"
+    ARCHIVE = "archive"
+    PARQUET = "parquet"
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+class ExportJobParams(BaseModel):
+    # Live licenses only; include_archived is ignored
+    filters: LicenseSearchFilters = Field(default_factory=LicenseSearchFilters)
+    compress: bool = True
+
+class ImportJobParams(BaseModel):
+    # Name of the uploaded file, for reference; the upload is kept by job id
+    filename: Optional[str] = None
+
+class ArchiveJobParams(BaseModel):
+    older_than_years: int = Field(settings.ARCHIVE_AFTER_YEARS, ge=1)
+    batch_size: int = Field(settings.ARCHIVE_BATCH_SIZE, ge=1, le=100_000)
+
+class ParquetJobParams(BaseModel):
+    # Only rows updated since the last snapshot in PARQUET_OUTPUT_DIR
+    incremental: bool = False
+
+JOB_PARAMS = {
+    JobKind.EXPORT: ExportJobParams,
+    JobKind.IMPORT: ImportJobParams,
+    JobKind.ARCHIVE: ArchiveJobParams,
+    JobKind.PARQUET: ParquetJobParams,
+}
+
+class JobCreate(BaseModel):
+    kind: JobKind
+    params: Dict[str, Any] = Field(default_factory=dict)
+
+class JobResponse(BaseModel):
+    id: str
+    kind: JobKind
+    status: JobStatus
+    params: Dict[str, Any]
+    progress: int
+    total: Optional[int] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    attempts: int
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    # Set once a downloadable result exists
+    result_url: Optional[str] = None
+    
+    @validator('id', pre=True)
+    def id_as_string(cls, v):
+        # Models hold UUIDs
+        return str(v)
+    
+    class Config:
+        from_attributes = True
@@ -40,6 +40,7 @@ class LicenseBase(BaseModel):
     description: Optional[str] = None
     conditions: Optional[str] = None
     is_renewable: bool = True
+    business_id: Optional[int] = None
     
     @validator('expiration_date')
     def expiration_after_issued(cls, v, values):
@@ -65,12 +66,29 @@ class LicenseUpdate(BaseModel):
     description: Optional[str] = None
     conditions: Optional[str] = None
     is_renewable: Optional[bool] = None
+    business_id: Optional[int] = None
 
 class LicenseResponse(LicenseBase):
     id: str
     created_at: datetime
     updated_at: datetime
     
+    # Centroid of the ZIP code, once loaded
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    
+    # Full-text search only
+    rank: Optional[float] = None
+    highlight: Optional[str] = None
+    
+    # Radius search (near_zip) only
+    distance_miles: Optional[float] = None
+    
+    @validator('id', pre=True)
+    def id_as_string(cls, v):
+        # Models hold UUIDs
+        return str(v)
+    
     class Config:
         from_attributes = True
 
@@ -82,8 +100,15 @@ class LicenseSearchFilters(BaseModel):
     city: Optional[str] = None
     state: Optional[str] = None
     zip_code: Optional[str] = None
+    issuing_authority: Optional[str] = None
     expires_before: Optional[datetime] = None
     expires_after: Optional[datetime] = None
+    q: Optional[str] = None
+    highlight: bool = False
+    include_archived: bool = False
+    near_zip: Optional[str] = None
+    radius_miles: Optional[float] = Field(None, gt=0)
+    sort_by_distance: bool = False
     
 class PaginatedResponse(BaseModel):
     items: List[LicenseResponse]
@@ -97,3 +122,66 @@ class PaginatedResponse(BaseModel):
         total = values.get('total', 0)
         size = values.get('size', 1)
         return (total + size - 1) // size
+
+class LicenseBulkUpdate(BaseModel):
+    filters: LicenseSearchFilters
+    update: LicenseUpdate
+    dry_run: bool = False
+
+class LicenseBulkUpdateResponse(BaseModel):
+    matched: int
+    updated: int
+    dry_run: bool
+
+class SuggestField(str, Enum):
+    BUSINESS_NAME = "business_name"
+    LICENSE_NUMBER = "license_number"
+
+class Suggestion(BaseModel):
+    id: str
+    value: str
+
+class SuggestResponse(BaseModel):
+    field: SuggestField
+    prefix: str
+    items: List[Suggestion]
+
+class LicenseChangeResponse(BaseModel):
+    id: int
+    operation: str
+    license_id: str
+    license_number: str
+    changed_at: datetime
+    # Current state of the license; None once it has been deleted
+    license: Optional[LicenseResponse] = None
+
+class ChangeFeedResponse(BaseModel):
+    changes: List[LicenseChangeResponse]
+    next_token: Optional[str] = None
+    has_more: bool
+
+class ExpiringLicense(BaseModel):
+    id: str
+    license_number: str
+    business_name: str
+    business_type: LicenseType
+    issuing_authority: str
+    city: str
+    state: str
+    expiration_date: datetime
+
+class ExpiringLicensesResponse(BaseModel):
+    within_days: int
+    items: List[ExpiringLicense]
+    next_cursor: Optional[str] = None
+    has_more: bool
+
+class ExpiringGroup(BaseModel):
+    issuing_authority: str
+    state: str
+    license_count: int
+
+class ExpiringSummaryResponse(BaseModel):
+    within_days: int
+    total: int
+    groups: List[ExpiringGroup]
@@ -1,35 +1,247 @@
-from app.database import SessionLocal
-from app.models.business import Business
-from app.models.license import License
-
-db = SessionLocal()
-
-# Example business
-business = Business(
-    dba_number="12345",
-    name="Keith's Coffee",
-    business_type="Retail",
-    physical_address="123 Main St",
-    mailing_address="PO Box 1",
-    owner_name="Keith",
-    owner_contact="555-1234",
-    employee_count=5,
-    start_date="2020-01-01"
-)
-db.add(business)
-db.commit()
-db.refresh(business)
-
-# Example license
-license = License(
-    license_number="ABC123",
-    license_type="Retail",
-    issue_date="2020-01-01",
-    expiration_date="2025-01-01",
-    issuing_authority="City",
-    status="Active",
-    business_id=business.id
-)
-db.add(license)
-db.commit()
-db.close()
\ No newline at end of file
+from sqlalchemy.engine import make_url
+from sqlalchemy import text
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from itertools import accumulate
+from typing import Callable, List, Optional, Tuple
+import asyncio
+import asyncpg
+import io
+import logging
+import random
+import uuid
+
+from app.core.bloom import license_number_filter
+from app.core.cache import cache
+from app.core.config import settings
+from app.models.license import BusinessLicense, LicenseStatus, LicenseType
+
+logger = logging.getLogger(__name__)
+
+# Approximate population shares; a handful of states hold most licenses
+STATE_WEIGHTS = {
+    "CA": 39.0, "TX": 30.0, "FL": 22.2, "NY": 19.6, "PA": 13.0, "IL": 12.5, "OH": 11.8,
+    "GA": 11.0, "NC": 10.8, "MI": 10.0, "NJ": 9.3, "VA": 8.7, "WA": 7.8, "AZ": 7.4,
+    "TN": 7.1, "MA": 7.0, "IN": 6.9, "MO": 6.2, "MD": 6.2, "WI": 5.9, "CO": 5.9,
+    "MN": 5.7, "SC": 5.4, "AL": 5.1, "LA": 4.6, "KY": 4.5, "OR": 4.2, "OK": 4.1,
+    "CT": 3.6, "UT": 3.4, "IA": 3.2, "NV": 3.2, "AR": 3.1, "MS": 2.9, "KS": 2.9,
+    "NM": 2.1, "NE": 2.0, "ID": 1.9, "WV": 1.8, "HI": 1.4, "NH": 1.4, "ME": 1.4,
+    "MT": 1.1, "RI": 1.1, "DE": 1.0, "SD": 0.9, "ND": 0.8, "AK": 0.7, "VT": 0.6, "WY": 0.6,
+}
+STATES = list(STATE_WEIGHTS)
+STATE_CUMULATIVE = list(accumulate(STATE_WEIGHTS.values()))
+
+CITY_STEMS = ["Spring", "River", "Oak", "Maple", "Cedar", "Lake", "Fair", "Green", "Clear",
+              "Pine", "Brook", "Ash", "Elm", "Mill", "Stone", "Rock", "Sun", "Bay", "Red", "Glen"]
+CITY_SUFFIXES = ["field", "ton", "ville", " Falls", " City", "port", "wood", "dale", " Springs", "view"]
+CITIES_PER_STATE = 150
+# Each state's block of ZIP codes, spaced so the last state's stay five digits
+ZIP_STRIDE = 89999 // len(STATES)
+ZIP_SPACING = ZIP_STRIDE // CITIES_PER_STATE
+
+TYPE_WEIGHTS = {
+    LicenseType.BUSINESS: 35, LicenseType.RETAIL: 25, LicenseType.FOOD_SERVICE: 15,
+    LicenseType.PROFESSIONAL: 15, LicenseType.TRADE: 10,
+}
+NAME_WORDS = {
+    LicenseType.BUSINESS: ["Consulting", "Holdings", "Services", "Partners", "Group", "Ventures"],
+    LicenseType.RETAIL: ["Market", "Boutique", "Hardware", "Books", "Florist", "Outfitters"],
+    LicenseType.FOOD_SERVICE: ["Bakery", "Cafe", "Diner", "Grill", "Kitchen", "Pizzeria"],
+    LicenseType.PROFESSIONAL: ["Dental", "Law Office", "Accounting", "Clinic", "Architects", "Engineering"],
+    LicenseType.TRADE: ["Plumbing", "Electric", "Roofing", "Landscaping", "Auto Repair", "Construction"],
+}
+OWNER_NAMES = ["Smith", "Garcia", "Johnson", "Nguyen", "Patel", "Kim", "Brown", "Lopez",
+               "Miller", "Davis", "Wilson", "Chen", "Martin", "Lee", "Walker", "Young"]
+DESCRIPTION_WORDS = (
+    "family owned operated licensed insured local community service quality fresh "
+    "professional certified residential commercial repair installation retail wholesale "
+    "custom seasonal organic handmade daily weekly delivery catering consulting support "
+    "equipment supplies products customers neighborhood downtown serving since years"
+).split()
+CONDITIONS = [
+    "Annual fire inspection required",
+    "Health inspection every six months",
+    "No sales after 10pm",
+    "Signage must comply with municipal code",
+    "Proof of insurance on file",
+    "Limited to posted occupancy",
+]
+
+COLUMNS = [
+    "id", "license_number", "business_name", "business_type", "status",
+    "issued_date", "expiration_date", "issuing_authority", "street_address",
+    "city", "state", "zip_code", "contact_person", "phone", "email",
+    "description", "conditions", "is_renewable", "created_at", "updated_at",
+]
+
+def _city(state_index: int, rank: int) -> Tuple[str, str]:
+    """Name and ZIP code of a state's rank-th city"""
+    name = f"{CITY_STEMS[(rank * 7 + state_index) % len(CITY_STEMS)]}{CITY_SUFFIXES[rank % len(CITY_SUFFIXES)]}"
+    if rank >= len(CITY_STEMS):
+        name = f"{name} {rank // len(CITY_STEMS) + 1}"
+    return name, f"{10000 + state_index * ZIP_STRIDE + rank * ZIP_SPACING:05d}"
+
+def _text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(DESCRIPTION_WORDS) for _ in range(words)).capitalize()
+
+def chunk_bounds(rows: int, chunk_size: int) -> List[Tuple[int, int]]:
+    """(start, size) of each chunk of rows; only the last may be short"""
+    return [(start, min(chunk_size, rows - start)) for start in range(0, rows, chunk_size)]
+
+def generate_chunk(
+    seed: int, chunk: int, start: int, size: int, prefix: str, as_of: datetime, loaded_at: datetime
+) -> bytes:
+    """COPY text-format rows for one chunk, numbered from start
+
+    Rows depend only on (seed, chunk, start, prefix, as_of), never on which
+    worker generates them; a short chunk is the beginning of the full one.
+    updated_at is loaded_at, so incremental snapshot refreshes pick the rows up.
+    """
+    rng = random.Random(f"{seed}:{chunk}")
+    types, type_weights = zip(*TYPE_WEIGHTS.items())
+    out = io.StringIO()
+    for i in range(start, start + size):
+        state_index = rng.choices(range(len(STATES)), cum_weights=STATE_CUMULATIVE)[0]
+        state = STATES[state_index]
+        # Zipf-like city sizes: a few cities hold most of a state's licenses
+        city, zip_code = _city(state_index, min(int((rng.paretovariate(1.1) - 1) * 4), CITIES_PER_STATE - 1))
+        license_type = rng.choices(types, weights=type_weights)[0]
+        owner = rng.choice(OWNER_NAMES)
+        name = f"{owner} {rng.choice(NAME_WORDS[license_type])}"
+
+        # Issue dates skew recent (exponential, capped at ten years) on 1-5
+        # year terms, so about a third have expired by as_of
+        age = min(int(rng.expovariate(1 / 700)), 3650)
+        issued = as_of - timedelta(days=age, seconds=rng.randint(0, 86399))
+        expires = issued + timedelta(days=365 * rng.choice((1, 2, 2, 3, 5)))
+        if expires < as_of:
+            status = rng.choices(
+                (LicenseStatus.EXPIRED, LicenseStatus.INACTIVE, LicenseStatus.SUSPENDED), weights=(85, 10, 5)
+            )[0]
+        else:
+            status = rng.choices(
+                (LicenseStatus.ACTIVE, LicenseStatus.INACTIVE, LicenseStatus.SUSPENDED), weights=(88, 7, 5)
+            )[0]
+
+        # Log-normal description lengths: mostly a sentence, occasionally a paragraph
+        description = _text(rng, max(3, min(200, int(rng.lognormvariate(2.5, 0.7)))))
+        conditions = rng.choice(CONDITIONS) if rng.random() < 0.3 else "\\N"
+        has_contact = rng.random() < 0.6
+
+        out.write("\t".join((
+            str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+            f"{prefix}{state}-{i:09d}",
+            name,
+            license_type.value,
+            status.value,
+            issued.isoformat(),
+            expires.isoformat(),
+            f"{city} Licensing Office",
+            f"{rng.randint(1, 9999)} {rng.choice(CITY_STEMS)} St",
+            city,
+            state,
+            zip_code,
+            f"{rng.choice(OWNER_NAMES)} {owner}" if has_contact else "\\N",
+            f"555-{rng.randint(0, 9999):04d}" if has_contact else "\\N",
+            f"info{i}@example.com" if has_contact else "\\N",
+            description,
+            conditions,
+            "t" if license_type != LicenseType.PROFESSIONAL or rng.random() < 0.5 else "f",
+            issued.isoformat(),
+            loaded_at.isoformat(),
+        )))
+        out.write("\n")
+    return out.getvalue().encode()
+
+def _dsn(database_url: str) -> str:
+    # asyncpg takes a plain libpq-style URL without the SQLAlchemy driver suffix
+    return make_url(database_url).set(drivername="postgresql").render_as_string(hide_password=False)
+
+async def _copy(dsn: str, seed: int, chunk: int, start: int, size: int, prefix: str, as_of: datetime) -> None:
+    await cache.init_redis()
+    connection = await asyncpg.connect(dsn)
+    try:
+        # Database clock, in the same naive form stored in updated_at
+        loaded_at = await connection.fetchval("SELECT localtimestamp")
+        data = generate_chunk(seed, chunk, start, size, prefix, as_of, loaded_at)
+        # COPY bypasses the service layer, so feed the license number filter
+        # here, before the rows commit
+        await license_number_filter.add_many(
+            line.split(b"\t", 2)[1].decode() for line in data.splitlines()
+        )
+        await connection.copy_to_table(
+            BusinessLicense.__tablename__, source=io.BytesIO(data), columns=COLUMNS, format="text"
+        )
+    finally:
+        await connection.close()
+        await cache.close_redis()
+
+def _load_chunk(job: tuple) -> int:
+    """Worker process: generate one chunk and COPY it in on its own connection"""
+    asyncio.run(_copy(*job))
+    # The chunk's size
+    return job[4]
+
+def _secondary_indexes(conn) -> List[Tuple[str, str]]:
+    """Non-unique indexes of business_licenses, cheaper to rebuild than maintain during a bulk load"""
+    rows = conn.execute(text(
+        "SELECT indexname, indexdef FROM pg_indexes "
+        "WHERE tablename = :table AND schemaname = current_schema() AND indexdef NOT LIKE 'CREATE UNIQUE%'"
+    ), {"table": BusinessLicense.__tablename__})
+    return [(row.indexname, row.indexdef.replace(" ON ONLY ", " ON ")) for row in rows]
+
+async def generate_licenses(
+    rows: int,
+    seed: int = settings.SEED_RANDOM_SEED,
+    workers: int = settings.SEED_WORKERS,
+    chunk_size: int = settings.SEED_CHUNK_SIZE,
+    prefix: str = "GEN-",
+    as_of: Optional[datetime] = None,
+    drop_indexes: bool = True,
+    on_progress: Optional[Callable[[int], None]] = None
+) -> int:
+    """Generate rows synthetic licenses in parallel and COPY them into business_licenses
+
+    COPY records no change log entries, so the next Parquet snapshot has to
+    be a full one.
+    """
+    from app.core.database import engine
+
+    as_of = as_of or datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    dsn = _dsn(settings.DATABASE_URL)
+
+    indexes = []
+    if drop_indexes:
+        async with engine.begin() as conn:
+            indexes = await conn.run_sync(_secondary_indexes)
+            for name, _ in indexes:
+                await conn.execute(text(f"DROP INDEX {name}"))
+
+    loaded = 0
+    try:
+        loop = asyncio.get_running_loop()
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            jobs = [
+                loop.run_in_executor(pool, _load_chunk, (dsn, seed, chunk, start, size, prefix, as_of))
+                for chunk, (start, size) in enumerate(chunk_bounds(rows, chunk_size))
+            ]
+            for job in asyncio.as_completed(jobs):
+                loaded += await job
+                if on_progress:
+                    on_progress(loaded)
+    finally:
+        if indexes:
+            logger.info(f"Rebuilding {len(indexes)} indexes")
+            async with engine.begin() as conn:
+                for _, definition in indexes:
+                    await conn.execute(text(definition))
+        async with engine.connect() as conn:
+            await conn.execute(text(f"ANALYZE {BusinessLicense.__tablename__}"))
+            await conn.commit()
+
+    logger.info(f"Generated {loaded} licenses (seed {seed}, as of {as_of.date()})")
+    return loaded
+
+if __name__ == "__main__":
+    # Small sample for local development; use cli generate-licenses for more
+    asyncio.run(generate_licenses(1000, chunk_size=1000, workers=1, drop_indexes=False))
@@ -0,0 +1,98 @@
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy import select, insert, delete, func, text
+from sqlalchemy.engine import Row
+from typing import Callable, List, Optional
+import logging
+
+from app.models.license import BusinessLicense
+from app.models.license_archive import BusinessLicenseArchive
+from app.models.license_change import ChangeOperation
+from app.services.license_service import license_cache_keys
+from app.services.change_service import ChangeService
+from app.core.cache import cache
+from app.core.config import settings
+from app.core.database import engine
+
+logger = logging.getLogger(__name__)
+
+# Columns copied as-is; archived_at defaults and search_vector is generated
+ARCHIVED_COLUMNS = [
+    column.name
+    for column in BusinessLicenseArchive.__table__.columns
+    if column.name not in ("archived_at", "search_vector")
+]
+
+class ArchiveService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def archive_batch(self, older_than_years: int, batch_size: int) -> List[Row]:
+        """Move one batch of long-expired licenses into the archive table"""
+        candidates = (
+            select(BusinessLicense.id)
+            .where(
+                BusinessLicense.expiration_date
+                < func.now() - func.make_interval(older_than_years)
+            )
+            .order_by(BusinessLicense.expiration_date)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        # DELETE ... RETURNING feeds the INSERT in one statement, so a row is
+        # never in both tables or in neither
+        moved = (
+            delete(BusinessLicense)
+            .where(BusinessLicense.id.in_(candidates.scalar_subquery()))
+            .returning(*[BusinessLicense.__table__.c[name] for name in ARCHIVED_COLUMNS])
+            .cte("moved")
+        )
+        stmt = (
+            insert(BusinessLicenseArchive)
+            .from_select(ARCHIVED_COLUMNS, select(*[moved.c[name] for name in ARCHIVED_COLUMNS]))
+            .returning(
+                BusinessLicenseArchive.id,
+                BusinessLicenseArchive.license_number,
+                BusinessLicenseArchive.state,
+                BusinessLicenseArchive.status,
+            )
+        )
+        result = await self.db.execute(stmt)
+        archived = result.all()
+        await ChangeService(self.db).record_changes(archived, ChangeOperation.ARCHIVE)
+        await self.db.commit()
+
+        keys = [key for row in archived for key in license_cache_keys(row.id, row.license_number)]
+        await cache.delete_many(keys)
+        return archived
+
+    async def archive_expired(
+        self,
+        older_than_years: int = settings.ARCHIVE_AFTER_YEARS,
+        batch_size: int = settings.ARCHIVE_BATCH_SIZE,
+        max_batches: Optional[int] = None,
+        on_progress: Optional[Callable[[int, int], None]] = None,
+    ) -> int:
+        """Archive licenses expired for longer than a number of years; returns the number moved"""
+        total = 0
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            archived = await self.archive_batch(older_than_years, batch_size)
+            if not archived:
+                break
+            batches += 1
+            total += len(archived)
+            logger.info(f"Archived batch {batches}: {len(archived)} licenses ({total} total)")
+            if on_progress:
+                on_progress(batches, total)
+            if len(archived) < batch_size:
+                break
+
+        logger.info(f"Archived {total} expired licenses in {batches} batches")
+        return total
+
+async def vacuum_live_table(license_engine: AsyncEngine = engine):
+    """Make space freed by archiving reusable and refresh planner statistics"""
+    # VACUUM can't run inside a transaction block
+    async with license_engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text(f"VACUUM (ANALYZE) {BusinessLicense.__tablename__}"))
@@ -1,19 +1,88 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+from typing import Iterable, Optional, Set
+import logging
+
 from app.models.business import Business
-from sqlalchemy.orm import Session
+from app.schemas.business import BusinessCreate, BusinessResponse, BusinessListResponse
+from app.schemas.license import LicenseResponse
+
+logger = logging.getLogger(__name__)
+
+class UnknownBusinessError(ValueError):
+    """A license refers to a business that doesn't exist"""
+
+    def __init__(self, business_id: int):
+        super().__init__(f"Business {business_id} does not exist")
+        self.business_id = business_id
+
+def business_response(business: Business, include_licenses: bool = False) -> BusinessResponse:
+    """Serialize a business, with its licenses if they were eager loaded"""
+    # Built column by column: Business.licenses raises unless it was loaded
+    data = {column.key: getattr(business, column.key) for column in Business.__table__.columns}
+    if include_licenses:
+        data["licenses"] = [LicenseResponse.from_orm(license_obj) for license_obj in business.licenses]
+    return BusinessResponse(**data)
 
 class BusinessService:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
 
-    def create_business(self, business_data):
-        business_obj = Business(**business_data)
+    async def create_business(self, business_data: BusinessCreate) -> Business:
+        """Create a new business"""
+        business_obj = Business(**business_data.dict())
         self.db.add(business_obj)
-        self.db.commit()
-        self.db.refresh(business_obj)
+        await self.db.commit()
+        await self.db.refresh(business_obj)
+
+        logger.info(f"Created business: {business_obj.id}")
         return business_obj
 
-    def get_business(self, business_id):
-        return self.db.query(Business).filter(Business.id == business_id).first()
+    async def get_business(self, business_id: int, include_licenses: bool = False) -> Optional[Business]:
+        """Get a business by ID; with include_licenses, its licenses in one more query"""
+        stmt = select(Business).where(Business.id == business_id)
+        if include_licenses:
+            stmt = stmt.options(selectinload(Business.licenses))
+        result = await self.db.execute(stmt)
+        return result.scalar_one_or_none()
+
+    async def existing_ids(self, business_ids: Iterable[int]) -> Set[int]:
+        """Those of business_ids that belong to a business"""
+        business_ids = set(business_ids)
+        if not business_ids:
+            return set()
+        result = await self.db.execute(select(Business.id).where(Business.id.in_(business_ids)))
+        return set(result.scalars())
+
+    async def list_businesses(
+        self,
+        after: Optional[str] = None,
+        size: int = 100,
+        include_licenses: bool = False
+    ) -> BusinessListResponse:
+        """Businesses by ID, one keyset page at a time
+
+        With include_licenses, the licenses of the whole page are loaded in a
+        single extra query (WHERE business_id IN ...), however many
+        businesses or licenses the page holds.
+        """
+        stmt = select(Business)
+        if after:
+            # Cursors are the last ID of the previous page
+            stmt = stmt.where(Business.id > int(after))
+        stmt = stmt.order_by(Business.id).limit(size + 1)
+        if include_licenses:
+            stmt = stmt.options(selectinload(Business.licenses))
+
+        result = await self.db.execute(stmt)
+        businesses = result.scalars().all()
+
+        has_more = len(businesses) > size
+        businesses = businesses[:size]
 
-    def get_all_businesses(self):
-        return self.db.query(Business).all()
\ No newline at end of file
+        return BusinessListResponse(
+            items=[business_response(business, include_licenses) for business in businesses],
+            next_cursor=str(businesses[-1].id) if has_more else None,
+            has_more=has_more
+        )
@@ -0,0 +1,151 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, insert, func, tuple_, text
+from typing import Any, Dict, Iterable, Optional, Sequence, Tuple
+import json
+import logging
+
+from app.models.license import BusinessLicense
+from app.models.license_change import LicenseChange, ChangeOperation
+from app.schemas.license import ChangeFeedResponse, LicenseChangeResponse, LicenseResponse
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+def encode_change_token(txid: int, change_id: int) -> str:
+    """Opaque resume token for the change feed"""
+    return f"{txid}-{change_id}"
+
+def decode_change_token(token: str) -> Tuple[int, int]:
+    """Parse a resume token, raising ValueError if it is malformed"""
+    txid, _, change_id = token.partition("-")
+    return int(txid), int(change_id)
+
+def license_event(license_obj: Any, operation: ChangeOperation) -> Dict[str, Any]:
+    """Notification payload for a license write"""
+    status = license_obj.status
+    return {
+        "operation": operation.value,
+        "license_id": str(license_obj.id),
+        "license_number": license_obj.license_number,
+        "state": license_obj.state,
+        "status": getattr(status, "value", status),
+    }
+
+class ChangeService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    @property
+    def _is_postgres(self) -> bool:
+        return self.db.bind.dialect.name == "postgresql"
+
+    def _txid(self):
+        return func.txid_current() if self._is_postgres else 0
+
+    async def record_change(self, license_obj: BusinessLicense, operation: ChangeOperation) -> None:
+        """Record a change and notify listeners within the current transaction; the caller commits"""
+        await self.record_changes([license_obj], operation)
+
+    async def record_changes(self, licenses: Iterable[Any], operation: ChangeOperation) -> None:
+        """Record changes for many licenses in one statement; the caller commits
+
+        Accepts anything with id, license_number, state and status attributes,
+        such as BusinessLicense instances or rows from UPDATE ... RETURNING.
+        """
+        licenses = list(licenses)
+        if not licenses:
+            return
+
+        # executemany rather than one multi-row VALUES, so the statement
+        # compiles once however many licenses a bulk write touches
+        await self.db.execute(insert(LicenseChange).values(txid=self._txid()), [
+            {
+                "license_id": license_obj.id,
+                "license_number": license_obj.license_number,
+                "operation": operation.value,
+            }
+            for license_obj in licenses
+        ])
+
+        if self._is_postgres:
+            # NOTIFY is transactional: listeners only hear about committed writes
+            payloads = [json.dumps(license_event(license_obj, operation)) for license_obj in licenses]
+            await self.db.execute(
+                text("SELECT pg_notify(:channel, payload) FROM unnest(CAST(:payloads AS text[])) AS payload"),
+                {"channel": settings.LICENSE_EVENTS_CHANNEL, "payloads": payloads},
+            )
+
+    def _visible(self, stmt):
+        if self._is_postgres:
+            # Only transactions older than every one still running, so a slow
+            # writer can never commit a change behind a position already read
+            stmt = stmt.where(
+                LicenseChange.txid < func.txid_snapshot_xmin(func.txid_current_snapshot())
+            )
+        return stmt
+
+    async def last_position(self) -> Tuple[int, int]:
+        """(txid, id) of the last change visible to every future reader, or (0, 0)"""
+        stmt = self._visible(select(LicenseChange.txid, LicenseChange.id))
+        result = await self.db.execute(stmt.order_by(LicenseChange.txid.desc(), LicenseChange.id.desc()).limit(1))
+        row = result.first()
+        return (row.txid, row.id) if row else (0, 0)
+
+    def _after(self, stmt, since: Tuple[int, int], operations: Sequence[ChangeOperation]):
+        return self._visible(stmt).where(
+            tuple_(LicenseChange.txid, LicenseChange.id) > tuple_(*since),
+            LicenseChange.operation.in_([operation.value for operation in operations]),
+        )
+
+    async def changes_after(self, since: Tuple[int, int], operations: Sequence[ChangeOperation]) -> list:
+        """Change log rows of some operations after a (txid, id) position, oldest first"""
+        stmt = self._after(
+            select(
+                LicenseChange.txid,
+                LicenseChange.id,
+                LicenseChange.license_id,
+                LicenseChange.license_number,
+                LicenseChange.operation,
+            ),
+            since,
+            operations,
+        ).order_by(LicenseChange.txid, LicenseChange.id)
+        result = await self.db.execute(stmt)
+        return result.all()
+
+    def license_ids_after(self, since: Tuple[int, int], operations: Sequence[ChangeOperation]):
+        """Subquery of the licenses with changes of some operations after a (txid, id) position"""
+        return self._after(select(LicenseChange.license_id), since, operations).scalar_subquery()
+
+    async def list_changes(self, since: Optional[str] = None, limit: int = 100) -> ChangeFeedResponse:
+        """Changes after a resume token, oldest first, with the current license state"""
+        stmt = self._visible(
+            select(LicenseChange, BusinessLicense)
+            .outerjoin(BusinessLicense, BusinessLicense.id == LicenseChange.license_id)
+        )
+
+        if since:
+            txid, change_id = decode_change_token(since)
+            stmt = stmt.where(tuple_(LicenseChange.txid, LicenseChange.id) > tuple_(txid, change_id))
+
+        stmt = stmt.order_by(LicenseChange.txid, LicenseChange.id).limit(limit + 1)
+        result = await self.db.execute(stmt)
+        rows = result.all()
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        changes = [
+            LicenseChangeResponse(
+                id=change.id,
+                operation=change.operation,
+                license_id=str(change.license_id),
+                license_number=change.license_number,
+                changed_at=change.changed_at,
+                license=LicenseResponse.from_orm(license_obj) if license_obj else None,
+            )
+            for change, license_obj in rows
+        ]
+        next_token = encode_change_token(rows[-1][0].txid, rows[-1][0].id) if rows else since
+
+        return ChangeFeedResponse(changes=changes, next_token=next_token, has_more=has_more)
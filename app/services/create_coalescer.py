@@ -0,0 +1,134 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import IntegrityError
+from typing import List, Optional, Set, Tuple, Union
+import asyncio
+import logging
+
+from app.models.license import BusinessLicense
+from app.models.license_change import ChangeOperation
+from app.schemas.license import LicenseCreate
+from app.services.change_service import ChangeService
+from app.core.bloom import license_number_filter
+from app.core.cache import cache
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+Pending = Tuple[LicenseCreate, asyncio.Future]
+
+class CreateCoalescer:
+    """Groups concurrent license creates into shared transactions (group commit)
+
+    A create waits up to CREATE_COALESCE_WINDOW_MS for others to join it, or
+    until CREATE_COALESCE_MAX_BATCH have, then the whole batch is inserted
+    and committed at once. If any row conflicts, the batch is retried one
+    savepoint per row, so each caller still gets its own license or error.
+    """
+
+    def __init__(self):
+        self._batch: Optional[List[Pending]] = None
+        self._timer: Optional[asyncio.Task] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    @property
+    def enabled(self) -> bool:
+        return settings.CREATE_COALESCE_ENABLED
+
+    async def create(self, license_data: LicenseCreate) -> BusinessLicense:
+        """Create a license as part of the next batch; raises what its own insert raised"""
+        future = asyncio.get_running_loop().create_future()
+        if self._batch is None:
+            self._batch = []
+            self._timer = asyncio.create_task(self._flush_later())
+        self._batch.append((license_data, future))
+        if len(self._batch) >= settings.CREATE_COALESCE_MAX_BATCH:
+            self._take()
+        return await future
+
+    async def drain(self):
+        """Write the open batch now and wait for every batch in flight"""
+        if self._batch:
+            self._take()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _flush_later(self):
+        await asyncio.sleep(settings.CREATE_COALESCE_WINDOW_MS / 1000)
+        self._timer = None
+        self._take()
+
+    def _take(self) -> None:
+        """Close the open batch and write it in the background"""
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._batch = self._batch, None
+        task = asyncio.create_task(self._write(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _write(self, batch: List[Pending]):
+        from app.core.database import AsyncSessionLocal
+
+        results: List[Union[BusinessLicense, Exception]]
+        async with AsyncSessionLocal() as session:
+            try:
+                try:
+                    results = await self._insert_all(session, [data for data, _ in batch])
+                except IntegrityError:
+                    await session.rollback()
+                    results = await self._insert_each(session, [data for data, _ in batch])
+            except Exception as e:
+                await session.rollback()
+                logger.error(f"Error creating batch of {len(batch)} licenses: {str(e)}")
+                results = [e] * len(batch)
+
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    async def _insert_all(self, session: AsyncSession, items: List[LicenseCreate]) -> List[BusinessLicense]:
+        licenses = [BusinessLicense(**license_data.dict()) for license_data in items]
+        session.add_all(licenses)
+        await session.flush()
+        await self._commit(session, licenses)
+        return licenses
+
+    async def _insert_each(
+        self,
+        session: AsyncSession,
+        items: List[LicenseCreate]
+    ) -> List[Union[BusinessLicense, Exception]]:
+        results: List[Union[BusinessLicense, Exception]] = []
+        for license_data in items:
+            license_obj = BusinessLicense(**license_data.dict())
+            try:
+                async with session.begin_nested():
+                    session.add(license_obj)
+                    await session.flush()
+                results.append(license_obj)
+            except IntegrityError as e:
+                results.append(e)
+        await self._commit(session, [result for result in results if isinstance(result, BusinessLicense)])
+        return results
+
+    async def _commit(self, session: AsyncSession, licenses: List[BusinessLicense]):
+        if not licenses:
+            await session.rollback()
+            return
+        # Before commit: a rollback leaves harmless false positives, never a false negative
+        for license_obj in licenses:
+            await license_number_filter.add(license_obj.license_number)
+        await ChangeService(session).record_changes(licenses, ChangeOperation.CREATE)
+        await session.commit()
+
+        # Invalidate cache
+        await cache.delete("licenses_*")
+
+        logger.info(f"Created {len(licenses)} licenses in one transaction")
+
+# Global create coalescer instance
+create_coalescer = CreateCoalescer()
@@ -0,0 +1,140 @@
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy import select, insert, func, literal, literal_column, table, column, text
+from sqlalchemy.pool import NullPool
+from typing import Callable, List, Optional
+import logging
+import os
+import re
+
+from app.models.license import BusinessLicense
+from app.models.edge import edge_metadata, edge_licenses, EDGE_FTS_TABLE, EDGE_FTS_COLUMNS
+from app.core.config import settings
+from app.core.database import edge_database_url
+
+logger = logging.getLogger(__name__)
+
+# External-content FTS5 index over the text fields, keyed by the licenses' rowid
+FTS_DDL = (
+    f"CREATE VIRTUAL TABLE {EDGE_FTS_TABLE} USING fts5("
+    f"{', '.join(EDGE_FTS_COLUMNS)}, content='{edge_licenses.name}', content_rowid='rowid', "
+    "tokenize='porter unicode61 remove_diacritics 2')"
+)
+
+# bm25 column weights following ts_rank's defaults for search_vector's A/B/C weights
+FTS_WEIGHTS = (1.0, 0.4, 0.2)
+
+fts = table(EDGE_FTS_TABLE, column("rowid"), column(EDGE_FTS_TABLE))
+license_rowid = literal_column(f"{edge_licenses.name}.rowid")
+
+def fts_query(q: str) -> Optional[str]:
+    """Translate search syntax ("quoted phrases", or, -exclusions) into an FTS5 query
+
+    Returns None when nothing is left to match, e.g. only exclusions.
+    """
+    terms: List[str] = []
+    excluded: List[str] = []
+    pending_or = False
+    for phrase, word in re.findall(r'"([^"]*)"|(\S+)', q):
+        if word.lower() == "or":
+            pending_or = bool(terms)
+            continue
+        negate = word.startswith("-")
+        value = phrase if phrase else word.lstrip("-")
+        if not value.strip():
+            continue
+        # Quote every term so FTS5 operators and punctuation are matched literally
+        quoted = '"' + value.replace('"', '""') + '"'
+        if negate:
+            excluded.append(quoted)
+        elif pending_or:
+            terms[-1] = f"{terms[-1]} OR {quoted}"
+            pending_or = False
+        else:
+            terms.append(quoted)
+    if not terms:
+        return None
+    query = " AND ".join(f"({term})" for term in terms)
+    for term in excluded:
+        query = f"{query} NOT {term}"
+    return query
+
+def _fts_condition(q: str):
+    query = fts_query(q)
+    if query is None:
+        return literal(False)
+    return fts.c[EDGE_FTS_TABLE].match(query)
+
+def fts_match(q: str):
+    """Condition on business_licenses matching a full-text search"""
+    return license_rowid.in_(select(fts.c.rowid).where(_fts_condition(q)))
+
+def fts_results(q: str, highlight: bool = False):
+    """Subquery of matching rowids with their rank (higher is better, like
+    ts_rank) and optionally a snippet marked up like SEARCH_HEADLINE_OPTIONS
+
+    Join it on license_rowid; the FTS query runs once for all rows.
+    """
+    columns = [
+        fts.c.rowid,
+        (-func.bm25(literal_column(EDGE_FTS_TABLE), *FTS_WEIGHTS)).label("rank"),
+    ]
+    if highlight:
+        columns.append(
+            func.snippet(literal_column(EDGE_FTS_TABLE), -1, "<mark>", "</mark>", "...", 20).label("highlight")
+        )
+    return select(*columns).where(_fts_condition(q)).subquery("fts_results")
+
+class EdgeSnapshotService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def export(
+        self,
+        path: str,
+        states: Optional[List[str]] = None,
+        batch_size: int = settings.EDGE_EXPORT_BATCH_SIZE,
+        on_progress: Optional[Callable[[int], None]] = None
+    ) -> int:
+        """Write licenses, optionally for some states only, into a SQLite snapshot file
+
+        The file is built next to the target and renamed over it, so edge
+        workers reading the old snapshot are never handed a partial one.
+        """
+        building = f"{path}.building"
+        for stale in (building, f"{building}-wal", f"{building}-shm"):
+            if os.path.exists(stale):
+                os.remove(stale)
+
+        target = create_async_engine(edge_database_url(building, read_only=False), poolclass=NullPool)
+        try:
+            async with target.begin() as conn:
+                await conn.run_sync(edge_metadata.create_all)
+                await conn.execute(text(FTS_DDL))
+
+            columns = [BusinessLicense.__table__.c[c.name] for c in edge_licenses.columns]
+            stmt = select(*columns).execution_options(yield_per=batch_size)
+            if states:
+                stmt = stmt.where(BusinessLicense.state.in_(states))
+
+            total = 0
+            result = await self.db.stream(stmt)
+            async with target.begin() as conn:
+                async for rows in result.partitions():
+                    await conn.execute(insert(edge_licenses), [dict(row._mapping) for row in rows])
+                    total += len(rows)
+                    if on_progress:
+                        on_progress(total)
+                for command in ("rebuild", "optimize"):
+                    await conn.execute(text(f"INSERT INTO {EDGE_FTS_TABLE}({EDGE_FTS_TABLE}) VALUES ('{command}')"))
+                await conn.execute(text("ANALYZE"))
+
+            async with target.connect() as conn:
+                # WAL lets any number of readers share the file without locking
+                # each other out; it can't be switched inside a transaction
+                await conn.exec_driver_sql("PRAGMA journal_mode = WAL")
+        finally:
+            await target.dispose()
+
+        os.replace(building, path)
+        logger.info(f"Exported {total} licenses to edge snapshot {path}")
+        return total
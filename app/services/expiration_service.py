@@ -0,0 +1,84 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, func
+from sqlalchemy.engine import Row
+from typing import Callable, List, Optional
+import logging
+
+from app.models.license import BusinessLicense, LicenseStatus
+from app.models.license_change import ChangeOperation
+from app.services.license_service import license_cache_keys
+from app.services.change_service import ChangeService
+from app.core.cache import cache
+from app.core.config import settings
+from app.core.shards import shard_router
+
+logger = logging.getLogger(__name__)
+
+class ExpirationService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def expire_batch(self, batch_size: int) -> List[Row]:
+        """Mark one batch of overdue active licenses as expired"""
+        # Walks the partial active/expiration index; SKIP LOCKED lets concurrent
+        # writers and other batches proceed without waiting on these rows
+        overdue = (
+            select(BusinessLicense.id)
+            .where(
+                BusinessLicense.status == LicenseStatus.ACTIVE,
+                BusinessLicense.expiration_date < func.now(),
+            )
+            .order_by(BusinessLicense.expiration_date)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        stmt = (
+            update(BusinessLicense)
+            .where(BusinessLicense.id.in_(overdue.scalar_subquery()))
+            .values(status=LicenseStatus.EXPIRED, updated_at=func.now())
+            .returning(
+                BusinessLicense.id,
+                BusinessLicense.license_number,
+                BusinessLicense.state,
+                BusinessLicense.status,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.db.execute(stmt)
+        expired = result.all()
+        await ChangeService(self.db).record_changes(expired, ChangeOperation.UPDATE)
+        await self.db.commit()
+
+        keys = [key for row in expired for key in license_cache_keys(row.id, row.license_number)]
+        await cache.delete_many(keys)
+        return expired
+
+    async def expire_overdue(
+        self,
+        batch_size: int = settings.EXPIRE_LICENSES_BATCH_SIZE,
+        max_batches: Optional[int] = None,
+        on_progress: Optional[Callable[[int, int], None]] = None,
+    ) -> int:
+        """Expire overdue licenses in bounded batches; returns the number expired"""
+        total = 0
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            expired = await self.expire_batch(batch_size)
+            if not expired:
+                break
+            batches += 1
+            total += len(expired)
+            logger.info(f"Expired batch {batches}: {len(expired)} licenses ({total} total)")
+            if on_progress:
+                on_progress(batches, total)
+            if len(expired) < batch_size:
+                break
+
+        logger.info(f"Expired {total} overdue licenses in {batches} batches")
+        return total
+
+async def expire_licenses_job():
+    """Scheduled entry point: expire everything overdue in bounded batches, on every shard"""
+    for session_factory in shard_router.license_sessions():
+        async with session_factory() as session:
+            await ExpirationService(session).expire_overdue()
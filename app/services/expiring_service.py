@@ -0,0 +1,128 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, tuple_, text
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+from uuid import UUID
+import logging
+
+from app.models.expiring import license_expiring_soon, license_expiring_daily
+from app.schemas.license import (
+    ExpiringLicense,
+    ExpiringLicensesResponse,
+    ExpiringGroup,
+    ExpiringSummaryResponse
+)
+from app.core.database import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+def encode_expiring_cursor(expiration_date: datetime, license_id: UUID) -> str:
+    """Opaque keyset cursor for the expiring licenses listing"""
+    return f"{expiration_date.isoformat()}_{license_id}"
+
+def decode_expiring_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    """Parse a keyset cursor, raising ValueError if it is malformed"""
+    expiration_date, _, license_id = cursor.partition("_")
+    return datetime.fromisoformat(expiration_date), UUID(license_id)
+
+class ExpiringService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def list_expiring(
+        self,
+        within_days: int,
+        issuing_authority: Optional[str] = None,
+        state: Optional[str] = None,
+        after: Optional[str] = None,
+        size: int = 100
+    ) -> ExpiringLicensesResponse:
+        """Licenses expiring within a horizon, soonest first, one keyset page at a time"""
+        view = license_expiring_soon.c
+        # The view is as of its last refresh; drop licenses that have expired since
+        stmt = select(license_expiring_soon).where(
+            view.expiration_date >= func.now(),
+            view.expiration_date < func.now() + timedelta(days=within_days),
+        )
+
+        if issuing_authority:
+            stmt = stmt.where(view.issuing_authority == issuing_authority)
+
+        if state:
+            stmt = stmt.where(view.state == state)
+
+        if after:
+            expiration_date, license_id = decode_expiring_cursor(after)
+            stmt = stmt.where(tuple_(view.expiration_date, view.id) > tuple_(expiration_date, license_id))
+
+        stmt = stmt.order_by(view.expiration_date, view.id).limit(size + 1)
+        result = await self.db.execute(stmt)
+        rows = result.all()
+
+        has_more = len(rows) > size
+        rows = rows[:size]
+
+        items = [
+            ExpiringLicense(
+                id=str(row.id),
+                license_number=row.license_number,
+                business_name=row.business_name,
+                business_type=row.business_type,
+                issuing_authority=row.issuing_authority,
+                city=row.city,
+                state=row.state,
+                expiration_date=row.expiration_date,
+            )
+            for row in rows
+        ]
+        next_cursor = encode_expiring_cursor(rows[-1].expiration_date, rows[-1].id) if has_more else None
+
+        return ExpiringLicensesResponse(
+            within_days=within_days,
+            items=items,
+            next_cursor=next_cursor,
+            has_more=has_more
+        )
+
+    async def summary(self, within_days: int) -> ExpiringSummaryResponse:
+        """Licenses expiring within a horizon, counted per issuing authority and state"""
+        view = license_expiring_daily.c
+        license_count = func.sum(view.license_count)
+        # Whole days as of the last refresh, so edges are approximate
+        stmt = (
+            select(view.issuing_authority, view.state, license_count.label("license_count"))
+            .where(
+                view.expiration_day >= func.current_date(),
+                view.expiration_day < func.current_date() + within_days,
+            )
+            .group_by(view.issuing_authority, view.state)
+            .order_by(license_count.desc(), view.issuing_authority, view.state)
+        )
+        result = await self.db.execute(stmt)
+
+        groups = [
+            ExpiringGroup(
+                issuing_authority=row.issuing_authority,
+                state=row.state,
+                license_count=row.license_count,
+            )
+            for row in result
+        ]
+
+        return ExpiringSummaryResponse(
+            within_days=within_days,
+            total=sum(group.license_count for group in groups),
+            groups=groups
+        )
+
+    async def refresh_views(self) -> None:
+        """Recompute both views without blocking readers"""
+        for view in (license_expiring_soon, license_expiring_daily):
+            await self.db.execute(text(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {view.name}"))
+        await self.db.commit()
+        logger.info("Refreshed expiring license views")
+
+async def refresh_expiring_views_job():
+    """Scheduled entry point: refresh the renewal pipeline views"""
+    async with AsyncSessionLocal() as session:
+        await ExpiringService(session).refresh_views()
@@ -0,0 +1,316 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, insert, func, case, union_all
+from pydantic import ValidationError
+from datetime import timedelta
+from typing import Any, Awaitable, BinaryIO, Callable, Dict, List, Optional, Tuple
+from uuid import UUID
+import csv
+import gzip
+import logging
+import os
+
+from app.models.job import Job, JobKind, JobStatus
+from app.models.license import BusinessLicense
+from app.models.license_archive import BusinessLicenseArchive
+from app.models.license_change import ChangeOperation
+from app.schemas.job import JobResponse, ExportJobParams, ArchiveJobParams, ParquetJobParams
+from app.schemas.license import LicenseCreate
+from app.services.business_service import BusinessService, UnknownBusinessError
+from app.services.license_service import search_conditions
+from app.services.zip_service import search_origin
+from app.services.change_service import ChangeService
+from app.services.archive_service import ArchiveService
+from app.services.parquet_snapshot import ParquetSnapshotService
+from app.core.bloom import license_number_filter
+from app.core.cache import cache
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Called with (progress, total); total may be None
+ProgressCallback = Callable[[int, Optional[int]], Awaitable[None]]
+
+# (summary counts, path of the downloadable result or None)
+JobOutcome = Tuple[Dict[str, Any], Optional[str]]
+
+UPLOAD_SUFFIX = ".upload.csv"
+MAX_IMPORT_ERRORS = 10_000
+
+# Exported columns, in order; also the header imports understand
+EXPORT_COLUMNS = [column for column in BusinessLicense.__table__.columns if column.name != "search_vector"]
+
+def job_file_path(job_id: UUID, suffix: str) -> str:
+    """Input or result file of a job under JOB_RESULTS_DIR"""
+    return os.path.join(settings.JOB_RESULTS_DIR, f"{job_id}{suffix}")
+
+def save_upload(source: BinaryIO, path: str, max_bytes: int = settings.JOB_UPLOAD_MAX_BYTES) -> int:
+    """Copy an upload to disk; blocking, run it in a thread. Raises ValueError past max_bytes"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    size = 0
+    try:
+        with open(path, "wb") as out:
+            while chunk := source.read(1024 * 1024):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise ValueError(f"Upload exceeds {max_bytes} bytes")
+                out.write(chunk)
+    except Exception:
+        os.remove(path)
+        raise
+    return size
+
+def job_response(job: Job) -> JobResponse:
+    """Serialize a job with the download URL of its result, if any"""
+    response = JobResponse.from_orm(job)
+    if job.result_path:
+        response.result_url = f"{settings.API_V1_STR}/jobs/{job.id}/result"
+    return response
+
+class JobService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def submit(self, kind: JobKind, params: Dict[str, Any], job_id: Optional[UUID] = None) -> Job:
+        """Queue a job; params must already be validated and JSON-serializable"""
+        job_obj = Job(kind=kind.value, status=JobStatus.QUEUED.value, params=params)
+        if job_id:
+            job_obj.id = job_id
+        self.db.add(job_obj)
+        await self.db.commit()
+        await self.db.refresh(job_obj)
+
+        logger.info(f"Queued {kind.value} job {job_obj.id}")
+        return job_obj
+
+    async def get_job(self, job_id: UUID) -> Optional[Job]:
+        """Get a job by ID"""
+        result = await self.db.execute(select(Job).where(Job.id == job_id))
+        return result.scalar_one_or_none()
+
+    async def claim_next(self) -> Optional[Job]:
+        """Mark the oldest queued job running and return it, or None if the queue is empty
+
+        Runners on any number of workers can call this concurrently: SKIP
+        LOCKED hands each job to exactly one of them. Jobs whose runner
+        stopped heartbeating are first requeued, or failed once out of
+        attempts.
+        """
+        stale = (Job.status == JobStatus.RUNNING.value) & (
+            Job.heartbeat_at < func.now() - timedelta(seconds=settings.JOB_HEARTBEAT_TIMEOUT)
+        )
+        out_of_attempts = Job.attempts >= settings.JOB_MAX_ATTEMPTS
+        await self.db.execute(
+            update(Job)
+            .where(stale)
+            .values(
+                status=case((out_of_attempts, JobStatus.FAILED.value), else_=JobStatus.QUEUED.value),
+                error=case((out_of_attempts, "Job runner stopped responding"), else_=Job.error),
+                finished_at=case((out_of_attempts, func.now()), else_=None),
+            )
+        )
+
+        candidate = (
+            select(Job.id)
+            .where(Job.status == JobStatus.QUEUED.value)
+            .order_by(Job.created_at)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        result = await self.db.execute(
+            update(Job)
+            .where(Job.id == candidate)
+            .values(
+                status=JobStatus.RUNNING.value,
+                attempts=Job.attempts + 1,
+                started_at=func.now(),
+                heartbeat_at=func.now(),
+            )
+            .returning(Job)
+            .execution_options(populate_existing=True)
+        )
+        job_obj = result.scalar_one_or_none()
+        await self.db.commit()
+        return job_obj
+
+    async def heartbeat(self, job_id: UUID, progress: Optional[int] = None, total: Optional[int] = None) -> None:
+        """Show the job is alive, optionally recording its progress"""
+        values = {"heartbeat_at": func.now()}
+        if progress is not None:
+            values["progress"] = progress
+        if total is not None:
+            values["total"] = total
+        await self.db.execute(update(Job).where(Job.id == job_id).values(**values))
+        await self.db.commit()
+
+    async def finish(self, job_id: UUID, result: Dict[str, Any], result_path: Optional[str]) -> None:
+        """Record a job as succeeded"""
+        await self.db.execute(
+            update(Job)
+            .where(Job.id == job_id)
+            .values(status=JobStatus.SUCCEEDED.value, result=result, result_path=result_path,
+                    error=None, finished_at=func.now())
+        )
+        await self.db.commit()
+
+    async def fail(self, job_id: UUID, error: str) -> None:
+        """Record a job as failed; it is not retried"""
+        await self.db.execute(
+            update(Job)
+            .where(Job.id == job_id)
+            .values(status=JobStatus.FAILED.value, error=error, finished_at=func.now())
+        )
+        await self.db.commit()
+
+def _csv_value(value: Any) -> Any:
+    # Enum members write as their value, not LicenseType.RETAIL
+    return getattr(value, "value", value)
+
+async def export_licenses_job(db: AsyncSession, job: Job, report: ProgressCallback) -> JobOutcome:
+    """Write licenses matching search filters to a (gzipped) CSV file"""
+    params = ExportJobParams(**job.params)
+    conditions = search_conditions(params.filters, origin=await search_origin(db, params.filters))
+
+    count = await db.execute(select(func.count()).select_from(BusinessLicense).where(*conditions))
+    total = count.scalar()
+    await report(0, total)
+
+    path = job_file_path(job.id, ".csv.gz" if params.compress else ".csv")
+    partial = f"{path}.partial"
+    # Unordered so PostgreSQL can stream straight off the scan
+    stmt = select(*EXPORT_COLUMNS).where(*conditions).execution_options(yield_per=settings.JOB_BATCH_SIZE)
+
+    written = 0
+    opener = gzip.open if params.compress else open
+    with opener(partial, "wt", newline="", encoding="utf-8") as out:
+        writer = csv.writer(out)
+        writer.writerow([column.name for column in EXPORT_COLUMNS])
+        result = await db.stream(stmt)
+        async for rows in result.partitions():
+            writer.writerows([_csv_value(value) for value in row] for row in rows)
+            written += len(rows)
+            await report(written, total)
+    os.replace(partial, path)
+
+    return {"exported": written}, path
+
+async def _existing_license_numbers(db: AsyncSession, numbers: List[str]) -> set:
+    # Archived numbers stay taken, as for single creates
+    stmt = union_all(*[
+        select(model.license_number).where(model.license_number.in_(numbers))
+        for model in (BusinessLicense, BusinessLicenseArchive)
+    ])
+    result = await db.execute(stmt)
+    return set(result.scalars())
+
+async def _insert_licenses(db: AsyncSession, batch: List[Tuple[int, LicenseCreate]], errors: List[list]) -> int:
+    """Insert one batch of validated rows in a transaction, skipping taken license numbers and unknown businesses"""
+    existing = await _existing_license_numbers(db, [license_data.license_number for _, license_data in batch])
+    businesses = await BusinessService(db).existing_ids(
+        license_data.business_id for _, license_data in batch if license_data.business_id is not None
+    )
+    rows = []
+    for line, license_data in batch:
+        if license_data.license_number in existing:
+            errors.append([line, license_data.license_number, "License number already exists"])
+            continue
+        if license_data.business_id is not None and license_data.business_id not in businesses:
+            errors.append([line, license_data.license_number, str(UnknownBusinessError(license_data.business_id))])
+            continue
+        existing.add(license_data.license_number)
+        rows.append(license_data.dict())
+    if not rows:
+        return 0
+
+    result = await db.execute(
+        insert(BusinessLicense).returning(
+            BusinessLicense.id, BusinessLicense.license_number, BusinessLicense.state, BusinessLicense.status
+        ),
+        rows
+    )
+    created = result.all()
+    for row in created:
+        await license_number_filter.add(row.license_number)
+    await ChangeService(db).record_changes(created, ChangeOperation.CREATE)
+    await db.commit()
+    return len(created)
+
+async def import_licenses_job(db: AsyncSession, job: Job, report: ProgressCallback) -> JobOutcome:
+    """Validate an uploaded CSV and insert its licenses in batches
+
+    Rows that fail validation or reuse a license number are skipped and
+    listed in the result file; the rest are imported.
+    """
+    fields = set(LicenseCreate.__fields__)
+    errors: List[list] = []
+    imported = 0
+    processed = 0
+    batch: List[Tuple[int, LicenseCreate]] = []
+
+    with open(job_file_path(job.id, UPLOAD_SUFFIX), newline="", encoding="utf-8-sig") as source:
+        # Line 1 is the header
+        for line, row in enumerate(csv.DictReader(source), start=2):
+            # Empty cells are missing values; unknown columns (e.g. id from an export) are ignored
+            data = {key: value for key, value in row.items() if key in fields and value not in ("", None)}
+            try:
+                batch.append((line, LicenseCreate(**data)))
+            except ValidationError as e:
+                errors.append([line, row.get("license_number", ""), "; ".join(
+                    f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors()
+                )])
+            processed += 1
+
+            if len(batch) >= settings.JOB_BATCH_SIZE:
+                imported += await _insert_licenses(db, batch, errors)
+                batch = []
+                await report(processed, None)
+        if batch:
+            imported += await _insert_licenses(db, batch, errors)
+    await report(processed, processed)
+
+    if imported:
+        await cache.delete("licenses_*")
+
+    result_path = None
+    if errors:
+        result_path = job_file_path(job.id, ".errors.csv")
+        with open(result_path, "w", newline="", encoding="utf-8") as out:
+            writer = csv.writer(out)
+            writer.writerow(["line", "license_number", "error"])
+            # Duplicates are found a batch after validation errors
+            writer.writerows(sorted(errors)[:MAX_IMPORT_ERRORS])
+
+    return {"imported": imported, "rejected": len(errors)}, result_path
+
+async def archive_licenses_job(db: AsyncSession, job: Job, report: ProgressCallback) -> JobOutcome:
+    """Archive long-expired licenses, one batch per transaction"""
+    params = ArchiveJobParams(**job.params)
+    service = ArchiveService(db)
+
+    total = 0
+    while True:
+        archived = await service.archive_batch(params.older_than_years, params.batch_size)
+        if not archived:
+            break
+        total += len(archived)
+        await report(total, None)
+
+    return {"archived": total}, None
+
+async def parquet_snapshot_job(db: AsyncSession, job: Job, report: ProgressCallback) -> JobOutcome:
+    """Write a full or incremental Parquet snapshot to PARQUET_OUTPUT_DIR"""
+    params = ParquetJobParams(**job.params)
+
+    async def progress(written: int) -> None:
+        await report(written, None)
+
+    snapshot = await ParquetSnapshotService(db).export(incremental=params.incremental, on_progress=progress)
+    # A directory of files for analytics readers, not a download
+    return snapshot, None
+
+JOB_HANDLERS: Dict[str, Callable[[AsyncSession, Job, ProgressCallback], Awaitable[JobOutcome]]] = {
+    JobKind.EXPORT.value: export_licenses_job,
+    JobKind.IMPORT.value: import_licenses_job,
+    JobKind.ARCHIVE.value: archive_licenses_job,
+    JobKind.PARQUET.value: parquet_snapshot_job,
+}
@@ -1,30 +1,274 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, or_
+from sqlalchemy import select, update, func, and_, or_, literal, union_all, Select
 from sqlalchemy.orm import selectinload
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from uuid import UUID
 import logging
 
 from app.models.license import BusinessLicense
+from app.models.license_archive import BusinessLicenseArchive
+from app.models.license_change import ChangeOperation
 from app.schemas.license import (
     LicenseCreate, 
     LicenseUpdate, 
+    LicenseBulkUpdateResponse,
     LicenseSearchFilters,
     PaginatedResponse,
-    LicenseResponse
+    LicenseResponse,
+    SuggestField,
+    SuggestResponse,
+    Suggestion
 )
 from app.core.cache import cache
+from app.core.bloom import license_number_filter
+from app.core.warmup import hot_licenses
+from app.core.config import settings
+from app.services.business_service import BusinessService, UnknownBusinessError
+from app.services.change_service import ChangeService
+from app.services.create_coalescer import create_coalescer
+from app.services.snapshot_search import license_snapshot
+from app.services.zip_service import Origin, distance_miles, radius_conditions, search_origin
+from app.services.edge_snapshot import fts_match, fts_results, license_rowid
 
 logger = logging.getLogger(__name__)
 
+def lookup_models() -> tuple:
+    """Tables a license may live in; edge snapshots hold live licenses only"""
+    if settings.EDGE_MODE:
+        return (BusinessLicense,)
+    return (BusinessLicense, BusinessLicenseArchive)
+
+def license_cache_keys(license_id: UUID, license_number: str) -> List[str]:
+    """Cache keys holding a single license"""
+    return [f"license:{license_id}", f"license_num:{license_number}"]
+
+def lookup_statements() -> List[Select]:
+    """The single-license lookups run per request, with placeholder values
+
+    Executed once per connection at startup so their compiled forms are
+    cached and prepared before traffic arrives.
+    """
+    placeholder_id = UUID(int=0)
+    statements = []
+    for model in lookup_models():
+        statements += [
+            select(model).where(model.id == placeholder_id),
+            select(model).where(model.license_number == ""),
+            select(model.id).where(model.license_number == "").limit(1),
+        ]
+    return statements
+
+def text_search_query(q: str):
+    """Parse user search syntax ("quoted phrases", or, -exclusions) into a tsquery"""
+    return func.websearch_to_tsquery(settings.SEARCH_TEXT_CONFIG, q)
+
+def text_search_headline(query, model=BusinessLicense):
+    """Highlighted snippet of the text fields matching a tsquery"""
+    document = func.concat_ws(
+        " ",
+        model.business_name,
+        model.description,
+        model.conditions
+    )
+    return func.ts_headline(
+        settings.SEARCH_TEXT_CONFIG,
+        document,
+        query,
+        settings.SEARCH_HEADLINE_OPTIONS
+    )
+
+def search_conditions(
+    filters: LicenseSearchFilters,
+    model=BusinessLicense,
+    origin: Optional[Origin] = None
+) -> List:
+    """SQL conditions for a set of search filters, against the live or archive table
+    
+    origin is the centroid of filters.near_zip (search_origin).
+    """
+    conditions = []
+    
+    if filters.license_number:
+        conditions.append(
+            model.license_number.ilike(f"%{filters.license_number}%")
+        )
+    
+    if filters.business_name:
+        conditions.append(
+            model.business_name.ilike(f"%{filters.business_name}%")
+        )
+    
+    if filters.business_type:
+        conditions.append(model.business_type == filters.business_type)
+    
+    if filters.status:
+        conditions.append(model.status == filters.status)
+    
+    if filters.city:
+        conditions.append(model.city.ilike(f"%{filters.city}%"))
+    
+    if filters.state:
+        conditions.append(model.state == filters.state)
+    
+    if filters.zip_code:
+        conditions.append(model.zip_code == filters.zip_code)
+    
+    if filters.issuing_authority:
+        conditions.append(model.issuing_authority == filters.issuing_authority)
+    
+    if filters.expires_before:
+        conditions.append(model.expiration_date <= filters.expires_before)
+    
+    if filters.expires_after:
+        conditions.append(model.expiration_date >= filters.expires_after)
+    
+    if filters.q:
+        if settings.EDGE_MODE:
+            conditions.append(fts_match(filters.q))
+        else:
+            conditions.append(
+                model.search_vector.op("@@")(text_search_query(filters.q))
+            )
+    
+    if origin:
+        radius = filters.radius_miles or settings.ZIP_SEARCH_DEFAULT_RADIUS_MILES
+        conditions.extend(radius_conditions(origin, radius, model))
+    
+    return conditions
+
+def search_statements(
+    filters: LicenseSearchFilters,
+    page: int = 1,
+    size: int = 20,
+    origin: Optional[Origin] = None
+) -> Tuple[Select, Select]:
+    """Page and count statements for a search"""
+    
+    # Build base query
+    stmt = select(BusinessLicense)
+    count_stmt = select(func.count(BusinessLicense.id))
+    
+    # Apply conditions
+    conditions = search_conditions(filters, origin=origin)
+    if conditions:
+        stmt = stmt.where(and_(*conditions))
+        count_stmt = count_stmt.where(and_(*conditions))
+    
+    # Apply pagination
+    offset = (page - 1) * size
+    stmt = stmt.offset(offset).limit(size)
+    
+    # Newest first
+    order = [BusinessLicense.created_at.desc()]
+    
+    if filters.q:
+        # Rank full-text matches, newest first among equal ranks
+        if settings.EDGE_MODE:
+            results = fts_results(filters.q, filters.highlight)
+            stmt = stmt.join(results, results.c.rowid == license_rowid)
+            rank = results.c.rank
+            headline = results.c.highlight if filters.highlight else None
+        else:
+            query = text_search_query(filters.q)
+            rank = func.ts_rank(BusinessLicense.search_vector, query)
+            headline = text_search_headline(query)
+        stmt = stmt.add_columns(rank.label("rank"))
+        if filters.highlight:
+            stmt = stmt.add_columns(headline.label("highlight"))
+        order.insert(0, rank.desc())
+    
+    if origin:
+        distance = distance_miles(origin)
+        stmt = stmt.add_columns(distance.label("distance"))
+        if filters.sort_by_distance:
+            order.insert(0, distance)
+    
+    stmt = stmt.order_by(*order)
+    
+    return stmt, count_stmt
+
+def archived_search_statements(
+    filters: LicenseSearchFilters,
+    page: int = 1,
+    size: int = 20,
+    origin: Optional[Origin] = None
+) -> Tuple[Select, Select]:
+    """Page and count statements for a search across the live and archive tables
+
+    Pages hold (id, archived, rank, distance) keys only; rows are loaded per table afterwards.
+    """
+    keys = []
+    for model in (BusinessLicense, BusinessLicenseArchive):
+        key = select(
+            model.id,
+            model.created_at,
+            literal(model is BusinessLicenseArchive).label("archived")
+        )
+        if filters.q:
+            key = key.add_columns(
+                func.ts_rank(model.search_vector, text_search_query(filters.q)).label("rank")
+            )
+        if origin:
+            key = key.add_columns(distance_miles(origin, model).label("distance"))
+        conditions = search_conditions(filters, model, origin)
+        if conditions:
+            key = key.where(and_(*conditions))
+        keys.append(key)
+    matches = union_all(*keys).subquery("matches")
+    
+    count_stmt = select(func.count()).select_from(matches)
+    
+    order = [matches.c.created_at.desc()]
+    if filters.q:
+        order.insert(0, matches.c.rank.desc())
+    if origin and filters.sort_by_distance:
+        order.insert(0, matches.c.distance)
+    offset = (page - 1) * size
+    stmt = select(matches).order_by(*order).offset(offset).limit(size)
+    
+    return stmt, count_stmt
+
+def suggest_statement(normalized: str, field: SuggestField, limit: int) -> Select:
+    """(id, value) rows completing a lowercased prefix, in lowercase order"""
+    column = getattr(BusinessLicense, field.value)
+    # Escape LIKE wildcards so the prefix is matched literally
+    pattern = (
+        normalized.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+    )
+    
+    # Range scan over the lower(column) text_pattern_ops index, in index order
+    return (
+        select(BusinessLicense.id, column)
+        .where(func.lower(column).like(pattern, escape="\\"))
+        .order_by(func.lower(column))
+        .limit(limit)
+    )
+
 class LicenseService:
     def __init__(self, db: AsyncSession):
         self.db = db
+        self.changes = ChangeService(db)
     
-    async def create_license(self, license_data: LicenseCreate) -> BusinessLicense:
+    async def _check_business(self, business_id: Optional[int]) -> None:
+        """Raise UnknownBusinessError for a business_id the foreign key would reject"""
+        if business_id is not None and not await BusinessService(self.db).existing_ids([business_id]):
+            raise UnknownBusinessError(business_id)
+    
+    async def create_license(self, license_data: LicenseCreate, license_id: Optional[UUID] = None) -> BusinessLicense:
         """Create a new business license"""
+        await self._check_business(license_data.business_id)
+        if create_coalescer.enabled and license_id is None:
+            # Committed together with other creates arriving at about the same time
+            return await create_coalescer.create(license_data)
+        
         db_license = BusinessLicense(**license_data.dict())
+        if license_id:
+            db_license.id = license_id
         self.db.add(db_license)
+        await self.db.flush()
+        # Before commit: a rollback leaves a harmless false positive, never a false negative
+        await license_number_filter.add(db_license.license_number)
+        await self.changes.record_change(db_license, ChangeOperation.CREATE)
         await self.db.commit()
         await self.db.refresh(db_license)
         
@@ -34,6 +278,16 @@ class LicenseService:
         logger.info(f"Created license {db_license.license_number}")
         return db_license
     
+    async def _find_license(self, field: str, value) -> Optional[BusinessLicense]:
+        """Find a license in the live table, falling back to the archive on a miss"""
+        for model in lookup_models():
+            stmt = select(model).where(getattr(model, field) == value)
+            result = await self.db.execute(stmt)
+            license_obj = result.scalar_one_or_none()
+            if license_obj:
+                return license_obj
+        return None
+    
     async def get_license_by_id(self, license_id: UUID) -> Optional[BusinessLicense]:
         """Get license by ID"""
         cache_key = f"license:{license_id}"
@@ -41,37 +295,70 @@ class LicenseService:
         # Try cache first
         cached_license = await cache.get(cache_key)
         if cached_license:
+            await hot_licenses.record(license_id)
             return cached_license
         
-        stmt = select(BusinessLicense).where(BusinessLicense.id == license_id)
-        result = await self.db.execute(stmt)
-        license_obj = result.scalar_one_or_none()
+        license_obj = await self._find_license("id", license_id)
         
         # Cache the result
         if license_obj:
             await cache.set(cache_key, license_obj)
+            await hot_licenses.record(license_id)
         
         return license_obj
     
     async def get_license_by_number(self, license_number: str) -> Optional[BusinessLicense]:
         """Get license by license number"""
+        # Most numbers checked by partners don't exist; skip cache and DB for those
+        if not await license_number_filter.might_contain(license_number):
+            return None
+        
         cache_key = f"license_num:{license_number}"
         
         cached_license = await cache.get(cache_key)
         if cached_license:
+            await hot_licenses.record(cached_license.id)
             return cached_license
         
-        stmt = select(BusinessLicense).where(
-            BusinessLicense.license_number == license_number
-        )
-        result = await self.db.execute(stmt)
-        license_obj = result.scalar_one_or_none()
+        license_obj = await self._find_license("license_number", license_number)
         
         if license_obj:
             await cache.set(cache_key, license_obj)
+            await hot_licenses.record(license_obj.id)
         
         return license_obj
     
+    async def license_number_exists(self, license_number: str) -> bool:
+        """Check whether a license number exists without loading the license"""
+        if not await license_number_filter.might_contain(license_number):
+            return False
+        
+        if await cache.exists(f"license_num:{license_number}"):
+            return True
+        
+        for model in lookup_models():
+            stmt = select(model.id).where(model.license_number == license_number).limit(1)
+            result = await self.db.execute(stmt)
+            if result.scalar_one_or_none() is not None:
+                return True
+        return False
+
+    async def cache_licenses(self, license_ids: List[UUID]) -> int:
+        """Load licenses not already cached into the cache; returns how many were loaded"""
+        missing = [license_id for license_id in license_ids if not await cache.exists(f"license:{license_id}")]
+
+        loaded = 0
+        for model in lookup_models():
+            if not missing:
+                break
+            result = await self.db.execute(select(model).where(model.id.in_(missing)))
+            for license_obj in result.scalars():
+                for cache_key in license_cache_keys(license_obj.id, license_obj.license_number):
+                    await cache.set(cache_key, license_obj)
+                missing.remove(license_obj.id)
+                loaded += 1
+        return loaded
+
     async def search_licenses(
         self, 
         filters: LicenseSearchFilters,
@@ -79,75 +366,146 @@ class LicenseService:
         size: int = 20
     ) -> PaginatedResponse:
         """Search licenses with filters and pagination"""
+        total, license_responses = await self.search_page(filters, page, size)
         
-        # Build base query
-        stmt = select(BusinessLicense)
-        count_stmt = select(func.count(BusinessLicense.id))
-        
-        # Apply filters
-        conditions = []
-        
-        if filters.license_number:
-            conditions.append(
-                BusinessLicense.license_number.ilike(f"%{filters.license_number}%")
-            )
-        
-        if filters.business_name:
-            conditions.append(
-                BusinessLicense.business_name.ilike(f"%{filters.business_name}%")
-            )
-        
-        if filters.business_type:
-            conditions.append(BusinessLicense.business_type == filters.business_type)
-        
-        if filters.status:
-            conditions.append(BusinessLicense.status == filters.status)
-        
-        if filters.city:
-            conditions.append(BusinessLicense.city.ilike(f"%{filters.city}%"))
-        
-        if filters.state:
-            conditions.append(BusinessLicense.state == filters.state)
-        
-        if filters.zip_code:
-            conditions.append(BusinessLicense.zip_code == filters.zip_code)
+        return PaginatedResponse(
+            items=license_responses,
+            total=total,
+            page=page,
+            size=size,
+            pages=(total + size - 1) // size
+        )
+    
+    async def search_page(
+        self,
+        filters: LicenseSearchFilters,
+        page: int,
+        size: int
+    ) -> Tuple[int, List[LicenseResponse]]:
+        """Total matches and one page of results, with no limit on the page size"""
+        origin = await search_origin(self.db, filters)
         
-        if filters.expires_before:
-            conditions.append(BusinessLicense.expiration_date <= filters.expires_before)
+        if filters.include_archived and not settings.EDGE_MODE:
+            return await self._search_with_archive(filters, page, size, origin)
         
-        if filters.expires_after:
-            conditions.append(BusinessLicense.expiration_date >= filters.expires_after)
+        if settings.SEARCH_BACKEND == "snapshot" and license_snapshot.supports(filters):
+            return await self._search_snapshot(filters, page, size)
         
-        # Apply conditions
-        if conditions:
-            stmt = stmt.where(and_(*conditions))
-            count_stmt = count_stmt.where(and_(*conditions))
+        stmt, count_stmt = search_statements(filters, page, size, origin)
         
         # Get total count
         count_result = await self.db.execute(count_stmt)
         total = count_result.scalar()
         
-        # Apply pagination
-        offset = (page - 1) * size
-        stmt = stmt.offset(offset).limit(size)
-        
-        # Order by created_at desc
-        stmt = stmt.order_by(BusinessLicense.created_at.desc())
-        
         # Execute query
         result = await self.db.execute(stmt)
-        licenses = result.scalars().all()
         
         # Convert to response models
-        license_responses = [LicenseResponse.from_orm(license) for license in licenses]
+        if filters.q or origin:
+            license_responses = []
+            for row in result:
+                response = LicenseResponse.from_orm(row.BusinessLicense)
+                if filters.q:
+                    response.rank = row.rank
+                    response.highlight = row.highlight if filters.highlight else None
+                if origin:
+                    response.distance_miles = row.distance
+                license_responses.append(response)
+        else:
+            licenses = result.scalars().all()
+            license_responses = [LicenseResponse.from_orm(license) for license in licenses]
+        
+        return total, license_responses
+    
+    async def _search_with_archive(
+        self,
+        filters: LicenseSearchFilters,
+        page: int,
+        size: int,
+        origin: Optional[Origin] = None
+    ) -> Tuple[int, List[LicenseResponse]]:
+        """Search the live and archive tables together"""
+        stmt, count_stmt = archived_search_statements(filters, page, size, origin)
         
-        return PaginatedResponse(
-            items=license_responses,
-            total=total,
-            page=page,
-            size=size,
-            pages=(total + size - 1) // size
+        count_result = await self.db.execute(count_stmt)
+        total = count_result.scalar()
+        
+        result = await self.db.execute(stmt)
+        keys = result.all()
+        
+        license_responses = {}
+        for model, archived in ((BusinessLicense, False), (BusinessLicenseArchive, True)):
+            ids = [key.id for key in keys if key.archived == archived]
+            if not ids:
+                continue
+            load = select(model).where(model.id.in_(ids))
+            if filters.q and filters.highlight:
+                load = load.add_columns(
+                    text_search_headline(text_search_query(filters.q), model).label("highlight")
+                )
+            for row in await self.db.execute(load):
+                response = LicenseResponse.from_orm(row[0])
+                if filters.q and filters.highlight:
+                    response.highlight = row.highlight
+                license_responses[row[0].id] = response
+        
+        items = []
+        for key in keys:
+            response = license_responses.get(key.id)
+            if response:
+                if filters.q:
+                    response.rank = key.rank
+                if origin:
+                    response.distance_miles = key.distance
+                items.append(response)
+        
+        return total, items
+    
+    async def _search_snapshot(
+        self,
+        filters: LicenseSearchFilters,
+        page: int,
+        size: int
+    ) -> Tuple[int, List[LicenseResponse]]:
+        """Filter and order in memory, then load only the returned page"""
+        total, ids = license_snapshot.search(filters, page, size)
+        
+        license_responses = []
+        if ids:
+            stmt = select(BusinessLicense).where(BusinessLicense.id.in_(ids))
+            result = await self.db.execute(stmt)
+            licenses = {license.id: license for license in result.scalars()}
+            license_responses = [
+                LicenseResponse.from_orm(licenses[license_id])
+                for license_id in ids
+                if license_id in licenses
+            ]
+        
+        return total, license_responses
+    
+    async def suggest(
+        self,
+        prefix: str,
+        field: SuggestField = SuggestField.BUSINESS_NAME,
+        limit: int = 10
+    ) -> SuggestResponse:
+        """Typeahead suggestions for a business name or license number prefix"""
+        normalized = prefix.lower()
+        cache_key = f"suggest:{field.value}:{limit}:{normalized}"
+        
+        cached = await cache.get(cache_key)
+        if cached:
+            return cached
+        
+        result = await self.db.execute(suggest_statement(normalized, field, limit))
+        
+        response = SuggestResponse(
+            field=field,
+            prefix=prefix,
+            items=[Suggestion(id=str(row[0]), value=row[1]) for row in result]
         )
+        await cache.set(cache_key, response, ttl=settings.SUGGEST_CACHE_TTL)
+        return response
     
     async def update_license(
         self, 
@@ -165,19 +523,95 @@ class LicenseService:
         
         # Update only provided fields
         update_data = license_update.dict(exclude_unset=True)
+        await self._check_business(update_data.get("business_id"))
         for field, value in update_data.items():
             setattr(license_obj, field, value)
+        await self.changes.record_change(license_obj, ChangeOperation.UPDATE)
         
         await self.db.commit()
         await self.db.refresh(license_obj)
         
         # Invalidate cache
-        await cache.delete(f"license:{license_id}")
-        await cache.delete(f"license_num:{license_obj.license_number}")
+        await cache.delete_many(license_cache_keys(license_id, license_obj.license_number))
         
         logger.info(f"Updated license {license_obj.license_number}")
         return license_obj
     
+    async def bulk_update(
+        self,
+        filters: LicenseSearchFilters,
+        license_update: LicenseUpdate,
+        dry_run: bool = False,
+        batch_size: int = settings.BULK_UPDATE_BATCH_SIZE
+    ) -> LicenseBulkUpdateResponse:
+        """Apply one update to every license matching a set of search filters
+        
+        Runs as set-based UPDATE ... RETURNING statements over batch_size
+        licenses at a time in id order, each committed on its own so row
+        locks are held briefly; a failure keeps the batches already done.
+        A dry run only counts the matches.
+        """
+        conditions = search_conditions(filters, origin=await search_origin(self.db, filters))
+        if not conditions:
+            raise ValueError("Bulk updates need at least one filter")
+        if filters.include_archived:
+            raise ValueError("Archived licenses can't be bulk updated")
+        update_data = license_update.dict(exclude_unset=True)
+        if not update_data:
+            raise ValueError("Bulk updates need at least one field to set")
+        # Up front, as batches already committed stay updated if one fails
+        await self._check_business(update_data.get("business_id"))
+        
+        matched = await self.db.scalar(
+            select(func.count()).select_from(BusinessLicense).where(*conditions)
+        )
+        if dry_run:
+            return LicenseBulkUpdateResponse(matched=matched, updated=0, dry_run=True)
+        
+        updated = 0
+        after = None
+        while True:
+            # Keyset over id, so rows the update moves out of (or into) the
+            # filters are never visited twice
+            batch = (
+                select(BusinessLicense.id)
+                .where(*conditions)
+                .order_by(BusinessLicense.id)
+                .limit(batch_size)
+            )
+            if after is not None:
+                batch = batch.where(BusinessLicense.id > after)
+            stmt = (
+                update(BusinessLicense)
+                .where(BusinessLicense.id.in_(batch.scalar_subquery()))
+                .values(**update_data, updated_at=func.now())
+                .returning(
+                    BusinessLicense.id,
+                    BusinessLicense.license_number,
+                    BusinessLicense.state,
+                    BusinessLicense.status,
+                )
+                .execution_options(synchronize_session=False)
+            )
+            result = await self.db.execute(stmt)
+            rows = result.all()
+            if not rows:
+                break
+            await self.changes.record_changes(rows, ChangeOperation.UPDATE)
+            await self.db.commit()
+            
+            # Invalidate cache
+            await cache.delete_many(
+                key for row in rows for key in license_cache_keys(row.id, row.license_number)
+            )
+            updated += len(rows)
+            after = max(row.id for row in rows)
+            if len(rows) < batch_size:
+                break
+        
+        logger.info(f"Bulk updated {updated} of {matched} matching licenses: {sorted(update_data)}")
+        return LicenseBulkUpdateResponse(matched=matched, updated=updated, dry_run=False)
+    
     async def delete_license(self, license_id: UUID) -> bool:
         """Delete a license"""
         
@@ -189,11 +623,11 @@ class LicenseService:
             return False
         
         await self.db.delete(license_obj)
+        await self.changes.record_change(license_obj, ChangeOperation.DELETE)
         await self.db.commit()
         
         # Invalidate cache
-        await cache.delete(f"license:{license_id}")
-        await cache.delete(f"license_num:{license_obj.license_number}")
+        await cache.delete_many(license_cache_keys(license_id, license_obj.license_number))
         
         logger.info(f"Deleted license {license_obj.license_number}")
         return True
\ No newline at end of file
@@ -0,0 +1,227 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import quote
+from uuid import UUID
+import json
+import logging
+import os
+import shutil
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from app.models.license import BusinessLicense
+from app.models.license_change import ChangeOperation
+from app.services.change_service import ChangeService
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+MANIFEST = "_snapshots.json"
+REMOVED_FILE = "_removed.parquet"
+
+# Everything but search_vector; state comes from the partition path, as
+# hive-partitioned readers (DuckDB, Spark, pyarrow.dataset) expect
+SNAPSHOT_COLUMNS = [column for column in BusinessLicense.__table__.columns if column.computed is None]
+FILE_COLUMNS = [column for column in SNAPSHOT_COLUMNS if column.name != "state"]
+
+def _arrow_type(column) -> pa.DataType:
+    python_type = column.type.python_type
+    if python_type is datetime:
+        return pa.timestamp("us")
+    if python_type is bool:
+        return pa.bool_()
+    if python_type is int:
+        return pa.int64()
+    if python_type is float:
+        return pa.float64()
+    # Text, enums and UUIDs
+    return pa.string()
+
+FILE_SCHEMA = pa.schema([pa.field(column.name, _arrow_type(column), nullable=column.nullable) for column in FILE_COLUMNS])
+REMOVED_SCHEMA = pa.schema([
+    pa.field("license_id", pa.string(), nullable=False),
+    pa.field("license_number", pa.string(), nullable=False),
+    pa.field("operation", pa.string(), nullable=False),
+])
+
+def _string(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    if isinstance(value, UUID):
+        return str(value)
+    # Enum members write as their value
+    return getattr(value, "value", value)
+
+def read_manifest(output_dir: str) -> List[Dict[str, Any]]:
+    """Snapshots written to a directory so far, oldest first"""
+    path = os.path.join(output_dir, MANIFEST)
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as source:
+        return json.load(source)
+
+def _write_manifest(output_dir: str, snapshots: List[Dict[str, Any]]) -> None:
+    path = os.path.join(output_dir, MANIFEST)
+    with open(f"{path}.partial", "w", encoding="utf-8") as out:
+        json.dump(snapshots, out, indent=2)
+    os.replace(f"{path}.partial", path)
+
+class PartitionedParquetWriter:
+    """Writes rows into one Parquet file per (state, expiration year) under a directory
+
+    Rows are buffered per file and written out as a row group when a file
+    has row_group_size of them, or when all buffers together do (largest
+    first), so memory stays bounded however many files are open.
+    """
+
+    def __init__(self, directory: str, row_group_size: int, compression: str = settings.PARQUET_COMPRESSION):
+        self.directory = directory
+        self.row_group_size = row_group_size
+        self.compression = compression
+        self.files = 0
+        self._buffers: Dict[Tuple[str, int], List[Sequence[Any]]] = {}
+        self._buffered = 0
+        self._writers: Dict[Tuple[str, int], pq.ParquetWriter] = {}
+
+    def add(self, year: int, rows: Sequence[Any]) -> None:
+        for row in rows:
+            key = (row.state, year)
+            buffer = self._buffers.setdefault(key, [])
+            buffer.append(row)
+            self._buffered += 1
+            if len(buffer) >= self.row_group_size:
+                self._flush(key)
+        while self._buffered >= self.row_group_size:
+            self._flush(max(self._buffers, key=lambda key: len(self._buffers[key])))
+
+    def _flush(self, key: Tuple[str, int]) -> None:
+        rows = self._buffers.pop(key, None)
+        if not rows:
+            return
+        self._buffered -= len(rows)
+
+        arrays = []
+        for column, field in zip(FILE_COLUMNS, FILE_SCHEMA):
+            values = [getattr(row, column.name) for row in rows]
+            if field.type == pa.string():
+                values = [_string(value) for value in values]
+            arrays.append(pa.array(values, type=field.type))
+
+        if key not in self._writers:
+            state, year = key
+            # Percent-encoded like pyarrow's own hive writer, so a value can't
+            # climb out of the snapshot directory
+            directory = os.path.join(self.directory, f"state={quote(state, safe='')}", f"expiration_year={year}")
+            os.makedirs(directory, exist_ok=True)
+            self._writers[key] = pq.ParquetWriter(
+                os.path.join(directory, "part-0.parquet"), FILE_SCHEMA, compression=self.compression
+            )
+            self.files += 1
+        self._writers[key].write_table(pa.Table.from_arrays(arrays, schema=FILE_SCHEMA), row_group_size=len(rows))
+
+    def close(self) -> None:
+        """Write out every buffer and close all open files"""
+        for key in list(self._buffers):
+            self._flush(key)
+        for writer in self._writers.values():
+            writer.close()
+        self._writers.clear()
+
+class ParquetSnapshotService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def export(
+        self,
+        output_dir: str = settings.PARQUET_OUTPUT_DIR,
+        incremental: bool = False,
+        row_group_size: int = settings.PARQUET_ROW_GROUP_SIZE,
+        on_progress: Optional[Callable[[int], Awaitable[None]]] = None
+    ) -> Dict[str, Any]:
+        """Write business_licenses, or the rows updated since the last snapshot, to a new snapshot directory
+
+        Rows are streamed from a server-side cursor one expiration year
+        (table partition) at a time. An incremental snapshot holds the
+        licenses created or updated after the previous snapshot's change log
+        position, and lists those deleted or archived since in
+        _removed.parquet; readers apply it, then take each id's row from the
+        newest snapshot. Rows written without a change log entry, such as
+        seed COPY loads, need a full snapshot. Returns the snapshot's
+        manifest entry.
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        snapshots = read_manifest(output_dir)
+        if incremental and not snapshots:
+            raise ValueError(f"No snapshot in {output_dir} to continue from; take a full snapshot first")
+
+        changes = ChangeService(self.db)
+        # Database clock, in the same naive form stored in updated_at
+        started = await self.db.scalar(select(func.localtimestamp()))
+        position = await changes.last_position()
+
+        conditions = []
+        since = None
+        if incremental:
+            # Change log positions only ever become visible in order, so
+            # unlike updated_at a long transaction can't commit behind one
+            since = tuple(snapshots[-1]["change_position"])
+            conditions.append(BusinessLicense.id.in_(
+                changes.license_ids_after(since, (ChangeOperation.CREATE, ChangeOperation.UPDATE))
+            ))
+
+        kind = "incremental" if incremental else "full"
+        snapshot_id = f"{started:%Y%m%dT%H%M%S}-{kind}"
+        building = os.path.join(output_dir, f"{snapshot_id}.building")
+        shutil.rmtree(building, ignore_errors=True)
+        os.makedirs(building)
+
+        bounds = (await self.db.execute(
+            select(func.min(BusinessLicense.expiration_date), func.max(BusinessLicense.expiration_date))
+        )).one()
+
+        total = 0
+        writer = PartitionedParquetWriter(building, row_group_size)
+        if bounds[0] is not None:
+            for year in range(bounds[0].year, bounds[1].year + 1):
+                # One range per year, so each scan is pruned to a single partition
+                stmt = select(*SNAPSHOT_COLUMNS).where(
+                    BusinessLicense.expiration_date >= datetime(year, 1, 1),
+                    BusinessLicense.expiration_date < datetime(year + 1, 1, 1),
+                    *conditions
+                ).execution_options(yield_per=row_group_size)
+                result = await self.db.stream(stmt)
+                async for rows in result.partitions():
+                    writer.add(year, rows)
+                    total += len(rows)
+                    if on_progress:
+                        await on_progress(total)
+                # Years never share a file
+                writer.close()
+
+        removed = []
+        if incremental:
+            removed = await changes.changes_after(since, (ChangeOperation.DELETE, ChangeOperation.ARCHIVE))
+            pq.write_table(pa.Table.from_pydict({
+                "license_id": [str(change.license_id) for change in removed],
+                "license_number": [change.license_number for change in removed],
+                "operation": [change.operation for change in removed],
+            }, schema=REMOVED_SCHEMA), os.path.join(building, REMOVED_FILE), compression=settings.PARQUET_COMPRESSION)
+
+        os.replace(building, os.path.join(output_dir, snapshot_id))
+        snapshot = {
+            "id": snapshot_id,
+            "kind": kind,
+            "watermark": started.isoformat(),
+            "since": list(since) if since else None,
+            "change_position": list(position),
+            "rows": total,
+            "removed": len(removed),
+            "files": writer.files,
+        }
+        _write_manifest(output_dir, snapshots + [snapshot])
+
+        logger.info(f"Wrote {kind} Parquet snapshot {snapshot_id}: {total} rows in {writer.files} files")
+        return snapshot
@@ -0,0 +1,376 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete, insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from contextlib import asynccontextmanager
+from itertools import islice
+from typing import AsyncIterator, Callable, Dict, List, Optional, Union
+from uuid import UUID, uuid4
+import asyncio
+import heapq
+import logging
+
+from app.models.license import BusinessLicense
+from app.models.license_archive import BusinessLicenseArchive
+from app.models.license_shard import LicenseShard
+from app.schemas.license import (
+    LicenseCreate,
+    LicenseUpdate,
+    LicenseBulkUpdateResponse,
+    LicenseResponse,
+    LicenseSearchFilters,
+    PaginatedResponse,
+    SuggestField,
+    SuggestResponse,
+    Suggestion
+)
+from app.services.license_service import LicenseService, suggest_statement
+from app.core.database import AsyncSessionLocal
+from app.core.shards import shard_router
+from app.core.timeouts import apply_statement_timeout
+from app.core.warmup import hot_licenses
+from app.core.cache import cache
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+def license_service(db: AsyncSession) -> Union[LicenseService, "ShardedLicenseService"]:
+    """The license service for this deployment: sharded when shards are configured"""
+    if shard_router.enabled:
+        return ShardedLicenseService(db)
+    return LicenseService(db)
+
+def _search_order(response: LicenseResponse) -> tuple:
+    # The order every shard returns: rank first for full-text searches, then newest first
+    return (response.rank or 0.0, response.created_at)
+
+def _distance_order(response: LicenseResponse) -> tuple:
+    # Nearest first for sort_by_distance, then as _search_order
+    return (-response.distance_miles, response.rank or 0.0, response.created_at)
+
+class ShardedLicenseService:
+    """LicenseService over licenses sharded by state
+
+    db is a primary database session, holding the license_shards directory.
+    Single-license reads and writes go to the shard the directory (or, for
+    creates, the state) names; searches without a state go to every shard
+    at once and are merged.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    @asynccontextmanager
+    async def _shard_session(self, shard: str) -> AsyncIterator[AsyncSession]:
+        async with shard_router.session(shard) as session:
+            apply_statement_timeout(session, self.db.info.get("statement_timeout_ms", 0))
+            yield session
+
+    async def _locate(self, column, value) -> Optional[str]:
+        """Shard holding a license, by license_id or license_number"""
+        result = await self.db.execute(select(LicenseShard.shard).where(column == value))
+        return result.scalar_one_or_none()
+
+    async def _claim(self, license_number: str, license_id: UUID, shard: str) -> None:
+        """Point the directory at a shard, uncommitted; raises IntegrityError if the number is taken"""
+        await self.db.execute(delete(LicenseShard).where(LicenseShard.license_id == license_id))
+        self.db.add(LicenseShard(license_number=license_number, license_id=license_id, shard=shard))
+        await self.db.flush()
+
+    def _refuse_business(self, business_id: Optional[int]) -> None:
+        # Businesses live on the primary only, so shards can't satisfy the foreign key
+        if business_id is not None:
+            raise ValueError("Licenses can't be linked to businesses on a sharded deployment")
+
+    async def create_license(self, license_data: LicenseCreate) -> BusinessLicense:
+        """Create a license on its state's shard"""
+        self._refuse_business(license_data.business_id)
+        shard = shard_router.shard_for_state(license_data.state)
+        license_id = uuid4()
+
+        # Claimed first so a number can't be created on two shards at once
+        await self._claim(license_data.license_number, license_id, shard)
+        try:
+            async with self._shard_session(shard) as session:
+                license_obj = await LicenseService(session).create_license(license_data, license_id=license_id)
+        except Exception:
+            await self.db.rollback()
+            raise
+        try:
+            await self.db.commit()
+        except Exception as e:
+            # The shard has committed; without its directory entry the license
+            # could never be found by id or number
+            logger.error(f"Error claiming license {license_data.license_number} on shard {shard}, removing it: {str(e)}")
+            await self._discard(shard, license_id)
+            raise
+        return license_obj
+
+    async def _discard(self, shard: str, license_id: UUID) -> None:
+        """Delete a license left on a shard by a failed create"""
+        try:
+            async with self._shard_session(shard) as session:
+                await LicenseService(session).delete_license(license_id)
+        except Exception as e:
+            logger.error(f"Error removing license {license_id} from shard {shard}, orphaned: {str(e)}")
+
+    async def get_license_by_id(self, license_id: UUID) -> Optional[BusinessLicense]:
+        """Get license by ID"""
+        cached_license = await cache.get(f"license:{license_id}")
+        if cached_license:
+            await hot_licenses.record(license_id)
+            return cached_license
+
+        shard = await self._locate(LicenseShard.license_id, license_id)
+        if shard is None:
+            return None
+        async with self._shard_session(shard) as session:
+            return await LicenseService(session).get_license_by_id(license_id)
+
+    async def get_license_by_number(self, license_number: str) -> Optional[BusinessLicense]:
+        """Get license by license number"""
+        cached_license = await cache.get(f"license_num:{license_number}")
+        if cached_license:
+            await hot_licenses.record(cached_license.id)
+            return cached_license
+
+        shard = await self._locate(LicenseShard.license_number, license_number)
+        if shard is None:
+            return None
+        async with self._shard_session(shard) as session:
+            return await LicenseService(session).get_license_by_number(license_number)
+
+    async def cache_licenses(self, license_ids: List[UUID]) -> int:
+        """Load licenses not already cached into the cache, from each one's shard"""
+        result = await self.db.execute(
+            select(LicenseShard.shard, LicenseShard.license_id).where(LicenseShard.license_id.in_(license_ids))
+        )
+        by_shard: Dict[str, List[UUID]] = {}
+        for shard, license_id in result.all():
+            by_shard.setdefault(shard, []).append(license_id)
+
+        loaded = 0
+        for shard, shard_license_ids in by_shard.items():
+            async with self._shard_session(shard) as session:
+                loaded += await LicenseService(session).cache_licenses(shard_license_ids)
+        return loaded
+
+    async def license_number_exists(self, license_number: str) -> bool:
+        """Check whether a license number exists; the directory covers every shard"""
+        return await self._locate(LicenseShard.license_number, license_number) is not None
+
+    async def search_licenses(
+        self,
+        filters: LicenseSearchFilters,
+        page: int = 1,
+        size: int = 20
+    ) -> PaginatedResponse:
+        """Search one shard when a state is given, otherwise every shard concurrently"""
+        if filters.state:
+            try:
+                shard = shard_router.shard_for_state(filters.state)
+            except ValueError:
+                return PaginatedResponse(items=[], total=0, page=page, size=size, pages=0)
+            async with self._shard_session(shard) as session:
+                return await LicenseService(session).search_licenses(filters, page, size)
+
+        # Each shard's first page * size results hold every candidate for the page
+        window = page * size
+        if window > settings.SHARD_SEARCH_MAX_WINDOW:
+            raise ValueError(
+                f"Searches across all shards stop at {settings.SHARD_SEARCH_MAX_WINDOW} results; filter by state to go further"
+            )
+
+        async def search_shard(shard: str):
+            async with self._shard_session(shard) as session:
+                return await LicenseService(session).search_page(filters, 1, window)
+
+        results = await asyncio.gather(*[search_shard(shard) for shard in shard_router.shards])
+        total = sum(shard_total for shard_total, _ in results)
+        order = _distance_order if filters.near_zip and filters.sort_by_distance else _search_order
+        merged = heapq.merge(*[items for _, items in results], key=order, reverse=True)
+
+        return PaginatedResponse(
+            items=list(islice(merged, (page - 1) * size, window)),
+            total=total,
+            page=page,
+            size=size,
+            pages=(total + size - 1) // size
+        )
+
+    async def suggest(
+        self,
+        prefix: str,
+        field: SuggestField = SuggestField.BUSINESS_NAME,
+        limit: int = 10
+    ) -> SuggestResponse:
+        """Typeahead suggestions merged from every shard"""
+        normalized = prefix.lower()
+        cache_key = f"suggest:{field.value}:{limit}:{normalized}"
+
+        cached = await cache.get(cache_key)
+        if cached:
+            return cached
+
+        async def suggest_shard(shard: str) -> List[Suggestion]:
+            async with self._shard_session(shard) as session:
+                result = await session.execute(suggest_statement(normalized, field, limit))
+                return [Suggestion(id=str(row[0]), value=row[1]) for row in result]
+
+        results = await asyncio.gather(*[suggest_shard(shard) for shard in shard_router.shards])
+        merged = heapq.merge(*results, key=lambda suggestion: suggestion.value.lower())
+
+        response = SuggestResponse(field=field, prefix=prefix, items=list(islice(merged, limit)))
+        await cache.set(cache_key, response, ttl=settings.SUGGEST_CACHE_TTL)
+        return response
+
+    async def update_license(
+        self,
+        license_id: UUID,
+        license_update: LicenseUpdate
+    ) -> Optional[BusinessLicense]:
+        """Update a license, moving it to another shard if its state now maps there"""
+        self._refuse_business(license_update.business_id)
+        shard = await self._locate(LicenseShard.license_id, license_id)
+        if shard is None:
+            return None
+        # Before writing, so an unmapped state is rejected with nothing changed
+        target = shard_router.shard_for_state(license_update.state) if license_update.state else shard
+
+        async with self._shard_session(shard) as session:
+            license_obj = await LicenseService(session).update_license(license_id, license_update)
+        if license_obj and target != shard:
+            await move_licenses(BusinessLicense, shard, target, [_row(license_obj)], self.db)
+        return license_obj
+
+    async def bulk_update(
+        self,
+        filters: LicenseSearchFilters,
+        license_update: LicenseUpdate,
+        dry_run: bool = False,
+        batch_size: int = settings.BULK_UPDATE_BATCH_SIZE
+    ) -> LicenseBulkUpdateResponse:
+        """Bulk update the state's shard, or every shard concurrently, and add up the counts"""
+        if license_update.state:
+            raise ValueError("Bulk updates can't change state on a sharded deployment; update licenses one at a time")
+        self._refuse_business(license_update.business_id)
+        if filters.state:
+            try:
+                shards = [shard_router.shard_for_state(filters.state)]
+            except ValueError:
+                shards = []
+        else:
+            shards = shard_router.shards
+
+        async def update_shard(shard: str) -> LicenseBulkUpdateResponse:
+            async with self._shard_session(shard) as session:
+                return await LicenseService(session).bulk_update(filters, license_update, dry_run, batch_size)
+
+        results = await asyncio.gather(*[update_shard(shard) for shard in shards])
+        return LicenseBulkUpdateResponse(
+            matched=sum(result.matched for result in results),
+            updated=sum(result.updated for result in results),
+            dry_run=dry_run
+        )
+
+    async def delete_license(self, license_id: UUID) -> bool:
+        """Delete a license from its shard and the directory"""
+        shard = await self._locate(LicenseShard.license_id, license_id)
+        if shard is None:
+            return False
+
+        async with self._shard_session(shard) as session:
+            deleted = await LicenseService(session).delete_license(license_id)
+        await self.db.execute(delete(LicenseShard).where(LicenseShard.license_id == license_id))
+        await self.db.commit()
+        return deleted
+
+def _copy_columns(model) -> list:
+    # Generated columns (search_vector) are recomputed by the target
+    return [column for column in model.__table__.columns if column.computed is None]
+
+def _row(license_obj) -> dict:
+    return {column.name: getattr(license_obj, column.key) for column in _copy_columns(type(license_obj))}
+
+async def move_licenses(model, source: str, target: str, rows: List[dict], db: AsyncSession) -> int:
+    """Move license rows of one table between shards and repoint the directory
+
+    Rows are committed on the target before being deleted from the source,
+    and ones already on the target are skipped, so an interrupted move is
+    finished by running it again.
+    """
+    numbers = [row["license_number"] for row in rows]
+    async with shard_router.session(target) as session:
+        existing = await session.execute(select(model.license_number).where(model.license_number.in_(numbers)))
+        taken = set(existing.scalars())
+        missing = [row for row in rows if row["license_number"] not in taken]
+        if missing:
+            await session.execute(insert(model.__table__), missing)
+        await session.commit()
+
+    await _upsert_directory(db, [(row["license_number"], row["id"], target) for row in rows])
+
+    async with shard_router.session(source) as session:
+        await session.execute(delete(model.__table__).where(model.__table__.c.id.in_([row["id"] for row in rows])))
+        await session.commit()
+
+    logger.info(f"Moved {len(rows)} licenses from shard {source} to {target}")
+    return len(rows)
+
+async def _upsert_directory(db: AsyncSession, entries: List[tuple]) -> None:
+    """Record (license_number, license_id, shard) entries, replacing any for the same number"""
+    stmt = pg_insert(LicenseShard).values([
+        {"license_number": number, "license_id": license_id, "shard": shard}
+        for number, license_id, shard in entries
+    ])
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=[LicenseShard.license_number],
+        set_={"license_id": stmt.excluded.license_id, "shard": stmt.excluded.shard}
+    ))
+    await db.commit()
+
+async def rebalance_shards(
+    batch_size: int = settings.SHARD_REBALANCE_BATCH_SIZE,
+    dry_run: bool = False,
+    on_progress: Optional[Callable[[Dict[str, int]], None]] = None
+) -> Dict[str, int]:
+    """Move every license to the shard its state maps to and bring the directory up to date
+
+    Scans the live and archive tables of every shard in id order. Run after
+    changing SHARD_STATES or adding a shard, or to fill the directory when
+    first sharding an existing database (list it as one of the shards).
+    Safe to rerun after an interruption.
+    """
+    counts = {"scanned": 0, "moved": 0}
+    for shard in shard_router.shards:
+        for model in (BusinessLicense, BusinessLicenseArchive):
+            columns = _copy_columns(model)
+            after = None
+            while True:
+                stmt = select(*columns).order_by(model.id).limit(batch_size)
+                if after is not None:
+                    stmt = stmt.where(model.id > after)
+                async with shard_router.session(shard) as session:
+                    rows = [dict(row._mapping) for row in await session.execute(stmt)]
+                if not rows:
+                    break
+                after = rows[-1]["id"]
+                counts["scanned"] += len(rows)
+
+                by_target: Dict[str, List[dict]] = {}
+                for row in rows:
+                    by_target.setdefault(shard_router.shard_for_state(row["state"]), []).append(row)
+
+                async with AsyncSessionLocal() as db:
+                    for target, moving in by_target.items():
+                        if target == shard:
+                            if not dry_run:
+                                await _upsert_directory(db, [(row["license_number"], row["id"], shard) for row in moving])
+                            continue
+                        counts["moved"] += len(moving)
+                        if not dry_run:
+                            await move_licenses(model, shard, target, moving, db)
+                if on_progress:
+                    on_progress(counts)
+
+    logger.info(f"Rebalanced shards: {counts}{' (dry run)' if dry_run else ''}")
+    return counts
@@ -0,0 +1,312 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+import asyncio
+import logging
+import time
+
+import numpy as np
+
+from app.models.license import BusinessLicense, LicenseStatus, LicenseType
+from app.models.license_change import ChangeOperation
+from app.schemas.license import LicenseSearchFilters
+from app.services.change_service import ChangeService
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+# Columns held in memory; everything else is loaded for the returned page only
+SNAPSHOT_COLUMNS = (
+    BusinessLicense.id,
+    BusinessLicense.business_type,
+    BusinessLicense.status,
+    BusinessLicense.city,
+    BusinessLicense.state,
+    BusinessLicense.zip_code,
+    BusinessLicense.expiration_date,
+    BusinessLicense.created_at,
+    BusinessLicense.updated_at,
+)
+
+ENCODED_COLUMNS = ("business_type", "status", "city", "state", "zip_code")
+DATE_COLUMNS = ("expiration_date", "created_at")
+
+def to_micros(values: Sequence[datetime]) -> np.ndarray:
+    """Naive timestamps as int64 microseconds since the epoch"""
+    return np.array(values, dtype="datetime64[us]").view(np.int64)
+
+def filter_micros(value: datetime) -> int:
+    # Columns are naive timestamps; aware filter values compare in UTC
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return int(to_micros([value])[0])
+
+def _plain(value: Any) -> Any:
+    return getattr(value, "value", value)
+
+class Dictionary:
+    """Maps the distinct values of a column to dense integer codes"""
+
+    def __init__(self, dtype, values: Sequence[Any] = ()):
+        self.dtype = dtype
+        self.values: List[Any] = []
+        self.codes: Dict[Any, int] = {}
+        for value in values:
+            self.encode(value)
+
+    def encode(self, value: Any) -> int:
+        value = _plain(value)
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def encode_many(self, values: Sequence[Any]) -> np.ndarray:
+        return np.fromiter((self.encode(value) for value in values), dtype=self.dtype, count=len(values))
+
+    def matching(self, predicate) -> np.ndarray:
+        """Codes of every value satisfying a predicate"""
+        return np.array(
+            [code for code, value in enumerate(self.values) if predicate(value)],
+            dtype=self.dtype,
+        )
+
+class LicenseSnapshot:
+    """Columnar in-memory copy of the searchable license columns, one per worker
+
+    Enum and low-cardinality text columns are dictionary encoded, dates are
+    int64 microseconds, and filters are evaluated as vectorized masks. Rows
+    are appended in load order; deleted rows stay as dead slots until the
+    next full load.
+    """
+
+    def __init__(self):
+        self.ready = False
+        self.refreshed_at = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self._reset()
+
+    def _reset(self):
+        self.size = 0
+        self.columns: Dict[str, np.ndarray] = {
+            "id": np.empty(0, dtype="S16"),
+            "live": np.empty(0, dtype=bool),
+            "expiration_date": np.empty(0, dtype=np.int64),
+            "created_at": np.empty(0, dtype=np.int64),
+        }
+        self.dictionaries: Dict[str, Dictionary] = {
+            "business_type": Dictionary(np.uint8, list(LicenseType)),
+            "status": Dictionary(np.uint8, list(LicenseStatus)),
+            "city": Dictionary(np.int32),
+            "state": Dictionary(np.int32),
+            "zip_code": Dictionary(np.int32),
+        }
+        for name, dictionary in self.dictionaries.items():
+            self.columns[name] = np.empty(0, dtype=dictionary.dtype)
+        # Slot numbers ordered by id, for locating updated and deleted rows
+        self.sorted_ids = np.empty(0, dtype="S16")
+        self.sorted_slots = np.empty(0, dtype=np.int64)
+        self.watermark: Optional[datetime] = None
+        self.change_position: Tuple[int, int] = (0, 0)
+
+    async def start(self):
+        """Load the snapshot and keep it refreshed in the background"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop refreshing"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                async with AsyncSessionLocal() as session:
+                    if self.ready:
+                        await self.refresh(session)
+                    else:
+                        await self.load(session)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error refreshing license search snapshot: {str(e)}")
+            await asyncio.sleep(settings.SNAPSHOT_REFRESH_INTERVAL)
+
+    @property
+    def fresh(self) -> bool:
+        return self.ready and time.monotonic() - self.refreshed_at < settings.SNAPSHOT_MAX_STALENESS
+
+    async def load(self, db: AsyncSession) -> int:
+        """Replace the snapshot with a full copy of the table; returns the number of rows"""
+        start = time.perf_counter()
+        self.ready = False
+        self._reset()
+
+        started = await db.scalar(select(func.localtimestamp()))
+        last = await ChangeService(db).last_position()
+
+        stream = await db.stream(
+            select(*SNAPSHOT_COLUMNS).execution_options(yield_per=settings.SNAPSHOT_LOAD_BATCH_SIZE)
+        )
+        async for rows in stream.partitions():
+            self._append(rows)
+        self._index()
+
+        self.watermark = started
+        self.change_position = last
+        self.refreshed_at = time.monotonic()
+        self.ready = True
+        logger.info(f"Loaded license search snapshot: {self.size} rows in {time.perf_counter() - start:.1f}s")
+        return self.size
+
+    async def refresh(self, db: AsyncSession) -> int:
+        """Apply rows updated and deleted since the last refresh; returns the number applied"""
+        started = await db.scalar(select(func.localtimestamp()))
+        # updated_at is the writer's transaction start, so look back a little
+        # further than the last refresh to catch long transactions
+        since = self.watermark - timedelta(seconds=settings.SNAPSHOT_REFRESH_MARGIN)
+        changed = (await db.execute(
+            select(*SNAPSHOT_COLUMNS).where(BusinessLicense.updated_at >= since)
+        )).all()
+        # Deleted and archived rows leave nothing behind; take them from the change log
+        deleted = await ChangeService(db).changes_after(
+            self.change_position, (ChangeOperation.DELETE, ChangeOperation.ARCHIVE)
+        )
+
+        # No awaits below: searches never see a half-applied refresh
+        self._upsert(changed)
+        if deleted:
+            slots = self._slots([row.license_id.bytes for row in deleted])
+            self.columns["live"][slots[slots >= 0]] = False
+            self.change_position = (deleted[-1].txid, deleted[-1].id)
+
+        self.watermark = started
+        self.refreshed_at = time.monotonic()
+        return len(changed) + len(deleted)
+
+    def _reserve(self, extra: int):
+        capacity = len(self.columns["id"])
+        needed = self.size + extra
+        if needed <= capacity:
+            return
+        capacity = max(needed, capacity * 2, 1024)
+        for name, column in self.columns.items():
+            grown = np.zeros(capacity, dtype=column.dtype)
+            grown[:self.size] = column[:self.size]
+            self.columns[name] = grown
+
+    def _write(self, slots: np.ndarray, rows: Sequence[Any]):
+        self.columns["id"][slots] = [row.id.bytes for row in rows]
+        self.columns["live"][slots] = True
+        for name in ENCODED_COLUMNS:
+            self.columns[name][slots] = self.dictionaries[name].encode_many([getattr(row, name) for row in rows])
+        for name in DATE_COLUMNS:
+            self.columns[name][slots] = to_micros([getattr(row, name) for row in rows])
+
+    def _append(self, rows: Sequence[Any]) -> np.ndarray:
+        self._reserve(len(rows))
+        slots = np.arange(self.size, self.size + len(rows))
+        self.size += len(rows)
+        self._write(slots, rows)
+        return slots
+
+    def _index(self):
+        ids = self.columns["id"][:self.size]
+        self.sorted_slots = np.argsort(ids, kind="stable")
+        self.sorted_ids = ids[self.sorted_slots]
+
+    def _slots(self, ids: Sequence[bytes]) -> np.ndarray:
+        """Slot of each id, or -1 where the id isn't in the snapshot"""
+        ids = np.array(ids, dtype="S16")
+        if not len(self.sorted_ids):
+            return np.full(len(ids), -1)
+        positions = np.searchsorted(self.sorted_ids, ids)
+        found = positions < len(self.sorted_ids)
+        found[found] = self.sorted_ids[positions[found]] == ids[found]
+        return np.where(found, self.sorted_slots[np.minimum(positions, len(self.sorted_slots) - 1)], -1)
+
+    def _upsert(self, rows: Sequence[Any]):
+        if not rows:
+            return
+        slots = self._slots([row.id.bytes for row in rows])
+        existing = slots >= 0
+        if existing.any():
+            self._write(slots[existing], [row for row, hit in zip(rows, existing) if hit])
+        if not existing.all():
+            new_rows = [row for row, hit in zip(rows, existing) if not hit]
+            new_slots = self._append(new_rows)
+            ids = self.columns["id"][new_slots]
+            positions = np.searchsorted(self.sorted_ids, ids)
+            self.sorted_ids = np.insert(self.sorted_ids, positions, ids)
+            self.sorted_slots = np.insert(self.sorted_slots, positions, new_slots)
+
+    def supports(self, filters: LicenseSearchFilters) -> bool:
+        """Whether a search can be answered from the snapshot"""
+        if not self.fresh:
+            return False
+        # Substring matches on high-cardinality columns and full-text search
+        # stay on the trigram and GIN indexes
+        if filters.q or filters.license_number or filters.business_name:
+            return False
+        if filters.include_archived or filters.issuing_authority or filters.near_zip:
+            return False
+        # ILIKE wildcards inside the value aren't emulated
+        if filters.city and ("%" in filters.city or "_" in filters.city):
+            return False
+        return True
+
+    def search(self, filters: LicenseSearchFilters, page: int = 1, size: int = 20) -> Tuple[int, List[UUID]]:
+        """Total matches and the ids of one page, newest first"""
+        n = self.size
+        mask = self.columns["live"][:n].copy()
+
+        for name in ("business_type", "status", "state", "zip_code"):
+            value = getattr(filters, name)
+            if value:
+                code = self.dictionaries[name].codes.get(_plain(value))
+                if code is None:
+                    return 0, []
+                mask &= self.columns[name][:n] == code
+
+        if filters.city:
+            needle = filters.city.lower()
+            codes = self.dictionaries["city"].matching(lambda value: needle in value.lower())
+            mask &= np.isin(self.columns["city"][:n], codes)
+
+        if filters.expires_before:
+            mask &= self.columns["expiration_date"][:n] <= filter_micros(filters.expires_before)
+
+        if filters.expires_after:
+            mask &= self.columns["expiration_date"][:n] >= filter_micros(filters.expires_after)
+
+        matches = np.flatnonzero(mask)
+        total = len(matches)
+        offset = (page - 1) * size
+        if offset >= total:
+            return total, []
+
+        # Order by created_at desc, partially sorting only up to the end of the page
+        newest_first = -self.columns["created_at"][matches]
+        end = min(offset + size, total)
+        if end < total:
+            top = np.argpartition(newest_first, end - 1)[:end]
+            top = top[np.argsort(newest_first[top], kind="stable")]
+        else:
+            top = np.argsort(newest_first, kind="stable")
+
+        page_slots = matches[top[offset:end]]
+        # Fixed-width bytes drop trailing NULs on read; pad them back
+        return total, [UUID(bytes=value.ljust(16, b"\0")) for value in self.columns["id"][page_slots]]
+
+# Global license search snapshot instance
+license_snapshot = LicenseSnapshot()
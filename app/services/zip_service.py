@@ -0,0 +1,212 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, func, or_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+import csv
+import logging
+import math
+
+from app.models.license import BusinessLicense
+from app.models.license_archive import BusinessLicenseArchive
+from app.models.license_change import ChangeOperation
+from app.models.zip_centroid import ZipCentroid
+from app.schemas.license import LicenseSearchFilters
+from app.services.change_service import ChangeService
+from app.core.cache import cache
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_MILES = 3958.8
+MILES_PER_DEGREE_LATITUDE = 2 * math.pi * EARTH_RADIUS_MILES / 360
+
+# Accepted header names, lowercased; the last of each are the ones used by
+# the Census Bureau's ZCTA Gazetteer file
+ZIP_HEADERS = ("zip", "zip_code", "zipcode", "geoid")
+LATITUDE_HEADERS = ("lat", "latitude", "intptlat")
+LONGITUDE_HEADERS = ("lon", "lng", "longitude", "intptlong")
+
+# (latitude, longitude) in degrees
+Origin = Tuple[float, float]
+
+def distance_miles(origin: Origin, model=BusinessLicense):
+    """Great-circle (haversine) distance in miles from origin to each license's coordinates"""
+    latitude, longitude = origin
+    half_dlat = func.radians(model.latitude - latitude) / 2
+    half_dlon = func.radians(model.longitude - longitude) / 2
+    a = (
+        func.power(func.sin(half_dlat), 2)
+        + math.cos(math.radians(latitude)) * func.cos(func.radians(model.latitude)) * func.power(func.sin(half_dlon), 2)
+    )
+    # least() keeps rounding from pushing asin past its domain for antipodal points
+    return 2 * EARTH_RADIUS_MILES * func.asin(func.least(1.0, func.sqrt(a)))
+
+def radius_conditions(origin: Origin, radius_miles: float, model=BusinessLicense) -> List:
+    """Licenses within radius_miles of origin: a bounding box on the coordinate index, then the exact distance"""
+    latitude, longitude = origin
+    latitude_delta = radius_miles / MILES_PER_DEGREE_LATITUDE
+    conditions = [model.latitude.between(latitude - latitude_delta, latitude + latitude_delta)]
+
+    # A degree of longitude is shortest at the box edge nearest a pole; close
+    # to the poles the box spans every longitude
+    edge = min(abs(latitude) + latitude_delta, 90.0)
+    miles_per_degree_longitude = MILES_PER_DEGREE_LATITUDE * math.cos(math.radians(edge))
+    if miles_per_degree_longitude > 0 and radius_miles / miles_per_degree_longitude < 180:
+        longitude_delta = radius_miles / miles_per_degree_longitude
+        west, east = longitude - longitude_delta, longitude + longitude_delta
+        if west < -180 or east > 180:
+            # Across the antimeridian (the western Aleutians): two ranges
+            conditions.append(or_(
+                model.longitude >= (west + 540) % 360 - 180,
+                model.longitude <= (east + 540) % 360 - 180,
+            ))
+        else:
+            conditions.append(model.longitude.between(west, east))
+
+    conditions.append(distance_miles(origin, model) <= radius_miles)
+    return conditions
+
+def read_centroid_file(path: str) -> Iterator[Tuple[str, float, float]]:
+    """(zip_code, latitude, longitude) rows of a comma or tab separated file with a header row"""
+    with open(path, newline="", encoding="utf-8-sig") as source:
+        header = source.readline()
+        delimiter = "\t" if "\t" in header else ","
+        names = [name.strip().lower() for name in next(csv.reader([header], delimiter=delimiter))]
+
+        def position(accepted: Tuple[str, ...]) -> int:
+            for index, name in enumerate(names):
+                if name in accepted:
+                    return index
+            raise ValueError(f"{path} has no {accepted[0]} column (one of {', '.join(accepted)})")
+
+        zip_index = position(ZIP_HEADERS)
+        latitude_index = position(LATITUDE_HEADERS)
+        longitude_index = position(LONGITUDE_HEADERS)
+        for row in csv.reader(source, delimiter=delimiter):
+            if not row:
+                continue
+            # Spreadsheets drop the leading zeros of New England ZIP codes
+            yield row[zip_index].strip().zfill(5), float(row[latitude_index]), float(row[longitude_index])
+
+class ZipCentroidService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def centroid(self, zip_code: str) -> Optional[Origin]:
+        """Centroid of a ZIP code; ZIP+4 codes use their five-digit ZIP code"""
+        result = await self.db.execute(
+            select(ZipCentroid.latitude, ZipCentroid.longitude).where(ZipCentroid.zip_code == zip_code.strip()[:5])
+        )
+        row = result.one_or_none()
+        return (row.latitude, row.longitude) if row else None
+
+    async def load(
+        self,
+        centroids: Iterable[Tuple[str, float, float]],
+        batch_size: int = settings.ZIP_CENTROID_BATCH_SIZE
+    ) -> int:
+        """Insert or replace centroids in one transaction; returns how many were written"""
+        rows = iter(centroids)
+        total = 0
+        while batch := list(islice(rows, batch_size)):
+            # A ZIP code may appear only once per statement; the last one wins
+            latest = {zip_code: (latitude, longitude) for zip_code, latitude, longitude in batch}
+            stmt = pg_insert(ZipCentroid).values([
+                {"zip_code": zip_code, "latitude": latitude, "longitude": longitude}
+                for zip_code, (latitude, longitude) in latest.items()
+            ])
+            await self.db.execute(stmt.on_conflict_do_update(
+                index_elements=[ZipCentroid.zip_code],
+                set_={"latitude": stmt.excluded.latitude, "longitude": stmt.excluded.longitude}
+            ))
+            total += len(batch)
+        await self.db.commit()
+        return total
+
+    async def update_license_coordinates(
+        self,
+        batch_size: int = settings.ZIP_CENTROID_BATCH_SIZE,
+        on_progress: Optional[Callable[[int, int], None]] = None
+    ) -> int:
+        """Bring live and archived license coordinates in line with the centroids
+
+        The trigger only sets coordinates as licenses are written, so run
+        after loading centroids. Walks each table in id order, committing
+        every batch with change log entries for the live licenses and
+        clearing their cached copies; returns the number of licenses changed.
+        """
+        from app.services.license_service import license_cache_keys
+
+        scanned = 0
+        updated = 0
+        for model in (BusinessLicense, BusinessLicenseArchive):
+            values = {"latitude": ZipCentroid.latitude, "longitude": ZipCentroid.longitude}
+            if model is BusinessLicense:
+                # So incremental snapshots pick the new coordinates up
+                values["updated_at"] = func.now()
+
+            after = None
+            while True:
+                batch = select(model.id).order_by(model.id).limit(batch_size)
+                if after is not None:
+                    batch = batch.where(model.id > after)
+                ids = (await self.db.execute(batch)).scalars().all()
+                if not ids:
+                    break
+                after = ids[-1]
+
+                result = await self.db.execute(
+                    update(model)
+                    .where(
+                        model.id.in_(ids),
+                        ZipCentroid.zip_code == func.left(model.zip_code, 5),
+                        or_(
+                            model.latitude.is_distinct_from(ZipCentroid.latitude),
+                            model.longitude.is_distinct_from(ZipCentroid.longitude),
+                        ),
+                    )
+                    .values(**values)
+                    .returning(model.id, model.license_number, model.state, model.status)
+                    .execution_options(synchronize_session=False)
+                )
+                changed = result.all()
+                if model is BusinessLicense:
+                    await ChangeService(self.db).record_changes(changed, ChangeOperation.UPDATE)
+                await self.db.commit()
+
+                await cache.delete_many([key for row in changed for key in license_cache_keys(row.id, row.license_number)])
+                scanned += len(ids)
+                updated += len(changed)
+                if on_progress:
+                    on_progress(scanned, updated)
+
+        logger.info(f"Updated coordinates of {updated} of {scanned} licenses")
+        return updated
+
+async def search_origin(db: AsyncSession, filters: LicenseSearchFilters) -> Optional[Origin]:
+    """Centroid of a search's near_zip, or None for searches without one"""
+    if not filters.near_zip:
+        return None
+    if settings.EDGE_MODE:
+        raise ValueError("Radius searches aren't available on edge deployments")
+    origin = await ZipCentroidService(db).centroid(filters.near_zip)
+    if origin is None:
+        raise ValueError(f"No centroid loaded for ZIP code {filters.near_zip}")
+    return origin
+
+async def load_zip_centroids(
+    path: str,
+    batch_size: int = settings.ZIP_CENTROID_BATCH_SIZE,
+    on_progress: Optional[Callable[[int, int], None]] = None
+) -> Dict[str, int]:
+    """Load a centroid file into every database holding licenses and update their coordinates"""
+    from app.core.shards import shard_router
+
+    counts = {"centroids": 0, "licenses": 0}
+    for session_factory in shard_router.license_sessions():
+        async with session_factory() as session:
+            service = ZipCentroidService(session)
+            counts["centroids"] += await service.load(read_centroid_file(path), batch_size)
+            counts["licenses"] += await service.update_license_coordinates(batch_size, on_progress)
+    return counts
@@ -1,7 +1,11 @@
 import pytest
 import asyncio
-from typing import AsyncGenerator
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, AsyncGenerator, Dict
 from httpx import AsyncClient
+from sqlalchemy import Column, MetaData, Table, Text, Uuid
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.pool import StaticPool
 import pytest_asyncio
@@ -9,23 +13,77 @@ import pytest_asyncio
 from app.main import app
 from app.core.database import get_db
 from app.models.base import Base
-from app.core.config import settings
+from app.models.license import BusinessLicense
 
 # Test database URL
 TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
 
-# Create test engine
-test_engine = create_async_engine(
-    TEST_DATABASE_URL,
-    connect_args={"check_same_thread": False},
-    poolclass=StaticPool,
-)
+def _sqlite_tables(*tables: Table) -> MetaData:
+    """SQLite stand-ins for PostgreSQL tables
 
-TestSessionLocal = async_sessionmaker(
-    test_engine,
-    class_=AsyncSession,
-    expire_on_commit=False,
-)
+    UUIDs become generic UUIDs and search_vector plain text the ORM can read
+    back after inserts. business_licenses gets a unique license_number in
+    place of the license_number_registry trigger. Foreign keys, triggers and
+    PostgreSQL-only indexes are left out.
+    """
+    metadata = MetaData()
+    for table in tables:
+        Table(table.name, metadata, *[
+            Column(
+                column.name,
+                Text if isinstance(column.type, TSVECTOR) else Uuid(as_uuid=True) if isinstance(column.type, Uuid) else column.type,
+                primary_key=column.primary_key,
+                nullable=column.nullable,
+                unique=table is BusinessLicense.__table__ and column.name == "license_number",
+            )
+            for column in table.columns
+        ])
+    return metadata
+
+def _license_row(license_number: str, **values: Any) -> Dict[str, Any]:
+    now = datetime(2025, 1, 1)
+    row = {
+        "id": uuid.uuid4(),
+        "license_number": license_number,
+        "business_name": f"Business {license_number}",
+        "business_type": "retail",
+        "status": "active",
+        "issued_date": now,
+        "expiration_date": now + timedelta(days=365),
+        "issuing_authority": "Licensing Board",
+        "street_address": "1 Main St",
+        "city": "Springfield",
+        "state": "CA",
+        "zip_code": "90001",
+        "is_renewable": True,
+        "created_at": now,
+        "updated_at": now,
+    }
+    row.update(values)
+    return row
+
+@pytest.fixture
+def sqlite_tables():
+    """Builds SQLite stand-ins for the given tables"""
+    return _sqlite_tables
+
+@pytest.fixture
+def license_row():
+    """Builds a business_licenses row for inserting into stand-in tables"""
+    return _license_row
+
+@pytest_asyncio.fixture
+async def sqlite_engine():
+    """An in-memory SQLite engine with stand-ins for every table"""
+    engine = create_async_engine(
+        TEST_DATABASE_URL,
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(_sqlite_tables(*Base.metadata.sorted_tables).create_all)
+    yield engine
+    await engine.dispose()
 
 @pytest_asyncio.fixture(scope="session")
 def event_loop():
@@ -35,13 +93,14 @@ def event_loop():
     loop.close()
 
 @pytest_asyncio.fixture
-async def db_session() -> AsyncGenerator[AsyncSession, None]:
+async def db_session(sqlite_engine) -> AsyncGenerator[AsyncSession, None]:
     """Create a test database session"""
-    async with test_engine.begin() as conn:
-        await conn.execute("DROP TABLE IF EXISTS business_licenses")
-        await conn.run_sync(Base.metadata.create_all)
-    
-    async with TestSessionLocal() as session:
+    session_factory = async_sessionmaker(
+        sqlite_engine,
+        class_=AsyncSession,
+        expire_on_commit=False,
+    )
+    async with session_factory() as session:
         yield session
 
 @pytest_asyncio.fixture
@@ -49,7 +108,7 @@ async def override_get_db(db_session: AsyncSession):
     """Override the get_db dependency"""
     async def _override_get_db():
         yield db_session
-    
+
     app.dependency_overrides[get_db] = _override_get_db
     yield
     app.dependency_overrides.clear()
@@ -58,4 +117,4 @@ async def override_get_db(db_session: AsyncSession):
 async def client(override_get_db) -> AsyncGenerator[AsyncClient, None]:
     """Create a test client"""
     async with AsyncClient(app=app, base_url="http://test") as ac:
-        yield ac
\ No newline at end of file
+        yield ac
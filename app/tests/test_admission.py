@@ -0,0 +1,71 @@
+import pytest
+from httpx import AsyncClient
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from app.core.admission import (
+    AdmissionController,
+    AdmissionControlMiddleware,
+    ADMIT_ALL,
+    SHED_EXPENSIVE,
+    SHED_ALL,
+)
+from app.core.config import settings
+
+def _make_app(controller: AdmissionController) -> Starlette:
+    async def ok(request):
+        return PlainTextResponse("ok")
+
+    app = Starlette(routes=[
+        Route(f"{settings.API_V1_STR}/licenses/search", ok),
+        Route(f"{settings.API_V1_STR}/licenses/number/ABC", ok),
+        Route("/health/ready", ok),
+    ])
+    app.add_middleware(AdmissionControlMiddleware, controller=controller)
+    return app
+
+@pytest.mark.asyncio
+class TestAdmissionControl:
+
+    async def test_levels_follow_loop_lag(self):
+        """Test that loop lag moves the controller through admission levels"""
+        controller = AdmissionController()
+        assert controller.level == ADMIT_ALL
+
+        controller.loop_lag_ms = settings.ADMISSION_SHED_EXPENSIVE_LOOP_LAG_MS
+        assert controller.level == SHED_EXPENSIVE
+
+        controller.loop_lag_ms = settings.ADMISSION_SHED_ALL_LOOP_LAG_MS
+        assert controller.level == SHED_ALL
+
+    async def test_sheds_expensive_routes_first(self):
+        """Test that search is shed before cheap gets and health is never shed"""
+        controller = AdmissionController()
+        controller.loop_lag_ms = settings.ADMISSION_SHED_EXPENSIVE_LOOP_LAG_MS
+
+        async with AsyncClient(app=_make_app(controller), base_url="http://test") as ac:
+            response = await ac.get(f"{settings.API_V1_STR}/licenses/search")
+            assert response.status_code == 503
+            assert response.headers["Retry-After"] == str(settings.ADMISSION_RETRY_AFTER)
+
+            response = await ac.get(f"{settings.API_V1_STR}/licenses/number/ABC")
+            assert response.status_code == 200
+
+            controller.loop_lag_ms = settings.ADMISSION_SHED_ALL_LOOP_LAG_MS
+            response = await ac.get(f"{settings.API_V1_STR}/licenses/number/ABC")
+            assert response.status_code == 503
+
+            response = await ac.get("/health/ready")
+            assert response.status_code == 200
+
+    async def test_expensive_paths_match_mounted_routes(self):
+        """Test that every expensive prefix matches a route under the API prefix"""
+        from app.main import app
+
+        controller = AdmissionController()
+        paths = [route.path for route in app.routes if hasattr(route, "path")]
+        for prefix in settings.ADMISSION_EXPENSIVE_PATHS:
+            matching = [path for path in paths if path.startswith(f"{settings.API_V1_STR}{prefix}")]
+            assert matching, f"{prefix} matches no route"
+            assert all(controller.is_expensive(path) for path in matching)
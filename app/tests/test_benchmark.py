@@ -0,0 +1,42 @@
+from app.benchmark import (
+    BENCHMARK_PREFIX,
+    WORKLOAD,
+    Workload,
+    benchmark_rows,
+    compare_results,
+    percentile,
+    summarize,
+)
+
+def _results(p95_ms: float, throughput_rps: float, errors: int = 0) -> dict:
+    latencies = {endpoint: [p95_ms / 1000] * 100 for endpoint in WORKLOAD}
+    return summarize(latencies, {endpoint: errors for endpoint in WORKLOAD}, elapsed=100 / throughput_rps)
+
+class TestBenchmark:
+
+    def test_rows_are_deterministic(self):
+        """Test that a seed always produces the same dataset, in any batch split"""
+        rows = benchmark_rows(10, seed=3)
+        assert rows == benchmark_rows(5, seed=3) + benchmark_rows(5, seed=3, start=5)
+        assert rows != benchmark_rows(10, seed=4)
+        assert all(row[1].startswith(f"{BENCHMARK_PREFIX}3-") for row in rows)
+
+    def test_workload_is_deterministic_per_client(self):
+        """Test that each client replays the same request sequence"""
+        targets = [("id-1", "BENCH-1-00000001"), ("id-2", "BENCH-1-00000002")]
+        first = [Workload(targets, 1, 0, "run").next_request() for _ in range(3)]
+        again = [Workload(targets, 1, 0, "run").next_request() for _ in range(3)]
+        assert first == again
+
+    def test_percentile_and_regressions(self):
+        """Test nearest-rank percentiles and regression detection against a baseline"""
+        ordered = [float(i) for i in range(1, 101)]
+        assert percentile(ordered, 50) == 50.0
+        assert percentile(ordered, 99) == 99.0
+        assert percentile([], 95) == 0.0
+
+        baseline = _results(p95_ms=10, throughput_rps=100)
+        assert compare_results(baseline, _results(p95_ms=10.5, throughput_rps=95), tolerance=0.1) == []
+        regressions = compare_results(baseline, _results(p95_ms=20, throughput_rps=50), tolerance=0.1)
+        assert any("p95_ms" in regression for regression in regressions)
+        assert any("throughput_rps" in regression for regression in regressions)
@@ -0,0 +1,27 @@
+import pytest
+
+from app.core.bloom import BloomFilter
+
+class TestBloomFilter:
+
+    def test_sizing(self):
+        """Test that the filter is sized for its capacity and error rate"""
+        bloom = BloomFilter(key="test:bloom", capacity=1_000_000, error_rate=0.01)
+        # ~9.6 bits and 7 hashes per entry at 1%
+        assert 9_500_000 < bloom.size < 9_700_000
+        assert bloom.hashes == 7
+
+    def test_positions_are_stable_and_in_range(self):
+        """Test that every worker derives the same bit positions for a value"""
+        bloom = BloomFilter(key="test:bloom", capacity=1000, error_rate=0.01)
+        positions = bloom.positions("BL-001-2024")
+        assert positions == BloomFilter(key="other", capacity=1000, error_rate=0.01).positions("BL-001-2024")
+        assert len(positions) == bloom.hashes
+        assert all(0 <= p < bloom.size for p in positions)
+        assert positions != bloom.positions("BL-002-2024")
+
+    @pytest.mark.asyncio
+    async def test_unavailable_filter_never_rules_out(self):
+        """Test that without Redis every number may exist"""
+        bloom = BloomFilter(key="test:bloom", capacity=1000, error_rate=0.01)
+        assert await bloom.might_contain("BL-404") is True
@@ -0,0 +1,55 @@
+import pytest
+import pytest_asyncio
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.license import BusinessLicense, LicenseStatus
+from app.models.license_change import LicenseChange
+from app.schemas.license import LicenseSearchFilters, LicenseUpdate
+from app.services.license_service import LicenseService
+
+@pytest_asyncio.fixture
+async def session(sqlite_engine, license_row):
+    async with sqlite_engine.begin() as conn:
+        await conn.execute(insert(BusinessLicense), [
+            license_row(f"BL-{n}", issuing_authority="Health Department" if n < 12 else "Licensing Board")
+            for n in range(20)
+        ])
+
+    async with AsyncSession(sqlite_engine, expire_on_commit=False) as db:
+        yield db
+
+class TestBulkUpdate:
+
+    @pytest.mark.asyncio
+    async def test_dry_run_then_batched_update(self, session):
+        """Test that a dry run only counts, and an update covers every match across batches"""
+        service = LicenseService(session)
+        filters = LicenseSearchFilters(issuing_authority="Health Department")
+        license_update = LicenseUpdate(status=LicenseStatus.SUSPENDED)
+
+        result = await service.bulk_update(filters, license_update, dry_run=True)
+        assert (result.matched, result.updated, result.dry_run) == (12, 0, True)
+        assert await session.scalar(select(func.count()).where(BusinessLicense.status == LicenseStatus.SUSPENDED)) == 0
+
+        result = await service.bulk_update(filters, license_update, batch_size=5)
+        assert (result.matched, result.updated, result.dry_run) == (12, 12, False)
+
+        suspended = await session.execute(
+            select(BusinessLicense.issuing_authority).where(BusinessLicense.status == LicenseStatus.SUSPENDED)
+        )
+        assert set(suspended.scalars()) == {"Health Department"}
+        assert await session.scalar(select(func.count()).select_from(LicenseChange)) == 12
+
+    @pytest.mark.asyncio
+    async def test_rejects_unbounded_updates(self, session):
+        """Test that a bulk update needs filters and fields, and skips the archive"""
+        service = LicenseService(session)
+        with pytest.raises(ValueError):
+            await service.bulk_update(LicenseSearchFilters(), LicenseUpdate(status=LicenseStatus.SUSPENDED))
+        with pytest.raises(ValueError):
+            await service.bulk_update(LicenseSearchFilters(state="CA"), LicenseUpdate())
+        with pytest.raises(ValueError):
+            await service.bulk_update(
+                LicenseSearchFilters(state="CA", include_archived=True), LicenseUpdate(status=LicenseStatus.SUSPENDED)
+            )
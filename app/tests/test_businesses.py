@@ -0,0 +1,73 @@
+import pytest
+import pytest_asyncio
+from sqlalchemy import event, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.business import Business
+from app.models.license import BusinessLicense
+from app.schemas.license import LicenseSearchFilters, LicenseUpdate
+from app.services.business_service import BusinessService, UnknownBusinessError
+from app.services.license_service import LicenseService
+
+@pytest_asyncio.fixture
+async def session_and_queries(sqlite_engine, license_row):
+    queries = []
+    event.listen(sqlite_engine.sync_engine, "before_cursor_execute", lambda *args: queries.append(args[2]))
+
+    async with AsyncSession(sqlite_engine, expire_on_commit=False) as session:
+        session.add_all([Business(id=i, name=f"Business {i}") for i in range(1, 6)])
+        await session.flush()
+        await session.execute(insert(BusinessLicense), [
+            license_row(f"BL-{i}-{n}", business_name=f"Business {i}", business_id=i) for i in range(1, 6) for n in range(i)
+        ])
+        await session.commit()
+        session.expunge_all()
+        queries.clear()
+        yield session, queries
+
+class TestBusinessService:
+
+    @pytest.mark.asyncio
+    async def test_get_business_with_licenses(self, session_and_queries):
+        """Test that a business and all its licenses load in two queries"""
+        session, queries = session_and_queries
+        business = await BusinessService(session).get_business(4, include_licenses=True)
+        assert [license_obj.license_number for license_obj in business.licenses] == [f"BL-4-{n}" for n in range(4)]
+        assert len(queries) == 2
+
+    @pytest.mark.asyncio
+    async def test_list_businesses_keyset_pages(self, session_and_queries):
+        """Test keyset pages with licenses batch loaded per page, not per business"""
+        session, queries = session_and_queries
+        service = BusinessService(session)
+
+        first = await service.list_businesses(size=3, include_licenses=True)
+        assert [item.id for item in first.items] == [1, 2, 3]
+        assert [len(item.licenses) for item in first.items] == [1, 2, 3]
+        assert first.has_more and first.next_cursor == "3"
+        assert len(queries) == 2
+
+        second = await service.list_businesses(after=first.next_cursor, size=3)
+        assert [item.id for item in second.items] == [4, 5]
+        assert not second.has_more
+        assert all(item.licenses is None for item in second.items)
+
+    @pytest.mark.asyncio
+    async def test_licenses_never_lazy_load(self, session_and_queries):
+        """Test that touching unloaded licenses fails instead of querying"""
+        session, _ = session_and_queries
+        business = await BusinessService(session).get_business(2)
+        with pytest.raises(Exception, match="lazy='raise'"):
+            business.licenses
+
+    @pytest.mark.asyncio
+    async def test_unknown_business_rejected_before_writing(self, session_and_queries):
+        """Test that a license can't be moved to a missing business, even in bulk"""
+        session, _ = session_and_queries
+        service = LicenseService(session)
+        assert await BusinessService(session).existing_ids([1, 5, 6]) == {1, 5}
+
+        with pytest.raises(UnknownBusinessError, match="Business 6 does not exist"):
+            await service.bulk_update(LicenseSearchFilters(state="CA"), LicenseUpdate(business_id=6))
+        business_ids = await session.execute(select(BusinessLicense.business_id).distinct())
+        assert set(business_ids.scalars()) == {1, 2, 3, 4, 5}
@@ -0,0 +1,54 @@
+import asyncio
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core import database
+from app.core.config import settings
+from app.models.license import BusinessLicense
+from app.models.license_change import LicenseChange
+from app.schemas.license import LicenseCreate
+from app.services.create_coalescer import CreateCoalescer
+
+@pytest_asyncio.fixture
+async def sessions(sqlite_engine, monkeypatch):
+    session_factory = async_sessionmaker(sqlite_engine, class_=AsyncSession, expire_on_commit=False)
+    monkeypatch.setattr(database, "AsyncSessionLocal", session_factory)
+    yield session_factory
+
+class TestCreateCoalescer:
+
+    @pytest.mark.asyncio
+    async def test_batch_commits_together_with_per_caller_conflicts(self, sessions, license_row, monkeypatch):
+        """Test that concurrent creates share a transaction and only a duplicate fails"""
+        monkeypatch.setattr(settings, "CREATE_COALESCE_WINDOW_MS", 50)
+        coalescer = CreateCoalescer()
+
+        results = await asyncio.gather(
+            *[coalescer.create(LicenseCreate(**license_row(number))) for number in ("BL-1", "BL-2", "BL-1", "BL-3")],
+            return_exceptions=True
+        )
+        assert [result.license_number for result in results if not isinstance(result, Exception)] == ["BL-1", "BL-2", "BL-3"]
+        assert isinstance(results[2], IntegrityError)
+        assert results[0].id and results[0].created_at
+
+        async with sessions() as db:
+            assert await db.scalar(select(func.count()).select_from(BusinessLicense)) == 3
+            assert await db.scalar(select(func.count()).select_from(LicenseChange)) == 3
+
+    @pytest.mark.asyncio
+    async def test_full_batch_is_written_without_waiting(self, sessions, license_row, monkeypatch):
+        """Test that a batch reaching the size limit doesn't wait out the window"""
+        monkeypatch.setattr(settings, "CREATE_COALESCE_WINDOW_MS", 60_000)
+        monkeypatch.setattr(settings, "CREATE_COALESCE_MAX_BATCH", 2)
+        coalescer = CreateCoalescer()
+
+        results = await asyncio.wait_for(
+            asyncio.gather(*[coalescer.create(LicenseCreate(**license_row(number))) for number in ("BL-1", "BL-2")]),
+            timeout=5
+        )
+        assert [result.license_number for result in results] == ["BL-1", "BL-2"]
+        await coalescer.drain()
@@ -0,0 +1,61 @@
+import pytest
+import pytest_asyncio
+from sqlalchemy import insert, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.core.config import settings
+from app.core.database import create_edge_engine, edge_database_url
+from app.models.edge import edge_metadata, edge_licenses, EDGE_FTS_TABLE
+from app.schemas.license import LicenseSearchFilters
+from app.services.edge_snapshot import FTS_DDL, fts_query
+from app.services.license_service import LicenseService, search_statements
+
+@pytest_asyncio.fixture
+async def edge_session(tmp_path, monkeypatch, license_row):
+    path = str(tmp_path / "edge.db")
+    writer = create_async_engine(edge_database_url(path, read_only=False))
+    async with writer.begin() as conn:
+        await conn.run_sync(edge_metadata.create_all)
+        await conn.execute(text(FTS_DDL))
+        await conn.execute(insert(edge_licenses), [
+            license_row("BL-001", business_name="Sunrise Bakery", description="Fresh bread baked daily"),
+            license_row("BL-002", business_name="Corner Cafe", description="Coffee and pastries"),
+            license_row("BL-003", business_name="Ace Hardware", description="Tools and paint"),
+        ])
+        await conn.execute(text(f"INSERT INTO {EDGE_FTS_TABLE}({EDGE_FTS_TABLE}) VALUES ('rebuild')"))
+    await writer.dispose()
+
+    monkeypatch.setattr(settings, "EDGE_MODE", True)
+    engine = create_edge_engine(path)
+    async with AsyncSession(engine) as session:
+        yield session
+    await engine.dispose()
+
+class TestEdgeSnapshot:
+
+    def test_fts_query_translation(self):
+        """Test that search syntax maps onto FTS5 with every term quoted"""
+        assert fts_query("bakery") == '("bakery")'
+        assert fts_query('"corner cafe" or hardware -paint') == '("corner cafe" OR "hardware") NOT "paint"'
+        assert fts_query('AND* NEAR(') == '("AND*") AND ("NEAR(")'
+        assert fts_query("-paint") is None
+
+    @pytest.mark.asyncio
+    async def test_reads_from_snapshot(self, edge_session):
+        """Test lookups and full-text search against a read-only snapshot"""
+        service = LicenseService(edge_session)
+        license_obj = await service.get_license_by_number("BL-002")
+        assert license_obj.business_name == "Corner Cafe"
+        assert await service.license_number_exists("BL-404") is False
+
+        stmt, count_stmt = search_statements(LicenseSearchFilters(q="baked or paint", highlight=True))
+        assert (await edge_session.execute(count_stmt)).scalar() == 2
+        rows = (await edge_session.execute(stmt)).all()
+        assert {row.BusinessLicense.license_number for row in rows} == {"BL-001", "BL-003"}
+        assert all(row.rank > 0 and "<mark>" in row.highlight for row in rows)
+
+    @pytest.mark.asyncio
+    async def test_snapshot_is_read_only(self, edge_session):
+        """Test that the edge engine refuses writes"""
+        with pytest.raises(Exception, match="readonly"):
+            await edge_session.execute(text("DELETE FROM business_licenses"))
@@ -0,0 +1,69 @@
+import csv
+import gzip
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.license import BusinessLicense
+from app.models.license_change import LicenseChange
+from app.services.job_service import (
+    JobService, export_licenses_job, import_licenses_job, job_file_path, UPLOAD_SUFFIX
+)
+from app.models.job import JobKind
+
+@pytest_asyncio.fixture
+async def session(sqlite_engine, license_row, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "JOB_RESULTS_DIR", str(tmp_path))
+    async with sqlite_engine.begin() as conn:
+        await conn.execute(insert(BusinessLicense), [
+            license_row(f"BL-{n}", state="CA" if n % 2 else "NV") for n in range(10)
+        ])
+
+    async with AsyncSession(sqlite_engine, expire_on_commit=False) as db:
+        yield db
+
+async def _no_progress(progress, total):
+    pass
+
+class TestJobHandlers:
+
+    @pytest.mark.asyncio
+    async def test_export_then_import_round_trip(self, session):
+        """Test that an export is a valid import and duplicates are rejected per row"""
+        service = JobService(session)
+        export = await service.submit(JobKind.EXPORT, {"filters": {"state": "CA"}})
+        result, path = await export_licenses_job(session, export, _no_progress)
+        assert result == {"exported": 5}
+
+        with gzip.open(path, "rt", newline="") as f:
+            rows = list(csv.DictReader(f))
+        assert {row["license_number"] for row in rows} == {f"BL-{n}" for n in range(1, 10, 2)}
+        assert rows[0]["business_type"] == "retail"
+
+        # Re-import with two numbers freed up, plus one invalid row
+        await session.execute(delete(BusinessLicense).where(BusinessLicense.license_number.in_(["BL-1", "BL-3"])))
+        await session.commit()
+        upload = await service.submit(JobKind.IMPORT, {})
+        with open(job_file_path(upload.id, UPLOAD_SUFFIX), "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows + [
+                dict(rows[0], license_number="BL-NEW", expiration_date="2020-01-01 00:00:00"),
+                dict(rows[0], license_number="BL-ORPHAN", business_id="7"),
+            ])
+
+        result, errors_path = await import_licenses_job(session, upload, _no_progress)
+        assert result == {"imported": 2, "rejected": 5}
+        count = await session.execute(select(func.count()).select_from(BusinessLicense))
+        assert count.scalar() == 10
+        changes = await session.execute(select(func.count()).select_from(LicenseChange))
+        assert changes.scalar() == 2
+
+        with open(errors_path, newline="") as f:
+            errors = list(csv.DictReader(f))
+        assert [error["line"] for error in errors] == ["4", "5", "6", "7", "8"]
+        assert "Expiration date must be after issued date" in errors[-2]["error"]
+        assert errors[-1]["error"] == "Business 7 does not exist"
@@ -3,7 +3,14 @@ from httpx import AsyncClient
 from uuid import uuid4
 from datetime import datetime, timedelta
 
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core import database
+from app.core.config import Settings, settings
+from app.core.database import is_foreign_key_violation
 from app.schemas.license import LicenseType, LicenseStatus
+from app.services.license_service import LicenseService
 
 @pytest.mark.asyncio
 class TestLicenseAPI:
@@ -64,6 +71,47 @@ class TestLicenseAPI:
         assert response.status_code == 409
         assert "License number already exists" in response.json()["detail"]
     
+    @pytest.mark.parametrize("coalesce", [False, True])
+    async def test_create_race_is_a_conflict(self, client: AsyncClient, sqlite_engine, monkeypatch, coalesce):
+        """Test that a duplicate slipping past the existence check is a 409, not a 500"""
+        async def not_found(self, license_number):
+            return None
+
+        monkeypatch.setattr(LicenseService, "get_license_by_number", not_found)
+        monkeypatch.setattr(settings, "CREATE_COALESCE_ENABLED", coalesce)
+        monkeypatch.setattr(settings, "CREATE_COALESCE_WINDOW_MS", 1)
+        monkeypatch.setattr(database, "AsyncSessionLocal", async_sessionmaker(sqlite_engine, class_=AsyncSession, expire_on_commit=False))
+        license_data = {
+            "license_number": "BL-RACE-2024",
+            "business_name": "Racing Business",
+            "business_type": LicenseType.BUSINESS,
+            "issued_date": datetime.now().isoformat(),
+            "expiration_date": (datetime.now() + timedelta(days=365)).isoformat(),
+            "issuing_authority": "City of Test",
+            "street_address": "123 Test St",
+            "city": "Test City",
+            "state": "TS",
+            "zip_code": "12345",
+        }
+
+        response = await client.post("/api/v1/licenses/", json=license_data)
+        assert response.status_code == 201
+        response = await client.post("/api/v1/licenses/", json=license_data)
+        assert response.status_code == 409
+        assert response.json()["detail"] == "License number already exists"
+
+    async def test_foreign_key_violations_are_told_apart(self):
+        """Test classifying IntegrityErrors by SQLSTATE, or by message on SQLite"""
+        class Orig(Exception):
+            def __init__(self, message, sqlstate=None):
+                super().__init__(message)
+                self.sqlstate = sqlstate
+
+        assert is_foreign_key_violation(IntegrityError("INSERT", {}, Orig("violates foreign key", "23503")))
+        assert not is_foreign_key_violation(IntegrityError("INSERT", {}, Orig("duplicate key", "23505")))
+        assert is_foreign_key_violation(IntegrityError("INSERT", {}, Exception("FOREIGN KEY constraint failed")))
+        assert not is_foreign_key_violation(IntegrityError("INSERT", {}, Exception("UNIQUE constraint failed")))
+
     async def test_get_license_by_number(self, client: AsyncClient):
         """Test getting a license by license number"""
         # First create a license
@@ -97,6 +145,31 @@ class TestLicenseAPI:
         assert response.status_code == 404
         assert "License not found" in response.json()["detail"]
     
+    async def test_head_license_number(self, client: AsyncClient):
+        """Test checking whether a license number exists"""
+        license_data = {
+            "license_number": "HEAD-001",
+            "business_name": "Head Check LLC",
+            "business_type": LicenseType.RETAIL,
+            "issued_date": datetime.now().isoformat(),
+            "expiration_date": (datetime.now() + timedelta(days=365)).isoformat(),
+            "issuing_authority": "City of Test",
+            "street_address": "123 Test St",
+            "city": "Test City",
+            "state": "TS",
+            "zip_code": "12345",
+        }
+        
+        create_response = await client.post("/api/v1/licenses/", json=license_data)
+        assert create_response.status_code == 201
+        
+        response = await client.head("/api/v1/licenses/number/HEAD-001")
+        assert response.status_code == 200
+        assert response.content == b""
+        
+        response = await client.head("/api/v1/licenses/number/HEAD-404")
+        assert response.status_code == 404
+    
     async def test_search_licenses_no_filters(self, client: AsyncClient):
         """Test searching licenses without filters"""
         response = await client.get("/api/v1/licenses/search")
@@ -263,3 +336,121 @@ class TestLicenseAPI:
         data = response.json()
         assert len(data["items"]) == 10
         assert data["page"] == 2
+
+    async def test_change_feed(self, client: AsyncClient):
+        """Test that writes appear in the change feed in order with a resume token"""
+        license_data = {
+            "license_number": "FEED-001",
+            "business_name": "Feed Business",
+            "business_type": LicenseType.BUSINESS,
+            "issued_date": datetime.now().isoformat(),
+            "expiration_date": (datetime.now() + timedelta(days=365)).isoformat(),
+            "issuing_authority": "City of Test",
+            "street_address": "123 Test St",
+            "city": "Test City",
+            "state": "TS",
+            "zip_code": "12345",
+        }
+        
+        create_response = await client.post("/api/v1/licenses/", json=license_data)
+        assert create_response.status_code == 201
+        license_id = create_response.json()["id"]
+        
+        response = await client.put(f"/api/v1/licenses/{license_id}", json={"business_name": "Renamed"})
+        assert response.status_code == 200
+        
+        response = await client.get("/api/v1/licenses/changes?limit=1")
+        assert response.status_code == 200
+        
+        data = response.json()
+        assert [c["operation"] for c in data["changes"]] == ["create"]
+        assert data["has_more"] is True
+        
+        # Resume after the first change
+        response = await client.get(f"/api/v1/licenses/changes?since={data['next_token']}")
+        data = response.json()
+        assert [c["operation"] for c in data["changes"]] == ["update"]
+        assert data["changes"][0]["license"]["business_name"] == "Renamed"
+        
+        response = await client.delete(f"/api/v1/licenses/{license_id}")
+        assert response.status_code == 204
+        
+        response = await client.get(f"/api/v1/licenses/changes?since={data['next_token']}")
+        data = response.json()
+        assert [c["operation"] for c in data["changes"]] == ["delete"]
+        assert data["changes"][0]["license"] is None
+    
+    async def test_change_feed_invalid_token(self, client: AsyncClient):
+        """Test that a malformed resume token is rejected"""
+        response = await client.get("/api/v1/licenses/changes?since=not-a-token")
+        assert response.status_code == 400
+    
+    async def test_suggest(self, client: AsyncClient):
+        """Test typeahead suggestions by business name and license number prefix"""
+        for number, name in [("SUG-001", "Sunrise Bakery"), ("SUG-002", "Sunset Salon"), ("OTH-001", "Moonlight Cafe")]:
+            license_data = {
+                "license_number": number,
+                "business_name": name,
+                "business_type": LicenseType.BUSINESS,
+                "issued_date": datetime.now().isoformat(),
+                "expiration_date": (datetime.now() + timedelta(days=365)).isoformat(),
+                "issuing_authority": "City of Test",
+                "street_address": "123 Test St",
+                "city": "Test City",
+                "state": "TS",
+                "zip_code": "12345",
+            }
+            response = await client.post("/api/v1/licenses/", json=license_data)
+            assert response.status_code == 201
+        
+        response = await client.get("/api/v1/licenses/suggest?prefix=sun")
+        assert response.status_code == 200
+        assert [item["value"] for item in response.json()["items"]] == ["Sunrise Bakery", "Sunset Salon"]
+        
+        response = await client.get("/api/v1/licenses/suggest?prefix=OTH&field=license_number&limit=5")
+        assert response.status_code == 200
+        items = response.json()["items"]
+        assert [item["value"] for item in items] == ["OTH-001"]
+        assert "id" in items[0]
+    
+    async def test_expiring_rejects_invalid_parameters(self, client: AsyncClient):
+        """Test that unknown horizons and malformed cursors are rejected"""
+        response = await client.get("/api/v1/licenses/expiring?within=45")
+        assert response.status_code == 400
+        
+        response = await client.get("/api/v1/licenses/expiring/summary?within=45")
+        assert response.status_code == 400
+        
+        response = await client.get("/api/v1/licenses/expiring?within=30&cursor=not-a-cursor")
+        assert response.status_code == 400
+    
+    async def test_expiring_horizons_limited_to_view_coverage(self):
+        """Test that configured horizons can't exceed what the expiring views cover"""
+        assert Settings(EXPIRING_HORIZONS_DAYS=[7, 90]).EXPIRING_HORIZONS_DAYS == [7, 90]
+        
+        with pytest.raises(ValueError):
+            Settings(EXPIRING_HORIZONS_DAYS=[7, 180])
+    
+    async def test_search_include_archived(self, client: AsyncClient):
+        """Test that searching with archived licenses still returns live ones"""
+        license_data = {
+            "license_number": "ARCH-001",
+            "business_name": "Archive Check Co",
+            "business_type": LicenseType.TRADE,
+            "issued_date": datetime.now().isoformat(),
+            "expiration_date": (datetime.now() + timedelta(days=365)).isoformat(),
+            "issuing_authority": "City of Test",
+            "street_address": "123 Test St",
+            "city": "Archive City",
+            "state": "TS",
+            "zip_code": "12345",
+        }
+        
+        response = await client.post("/api/v1/licenses/", json=license_data)
+        assert response.status_code == 201
+        
+        response = await client.get("/api/v1/licenses/search?city=Archive&include_archived=true")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] == 1
+        assert data["items"][0]["license_number"] == "ARCH-001"
@@ -0,0 +1,66 @@
+import uuid
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from app.models.license import LicenseStatus, LicenseType
+from app.services.parquet_snapshot import PartitionedParquetWriter, SNAPSHOT_COLUMNS
+
+Row = namedtuple("Row", [column.name for column in SNAPSHOT_COLUMNS])
+
+def _row(number: int, state: str) -> Row:
+    now = datetime(2025, 1, 1)
+    values = {column.name: None for column in SNAPSHOT_COLUMNS}
+    values.update(
+        id=uuid.uuid4(),
+        license_number=f"BL-{number}",
+        business_name=f"Business {number}",
+        business_type=LicenseType.RETAIL,
+        status=LicenseStatus.ACTIVE,
+        issued_date=now,
+        expiration_date=now + timedelta(days=365),
+        issuing_authority="Licensing Board",
+        street_address="1 Main St",
+        city="Springfield",
+        state=state,
+        zip_code="90001",
+        is_renewable=True,
+        created_at=now,
+        updated_at=now,
+    )
+    return Row(**values)
+
+class TestParquetSnapshot:
+
+    def test_partitioned_files_and_bounded_row_groups(self, tmp_path):
+        """Test that rows land in hive partitions, round-trip, and flush in bounded row groups"""
+        writer = PartitionedParquetWriter(str(tmp_path), row_group_size=4)
+        writer.add(2026, [_row(n, "CA") for n in range(9)] + [_row(n, "NV") for n in range(9, 12)])
+        writer.add(2027, [_row(12, "CA")])
+        writer.close()
+        assert writer.files == 3
+
+        ca_2026 = pq.ParquetFile(tmp_path / "state=CA" / "expiration_year=2026" / "part-0.parquet")
+        assert ca_2026.metadata.num_rows == 9
+        assert max(ca_2026.metadata.row_group(i).num_rows for i in range(ca_2026.metadata.num_row_groups)) <= 4
+        assert "state" not in ca_2026.schema_arrow.names
+
+        table = ds.dataset(str(tmp_path), format="parquet", partitioning="hive").to_table()
+        assert table.num_rows == 13
+        rows = {row["license_number"]: row for row in table.to_pylist()}
+        assert rows["BL-10"]["state"] == "NV"
+        assert rows["BL-12"]["expiration_year"] == 2027
+        assert rows["BL-0"]["business_type"] == "retail"
+        uuid.UUID(rows["BL-0"]["id"])
+
+    def test_partition_values_are_escaped(self, tmp_path):
+        """Test that a state can't name a path outside the snapshot, and reads back unchanged"""
+        writer = PartitionedParquetWriter(str(tmp_path / "snapshot"), row_group_size=4)
+        writer.add(2026, [_row(0, "../../CA"), _row(1, "N Y")])
+        writer.close()
+
+        assert sorted(path.name for path in (tmp_path / "snapshot").iterdir()) == ["state=..%2F..%2FCA", "state=N%20Y"]
+        table = ds.dataset(str(tmp_path / "snapshot"), format="parquet", partitioning="hive").to_table()
+        assert sorted(table.column("state").to_pylist()) == ["../../CA", "N Y"]
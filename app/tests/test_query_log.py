@@ -0,0 +1,75 @@
+import logging
+from sqlalchemy import create_engine, select, Table, Column, Integer, String, MetaData
+
+from app.core.query_log import SlowQueryLogger, statement_shape
+
+metadata = MetaData()
+items = Table(
+    "items",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("state", String(50)),
+)
+
+class TestSlowQueryLogger:
+
+    def test_statement_shape_collapses_placeholders(self):
+        """Test that statements differing only in bound values share a shape"""
+        shape = statement_shape("SELECT *\n  FROM items WHERE state = $1 AND id IN ($2, $3, $4)")
+        assert shape == "SELECT * FROM items WHERE state = ? AND id IN (?...)"
+        assert shape == statement_shape("SELECT * FROM items WHERE state = ? AND id IN (?, ?)")
+
+    def test_logs_slow_query_with_filters(self, caplog):
+        """Test that queries over the threshold are logged with their bound filter set"""
+        engine = create_engine("sqlite://")
+        metadata.create_all(engine)
+        slow_log = SlowQueryLogger(threshold_ms=0.000001, explain=True)
+        slow_log.install(engine)
+
+        with caplog.at_level(logging.WARNING, logger="app.slow_query"):
+            with engine.connect() as conn:
+                for _ in range(2):
+                    conn.execute(select(items).where(items.c.state == "WA").limit(10))
+
+        messages = [r.getMessage() for r in caplog.records if "FROM items" in r.getMessage()]
+        assert len(messages) == 2
+        assert "filters=['state']" in messages[0]
+        assert "occurrences=2" in messages[1]
+        # EXPLAIN capture is PostgreSQL-only
+        assert not any("plan" in m for m in messages)
+
+    def test_disabled_threshold_installs_nothing(self, caplog):
+        """Test that a zero threshold disables logging"""
+        engine = create_engine("sqlite://")
+        metadata.create_all(engine)
+        SlowQueryLogger(threshold_ms=0).install(engine)
+
+        with caplog.at_level(logging.WARNING, logger="app.slow_query"):
+            with engine.connect() as conn:
+                conn.execute(select(items))
+
+        assert not caplog.records
+
+    def test_explain_runs_inside_a_rolled_back_savepoint(self):
+        """Test that a failed EXPLAIN is rolled back without touching the caller's transaction"""
+        executed = []
+
+        class Cursor:
+            def execute(self, statement, parameters=None):
+                executed.append(statement)
+                if statement.startswith("EXPLAIN"):
+                    raise RuntimeError("canceling statement due to statement timeout")
+
+            def close(self):
+                pass
+
+        class Connection:
+            connection = type("DBAPIConnection", (), {"cursor": lambda self: Cursor()})()
+
+        assert SlowQueryLogger()._explain(Connection(), "SELECT 1", ()) is None
+        assert executed == [
+            "SAVEPOINT slow_query_explain",
+            "EXPLAIN (ANALYZE, BUFFERS) SELECT 1",
+            "ROLLBACK TO SAVEPOINT slow_query_explain",
+            "RELEASE SAVEPOINT slow_query_explain",
+        ]
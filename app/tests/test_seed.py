@@ -0,0 +1,47 @@
+from datetime import datetime
+
+from app.seed import CITIES_PER_STATE, COLUMNS, STATES, _city, chunk_bounds, generate_chunk
+
+AS_OF = datetime(2025, 1, 1)
+LOADED_AT = datetime(2025, 1, 2, 12, 30)
+
+class TestSyntheticLicenses:
+
+    def test_chunks_are_deterministic(self):
+        """Test that a chunk depends only on its seed and position"""
+        assert generate_chunk(42, 3, 300, 100, "GEN-", AS_OF, LOADED_AT) == generate_chunk(42, 3, 300, 100, "GEN-", AS_OF, LOADED_AT)
+        assert generate_chunk(42, 3, 300, 100, "GEN-", AS_OF, LOADED_AT) != generate_chunk(43, 3, 300, 100, "GEN-", AS_OF, LOADED_AT)
+        # A short last chunk is the start of the full one
+        assert generate_chunk(42, 3, 300, 100, "GEN-", AS_OF, LOADED_AT).startswith(
+            generate_chunk(42, 3, 300, 40, "GEN-", AS_OF, LOADED_AT)
+        )
+
+    def test_chunks_add_up_to_rows(self):
+        """Test that exactly the requested number of licenses is generated"""
+        assert chunk_bounds(1000, 50_000) == [(0, 1000)]
+        assert chunk_bounds(250, 100) == [(0, 100), (100, 100), (200, 50)]
+        total = sum(
+            len(generate_chunk(1, chunk, start, size, "GEN-", AS_OF, LOADED_AT).splitlines())
+            for chunk, (start, size) in enumerate(chunk_bounds(250, 100))
+        )
+        assert total == 250
+
+    def test_rows_match_copy_columns(self):
+        """Test that every row has one field per COPY column and a unique license number"""
+        rows = [line.split("\t") for line in generate_chunk(1, 2, 1000, 500, "GEN-", AS_OF, LOADED_AT).decode().splitlines()]
+        assert len(rows) == 500
+        assert all(len(row) == len(COLUMNS) for row in rows)
+        numbers = [row[COLUMNS.index("license_number")] for row in rows]
+        assert len(set(numbers)) == 500
+        assert numbers[0].endswith("-000001000")
+        for row in rows:
+            expired = row[COLUMNS.index("expiration_date")] < AS_OF.isoformat()
+            assert (row[COLUMNS.index("status")] == "active") <= (not expired)
+            assert row[COLUMNS.index("updated_at")] == LOADED_AT.isoformat()
+            assert len(row[COLUMNS.index("zip_code")]) == 5
+
+    def test_city_zip_codes_are_five_digits(self):
+        """Test that every state's cities get distinct five-digit ZIP codes"""
+        zip_codes = [_city(state_index, rank)[1] for state_index in range(len(STATES)) for rank in range(CITIES_PER_STATE)]
+        assert all(len(zip_code) == 5 and zip_code.isdigit() for zip_code in zip_codes)
+        assert len(set(zip_codes)) == len(zip_codes)
@@ -0,0 +1,162 @@
+from datetime import datetime, timedelta
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core import database
+from app.core.config import settings
+from app.core.shards import shard_router
+from app.core.warmup import Warmup, hot_licenses
+from app.models.base import Base
+from app.models.license import BusinessLicense, LicenseStatus
+from app.models.license_shard import LicenseShard
+from app.schemas.license import LicenseCreate, LicenseSearchFilters, LicenseUpdate
+from app.services.expiration_service import expire_licenses_job
+from app.services.sharded_license_service import ShardedLicenseService
+
+@pytest_asyncio.fixture
+async def shards(tmp_path, monkeypatch, sqlite_tables, license_row):
+    monkeypatch.setattr(settings, "SHARD_DATABASE_URLS", {
+        "east": f"sqlite+aiosqlite:///{tmp_path / 'east.db'}",
+        "west": f"sqlite+aiosqlite:///{tmp_path / 'west.db'}",
+    })
+    monkeypatch.setattr(settings, "SHARD_STATES", {"NY": "east", "CA": "west"})
+    monkeypatch.setattr(settings, "SHARD_DEFAULT", None)
+
+    def row(number: int, state: str) -> dict:
+        created = datetime(2025, 1, 1) + timedelta(hours=number)
+        return license_row(
+            f"BL-{number}", state=state, issued_date=created, expiration_date=created + timedelta(days=365),
+            created_at=created, updated_at=created
+        )
+
+    rows = {"east": [row(n, "NY") for n in range(0, 20, 2)], "west": [row(n, "CA") for n in range(1, 20, 2)]}
+    for shard, shard_rows in rows.items():
+        async with shard_router.engine(shard).begin() as conn:
+            await conn.run_sync(sqlite_tables(*Base.metadata.sorted_tables).create_all)
+            await conn.execute(insert(BusinessLicense), shard_rows)
+    yield
+    await shard_router.dispose()
+
+class TestShards:
+
+    def test_shard_for_state(self, monkeypatch):
+        """Test that states route to their shard, the default, or nowhere"""
+        monkeypatch.setattr(settings, "SHARD_DATABASE_URLS", {"east": "postgresql+asyncpg://east", "west": "postgresql+asyncpg://west"})
+        monkeypatch.setattr(settings, "SHARD_STATES", {"NY": "east", "CA": "west", "TX": "south"})
+        monkeypatch.setattr(settings, "SHARD_DEFAULT", None)
+
+        assert shard_router.shard_for_state("NY") == "east"
+        assert shard_router.shard_for_state("CA") == "west"
+        with pytest.raises(ValueError):
+            shard_router.shard_for_state("WA")
+        with pytest.raises(ValueError):
+            shard_router.shard_for_state("TX")
+
+        monkeypatch.setattr(settings, "SHARD_DEFAULT", "east")
+        assert shard_router.shard_for_state("WA") == "east"
+
+    @pytest.mark.asyncio
+    async def test_search_merges_shards(self, shards):
+        """Test that a search without a state pages through every shard newest first"""
+        service = ShardedLicenseService(AsyncSession())
+
+        page = await service.search_licenses(LicenseSearchFilters(), page=2, size=5)
+        assert page.total == 20
+        assert [item.license_number for item in page.items] == [f"BL-{n}" for n in range(14, 9, -1)]
+
+        page = await service.search_licenses(LicenseSearchFilters(state="CA"), page=1, size=20)
+        assert page.total == 10
+        assert {item.state for item in page.items} == {"CA"}
+
+        page = await service.search_licenses(LicenseSearchFilters(state="WA"), page=1, size=20)
+        assert page.total == 0
+
+        with pytest.raises(ValueError):
+            await service.search_licenses(LicenseSearchFilters(), page=settings.SHARD_SEARCH_MAX_WINDOW, size=5)
+
+    @pytest.mark.asyncio
+    async def test_failed_claim_removes_shard_row(self, shards, sqlite_engine, license_row):
+        """Test that a create whose directory commit fails doesn't leave its license on the shard"""
+        async with AsyncSession(sqlite_engine, expire_on_commit=False) as db:
+            async def lost_connection():
+                raise ConnectionError("connection lost")
+
+            db.commit = lost_connection
+            with pytest.raises(ConnectionError):
+                await ShardedLicenseService(db).create_license(LicenseCreate(**license_row("BL-NEW", state="CA")))
+
+        async with shard_router.session("west") as session:
+            assert await session.scalar(select(BusinessLicense.id).where(BusinessLicense.license_number == "BL-NEW")) is None
+        async with AsyncSession(sqlite_engine) as db:
+            assert await db.scalar(select(LicenseShard.shard)) is None
+
+    @pytest.mark.asyncio
+    async def test_expire_job_runs_on_every_shard(self, shards):
+        """Test that scheduled expiry reaches licenses on each shard, not the empty primary"""
+        for shard in shard_router.shards:
+            async with shard_router.session(shard) as session:
+                overdue = BusinessLicense.license_number.in_(["BL-0", "BL-1"])
+                await session.execute(
+                    BusinessLicense.__table__.update().where(overdue).values(expiration_date=datetime(2020, 1, 1))
+                )
+                await session.execute(
+                    BusinessLicense.__table__.update().where(~overdue).values(expiration_date=datetime(2100, 1, 1))
+                )
+                await session.commit()
+
+        await expire_licenses_job()
+
+        expired = set()
+        for shard in shard_router.shards:
+            async with shard_router.session(shard) as session:
+                result = await session.execute(
+                    select(BusinessLicense.license_number).where(BusinessLicense.status == LicenseStatus.EXPIRED)
+                )
+                expired.update(result.scalars())
+        assert expired == {"BL-0", "BL-1"}
+
+    @pytest.mark.asyncio
+    async def test_primary_only_routes_refuse(self, shards, client: AsyncClient):
+        """Test that routes reading licenses from the primary answer 501 once sharded"""
+        for path in ("/api/v1/licenses/changes", "/api/v1/licenses/expiring/summary", "/api/v1/jobs/1", "/api/v1/businesses/1"):
+            response = await client.get(path)
+            assert response.status_code == 501, path
+            assert response.json()["detail"] == "Not available on sharded deployments"
+
+    @pytest.mark.asyncio
+    async def test_business_links_refused(self, shards, sqlite_engine, license_row):
+        """Test that licenses can't reference businesses, which only the primary holds"""
+        async with AsyncSession(sqlite_engine, expire_on_commit=False) as db:
+            service = ShardedLicenseService(db)
+            with pytest.raises(ValueError, match="sharded"):
+                await service.create_license(LicenseCreate(**license_row("BL-NEW", state="CA", business_id=1)))
+            with pytest.raises(ValueError, match="sharded"):
+                await service.bulk_update(LicenseSearchFilters(state="CA"), LicenseUpdate(business_id=1))
+            assert await db.scalar(select(LicenseShard.shard)) is None
+
+    @pytest.mark.asyncio
+    async def test_warmup_reaches_shards(self, shards, sqlite_engine, monkeypatch):
+        """Test that warm-up opens shard pools and primes hot licenses from their shards"""
+        license_ids = []
+        async with AsyncSession(sqlite_engine) as db:
+            for shard in shard_router.shards:
+                async with shard_router.session(shard) as session:
+                    rows = (await session.execute(select(BusinessLicense.id, BusinessLicense.license_number).limit(2))).all()
+                for license_id, license_number in rows:
+                    db.add(LicenseShard(license_number=license_number, license_id=license_id, shard=shard))
+                    license_ids.append(license_id)
+            await db.commit()
+
+        async def top(limit):
+            return license_ids
+
+        monkeypatch.setattr(hot_licenses, "top", top)
+        monkeypatch.setattr(database, "AsyncSessionLocal", async_sessionmaker(sqlite_engine, class_=AsyncSession))
+        monkeypatch.setattr(settings, "WARMUP_POOL_CONNECTIONS", 2)
+        warmup = Warmup()
+        await warmup._warm(sqlite_engine)
+        assert warmup.status == {"connections": 6, "primed_licenses": 4}
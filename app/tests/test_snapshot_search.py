@@ -0,0 +1,99 @@
+import time
+import uuid
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+from app.models.license import LicenseStatus, LicenseType
+from app.schemas.license import LicenseSearchFilters
+from app.services.snapshot_search import LicenseSnapshot
+
+Row = namedtuple(
+    "Row",
+    "id business_type status city state zip_code expiration_date created_at updated_at",
+)
+
+NOW = datetime(2025, 1, 1)
+
+def _row(i: int, **overrides) -> Row:
+    values = dict(
+        id=uuid.uuid4(),
+        business_type=LicenseType.RETAIL if i % 2 else LicenseType.TRADE,
+        status=LicenseStatus.ACTIVE if i % 3 else LicenseStatus.EXPIRED,
+        city=f"City {i % 5}",
+        state="CA" if i % 4 else "NV",
+        zip_code=f"900{i % 10:02d}",
+        expiration_date=NOW + timedelta(days=i),
+        created_at=NOW - timedelta(minutes=i),
+        updated_at=NOW,
+    )
+    values.update(overrides)
+    return Row(**values)
+
+def _snapshot(rows) -> LicenseSnapshot:
+    snapshot = LicenseSnapshot()
+    snapshot._append(rows)
+    snapshot._index()
+    return snapshot
+
+def _expected(rows, predicate):
+    matching = sorted((row for row in rows if predicate(row)), key=lambda row: row.created_at, reverse=True)
+    return [row.id for row in matching]
+
+class TestLicenseSnapshot:
+
+    def test_filters_and_pagination_match_reference(self):
+        """Test that masks and newest-first paging agree with a plain filter"""
+        rows = [_row(i) for i in range(200)]
+        snapshot = _snapshot(rows)
+        filters = LicenseSearchFilters(
+            business_type=LicenseType.RETAIL,
+            state="CA",
+            city="city 3",
+            expires_after=NOW + timedelta(days=20),
+        )
+        expected = _expected(rows, lambda row: (
+            row.business_type == LicenseType.RETAIL
+            and row.state == "CA"
+            and row.city == "City 3"
+            and row.expiration_date >= NOW + timedelta(days=20)
+        ))
+
+        total, first = snapshot.search(filters, page=1, size=5)
+        _, second = snapshot.search(filters, page=2, size=5)
+        assert total == len(expected)
+        assert first + second == expected[:10]
+
+        total, ids = snapshot.search(LicenseSearchFilters(state="TX"))
+        assert (total, ids) == (0, [])
+
+    def test_upsert_and_delete(self):
+        """Test that refreshed rows replace, extend and drop snapshot rows"""
+        rows = [_row(i) for i in range(10)]
+        snapshot = _snapshot(rows)
+        active = LicenseSearchFilters(status=LicenseStatus.ACTIVE)
+        before, _ = snapshot.search(active)
+
+        changed = rows[1]._replace(status=LicenseStatus.EXPIRED)
+        added = _row(1000, status=LicenseStatus.ACTIVE, created_at=NOW + timedelta(days=1))
+        snapshot._upsert([changed, added])
+
+        total, ids = snapshot.search(active)
+        assert total == before
+        assert ids[0] == added.id
+        assert changed.id not in ids
+
+        snapshot.columns["live"][snapshot._slots([added.id.bytes])] = False
+        total, ids = snapshot.search(active)
+        assert total == before - 1
+        assert added.id not in ids
+
+    def test_unsupported_filters_fall_back(self):
+        """Test that text filters and stale snapshots are left to postgres"""
+        snapshot = _snapshot([_row(i) for i in range(3)])
+        assert not snapshot.supports(LicenseSearchFilters(state="CA"))
+
+        snapshot.ready = True
+        snapshot.refreshed_at = time.monotonic()
+        assert snapshot.supports(LicenseSearchFilters(state="CA"))
+        assert not snapshot.supports(LicenseSearchFilters(q="bakery"))
+        assert not snapshot.supports(LicenseSearchFilters(business_name="Bakery"))
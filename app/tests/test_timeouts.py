@@ -0,0 +1,71 @@
+import asyncio
+import pytest
+from starlette.requests import Request
+from starlette.routing import Route
+
+from app.core.config import settings
+from app.core.timeouts import DisconnectCancellationMiddleware, statement_timeout_for
+
+@pytest.mark.asyncio
+class TestStatementTimeouts:
+
+    async def test_route_timeout_uses_route_template(self):
+        """Test that per-route timeouts match on the route template, not the raw path"""
+        route = Route(f"{settings.API_V1_STR}/licenses/{{license_id}}", lambda request: None)
+        request = Request({
+            "type": "http",
+            "path": f"{settings.API_V1_STR}/licenses/123",
+            "route": route,
+            "headers": [],
+        })
+        assert statement_timeout_for(request) == settings.ROUTE_STATEMENT_TIMEOUTS_MS["/licenses/{license_id}"]
+
+    async def test_unknown_route_uses_default(self):
+        """Test that routes without an override fall back to the default timeout"""
+        request = Request({"type": "http", "path": "/elsewhere", "headers": []})
+        assert statement_timeout_for(request) == settings.STATEMENT_TIMEOUT_MS
+
+    async def test_disconnect_cancels_handler(self):
+        """Test that a client disconnect cancels the in-flight handler"""
+        cancelled = asyncio.Event()
+
+        async def slow_app(scope, receive, send):
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        async def receive():
+            await asyncio.sleep(0.01)
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            pass
+
+        middleware = DisconnectCancellationMiddleware(slow_app)
+        scope = {"type": "http", "method": "GET", "path": "/licenses/search"}
+        await asyncio.wait_for(middleware(scope, receive, send), timeout=1)
+        assert cancelled.is_set()
+
+    async def test_disconnect_after_response_lets_handler_finish(self):
+        """Test that the disconnect servers send after a response doesn't cancel teardown"""
+        finished = asyncio.Event()
+
+        async def app(scope, receive, send):
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b"ok"})
+            # Dependency teardown, e.g. closing the database session
+            await asyncio.sleep(0.05)
+            finished.set()
+
+        async def receive():
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            pass
+
+        middleware = DisconnectCancellationMiddleware(app)
+        scope = {"type": "http", "method": "GET", "path": "/licenses/search"}
+        await asyncio.wait_for(middleware(scope, receive, send), timeout=1)
+        assert finished.is_set()
@@ -0,0 +1,65 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.core.config import settings
+from app.core.warmup import Warmup
+from app.models.edge import edge_metadata, edge_licenses
+
+@pytest.mark.asyncio
+class TestWarmup:
+
+    async def test_warm_connections_opens_and_prepares(self, tmp_path, monkeypatch):
+        """Test that warm-up leaves the requested connections pooled and lookups compiled"""
+        # Edge mode: lookups hit the live table only, which the SQLite edge schema stands in for
+        monkeypatch.setattr(settings, "EDGE_MODE", True)
+        engine = create_async_engine(
+            f"sqlite+aiosqlite:///{tmp_path / 'warmup.db'}", poolclass=AsyncAdaptedQueuePool
+        )
+        async with engine.begin() as conn:
+            await conn.run_sync(edge_metadata.create_all)
+            now = datetime(2025, 1, 1)
+            await conn.execute(insert(edge_licenses), [{
+                "id": uuid.uuid4(), "license_number": "BL-1", "business_name": "Business",
+                "business_type": "retail", "status": "active", "issued_date": now,
+                "expiration_date": now + timedelta(days=365), "issuing_authority": "Licensing Board",
+                "street_address": "1 Main St", "city": "Springfield", "state": "CA",
+                "zip_code": "90001", "is_renewable": True, "created_at": now, "updated_at": now,
+            }])
+        await engine.dispose()
+
+        assert await Warmup().warm_connections(engine, 3) == 3
+        assert engine.pool.checkedin() == 3
+        assert len(engine.sync_engine._compiled_cache) >= 3
+        await engine.dispose()
+
+    async def test_ready_only_after_warmup(self, monkeypatch):
+        """Test that ready stays false until warm-up finishes, and is set on timeout"""
+        warmup = Warmup()
+        release = asyncio.Event()
+
+        async def warm(engine):
+            await release.wait()
+
+        monkeypatch.setattr(warmup, "_warm", warm)
+        await warmup.start(None)
+        await asyncio.sleep(0)
+        assert warmup.ready is False
+
+        release.set()
+        await warmup._task
+        assert warmup.ready is True
+        assert "duration_ms" in warmup.status
+
+        stuck = Warmup()
+        monkeypatch.setattr(stuck, "_warm", lambda engine: asyncio.sleep(60))
+        monkeypatch.setattr(settings, "WARMUP_TIMEOUT", 0.01)
+        await stuck.start(None)
+        await stuck._task
+        assert stuck.ready is True
+        assert stuck.status["timed_out"] is True